@@ -12,9 +12,24 @@ Tu tarea es completar la función indicada para realizar una consulta básica
 a la API de ipify.org, un servicio estable que proporciona la IP pública.
 """
 
+import os
+import sys
+
 import requests
 from requests.exceptions import RequestException
 
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from httpkit.hedge import hedged_get
+from httpkit.publicip import parse_ip, public_ip_cache
+from httpkit.resilience import resilient_client
+
+# Servicios equivalentes que devuelven la IP pública en texto plano, por orden
+# de preferencia (ver get_user_ip_hedged)
+IP_ENDPOINTS = ("https://api.ipify.org", "https://api64.ipify.org", "https://icanhazip.com")
+
 def get_user_ip():
     """
     Realiza una petición GET a api.ipify.org para obtener la dirección IP pública
@@ -22,7 +37,7 @@ def get_user_ip():
 
     Returns:
         str: La dirección IP si la petición es exitosa
-        None: Si ocurre un error en la petición
+        None: Si ocurre un error en la petición o la respuesta no es una IP
     """
     # Completa esta función para:
     # 1. Realizar una petición GET a la URL https://api.ipify.org (sin parámetros)
@@ -33,7 +48,8 @@ def get_user_ip():
 
     try:
         print(f"Realizando petición a: {url}")
-        response = requests.get(url)
+        # Cliente compartido con timeout, reintentos y cortacircuitos (httpkit.resilience)
+        response = resilient_client.get(url)
         response.raise_for_status()  # Lanza HTTPError para códigos 4xx/5xx
     except Exception as e:
         print(f"Error en la petición HTTP: {e}")
@@ -43,7 +59,56 @@ def get_user_ip():
     if response.status_code != 200:
         return None
 
-    return (getattr(response, "text", "") or "").strip()
+    # Un cuerpo vacío o que no es una IP cuenta como error (así la caché
+    # conserva la última IP válida)
+    return parse_ip(getattr(response, "text", None))
+
+
+ip_cache = public_ip_cache(lambda: get_user_ip())
+
+
+def get_user_ip_cached():
+    """
+    Devuelve la IP pública desde memoria (ver httpkit.publicip).
+
+    Returns:
+        str: La dirección IP
+        None: Si nunca se ha podido obtener
+    """
+    return ip_cache.get()
+
+def _parse_ip(body):
+    """
+    Valida que el cuerpo de una respuesta sea una dirección IP (si no lo es,
+    lanza ValueError y hedged_get pasa al siguiente servicio).
+    """
+    ip = parse_ip(body.decode("ascii", "replace"))
+    if ip is None:
+        raise ValueError("La respuesta no es una dirección IP")
+    return ip
+
+
+def get_user_ip_hedged(endpoints=IP_ENDPOINTS, hedge_delay=0.25, timeout=5.0):
+    """
+    Obtiene la IP pública con cobertura entre varios servicios: pide la IP al
+    primero y, si no ha respondido tras hedge_delay segundos (o falla), al
+    siguiente; gana la primera respuesta que sea una IP válida y las demás
+    peticiones se cancelan.
+
+    Args:
+        endpoints (tuple): URLs de servicios que devuelven la IP en texto plano
+        hedge_delay (float): Segundos de espera antes de pedirla al siguiente
+        timeout (float): Segundos máximos en total
+
+    Returns:
+        dict: 'ip' y 'endpoint' (servicio que respondió primero)
+        None: Si ningún servicio devolvió una IP válida a tiempo
+    """
+    result = hedged_get(endpoints, delay=hedge_delay, timeout=timeout, validate=_parse_ip)
+    if result.value is None:
+        return None
+    return {"ip": result.value, "endpoint": result.url}
+
 
 if __name__ == "__main__":
     # Ejemplo de uso de la función
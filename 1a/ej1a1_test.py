@@ -36,13 +36,13 @@ def test_get_user_ip_failure():
     """
     Prueba la función get_user_ip cuando la petición falla.
     """
-    with patch('requests.get') as mock_get:
+    with patch('requests.Session.get') as mock_get:
         # Configurar el mock para simular un error
         mock_get.side_effect = Exception("Connection error")
         result = get_user_ip()
         assert result is None
 
-@patch('requests.get')
+@patch('requests.Session.get')
 def test_get_user_ip_bad_status(mock_get):
     """
     Prueba la función get_user_ip cuando la petición devuelve un código de error.
@@ -54,3 +54,66 @@ def test_get_user_ip_bad_status(mock_get):
 
     result = get_user_ip()
     assert result is None
+
+@pytest.mark.parametrize("body", ["", "  \n", "<html>error</html>"], ids=["empty", "blank", "html"])
+@patch('requests.Session.get')
+def test_get_user_ip_invalid_body(mock_get, body):
+    """
+    Prueba que un cuerpo vacío o que no es una IP se trata como un error.
+    """
+    mock_response = Mock()
+    mock_response.status_code = 200
+    mock_response.text = body
+    mock_get.return_value = mock_response
+
+    assert get_user_ip() is None
+
+@patch('requests.Session.get')
+def test_get_user_ip_uses_timeout(mock_get):
+    """
+    Prueba que la petición se hace con el cliente compartido y con timeout.
+    """
+    from httpkit.client import DEFAULT_TIMEOUT
+
+    mock_response = Mock()
+    mock_response.status_code = 200
+    mock_response.text = "98.207.254.136\n"
+    mock_get.return_value = mock_response
+
+    assert get_user_ip() == "98.207.254.136"
+    assert mock_get.call_args.kwargs["timeout"] == DEFAULT_TIMEOUT
+
+def test_get_user_ip_cached(mock_responses):
+    """
+    Prueba que la IP se consulta una sola vez y después se sirve desde memoria.
+    """
+    from ej1a1 import get_user_ip_cached, ip_cache
+    from httpkit.publicip import public_ip_cache
+
+    with patch('ej1a1.ip_cache', public_ip_cache(ip_cache._fetch)):
+        assert get_user_ip_cached() == "98.207.254.136"
+        assert get_user_ip_cached() == "98.207.254.136"
+    assert len(mock_responses.calls) == 1, "La segunda llamada no debe hacer ninguna petición."
+
+def test_get_user_ip_hedged():
+    """
+    Prueba la consulta con cobertura contra servicios locales: si el primero no
+    devuelve una IP válida, gana el siguiente y se indica cuál respondió.
+    """
+    from ej1a1 import get_user_ip_hedged
+    from httpkit.handler import AppRequestHandler
+    from httpkit.runner import ServerRunner
+    from httpkit.servers import build_server
+
+    class IPService(AppRequestHandler):
+        def do_GET(self):
+            body = b"203.0.113.9\n" if self.path == "/ip" else b"no es una IP"
+            self.send_body(200, body, content_type="text/plain")
+
+        def log_message(self, format, *args):
+            pass
+
+    server = build_server(("127.0.0.1", 0), IPService, mode="threaded", workers=2)
+    with ServerRunner(server) as runner:
+        result = get_user_ip_hedged(endpoints=(f"{runner.url}/broken", f"{runner.url}/ip"))
+    assert result == {"ip": "203.0.113.9", "endpoint": f"{runner.url}/ip"}
@@ -12,9 +12,62 @@ Tu tarea es completar la función indicada para realizar una consulta a la API
 de ipify.org usando el formato JSON, que es más estructurado que el texto plano.
 """
 
+import os
+import sys
+
 import requests
 from requests.exceptions import RequestException
 
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from httpkit.latency import profile_endpoint
+from httpkit.publicip import parse_ip, public_ip_cache
+from httpkit.resilience import resilient_client
+from httpkit.timing import timed_get
+
+IPIFY_JSON_URL = 'https://api.ipify.org/?format=json'
+
+
+def get_ip_with_response_info():
+    """
+    Realiza una única petición GET a api.ipify.org en formato JSON y devuelve
+    la IP junto con la información de la respuesta.
+
+    Returns:
+        dict: Diccionario con la IP ('ip', None si el cuerpo no es JSON válido
+              o su campo "ip" no es una dirección IP)
+              y la información de la respuesta ('content_type', 'elapsed_time'
+              en milisegundos y 'response_size' en bytes)
+        None: Si ocurre un error en la petición
+    """
+    url = IPIFY_JSON_URL
+
+    try:
+        print(f"Realizando petición a: {url}")
+        # Cliente compartido con timeout, reintentos y cortacircuitos (httpkit.resilience)
+        response = resilient_client.get(url)
+        response.raise_for_status()  # Lanza HTTPError para códigos 4xx/5xx
+    except Exception as e:
+        print(f"Error en la petición HTTP: {e}")
+        return None
+
+    # Asegurar que solo devolvemos datos si la respuesta fue 200
+    if response.status_code != 200:
+        return None
+
+    try:
+        ip = parse_ip(response.json().get("ip"))
+    except (ValueError, AttributeError):
+        ip = None
+    return {
+        "ip": ip,
+        "content_type": response.headers.get("Content-Type"),
+        "elapsed_time": response.elapsed.total_seconds() * 1000,  # ms
+        "response_size": len(response.content)
+    }
+
 
 def get_user_ip_json():
     """
@@ -23,7 +76,7 @@ def get_user_ip_json():
 
     Returns:
         str: La dirección IP si la petición es exitosa
-        None: Si ocurre un error en la petición
+        None: Si ocurre un error en la petición o la respuesta no es una IP
     """
     # Completa esta función para:
     # 1. Realizar una petición GET a la URL https://api.ipify.org?format=json
@@ -31,27 +84,39 @@ def get_user_ip_json():
     # 3. Convertir la respuesta a formato JSON
     # 4. Extraer y devolver la IP del campo "ip" del objeto JSON
     # 5. Devolver None si hay algún error
-    
-    url = 'https://api.ipify.org/?format=json'
+    info = get_ip_with_response_info()
+    return info["ip"] if info else None
 
-    try:
-        print(f"Realizando petición a: {url}")
-        response = requests.get(url)
-        response.raise_for_status()  # Lanza HTTPError para códigos 4xx/5xx
-    except Exception as e:
-        print(f"Error en la petición HTTP: {e}")
-        return None
-    
-    # Asegurar que solo devolvemos la IP si la respuesta fue 200
-    if response.status_code != 200:
-        return None
- 
-    data = response.json()               # Convierte a JSON
-    return data.get("ip")                # devuelve el string IP
-def get_response_info():
+
+ip_cache = public_ip_cache(lambda: get_user_ip_json())
+
+
+def get_user_ip_json_cached():
+    """
+    Devuelve la IP pública desde memoria (ver httpkit.publicip).
+
+    Returns:
+        str: La dirección IP
+        None: Si nunca se ha podido obtener
+    """
+    return ip_cache.get()
+
+
+def get_response_info(phases=False):
     """
     Obtiene información adicional sobre la respuesta HTTP al consultar la API.
-    
+
+    Por defecto (phases=False) 'elapsed_time' es la medida gruesa de requests
+    (response.elapsed): el tiempo desde que se envía la petición hasta que se
+    reciben las cabeceras, sin la descarga del cuerpo ni el desglose por fases.
+
+    Args:
+        phases (bool): Si es True, la petición se instrumenta fase a fase (ver
+            httpkit.timing): 'elapsed_time' es entonces el tiempo total hasta
+            recibir el último byte, 'response_size' se cuenta mientras se
+            descarga el cuerpo y se añaden 'dns_ms', 'connect_ms', 'tls_ms',
+            'ttfb_ms', 'transfer_ms' y 'total_ms'
+
     Returns:
         dict: Diccionario con información de la respuesta (tipo de contenido,
               tiempo de respuesta, tamaño de la respuesta)
@@ -65,41 +130,71 @@ def get_response_info():
     #    - 'elapsed_time': El tiempo que tardó la petición (en milisegundos)
     #    - 'response_size': El tamaño de la respuesta en bytes
     # 4. Devolver None si hay algún error
-    url = 'https://api.ipify.org/?format=json'
+    if phases:
+        return get_response_timing()
+    info = get_ip_with_response_info()
+    if info is None:
+        return None
+    return {key: info[key] for key in ("content_type", "elapsed_time", "response_size")}
+
+
+def get_response_timing(url=IPIFY_JSON_URL):
+    """
+    Consulta la API midiendo por separado cada fase de la petición: resolución
+    DNS, conexión TCP, saludo TLS, tiempo hasta el primer byte y descarga del
+    cuerpo (en milisegundos). El cuerpo no se guarda: solo se cuentan sus bytes.
 
+    Returns:
+        dict: 'content_type', 'elapsed_time', 'response_size' y un campo
+              '<fase>_ms' por fase más 'total_ms'
+        None: Si ocurre un error en la petición
+    """
     try:
-        print(f"Realizando petición a: {url}")
-        response = requests.get(url)
-        response.raise_for_status()  # Lanza HTTPError para códigos 4xx/5xx
+        response = timed_get(url, timeout=10, keep_body=False)
     except Exception as e:
         print(f"Error en la petición HTTP: {e}")
         return None
-    
-    # Asegurar que solo devolvemos la IP si la respuesta fue 200
-    if response.status_code != 200:
+
+    if response.status != 200:
         return None
- 
-    data = response.json()               # Convierte a JSON
-    result = {
-            "content_type": response.headers.get("Content-Type"),
-            "elapsed_time": response.elapsed.total_seconds() * 1000,  # ms
-            "response_size": len(response.content)
-        }
 
-    return result
+    info = {
+        "content_type": response.headers.get("Content-Type"),
+        "elapsed_time": response.timings["total"] * 1000,  # ms
+        "response_size": response.body_size,
+    }
+    info.update(response.phases_ms())
+    return info
+
+
+def get_response_profile(samples=20, concurrency=1, reuse=True, url=IPIFY_JSON_URL):
+    """
+    Repite la consulta samples veces para conocer la distribución de la latencia
+    (ver httpkit.latency): min/mean/p50/p95/p99/max de las muestras con
+    conexión nueva ('cold') y reutilizada ('warm') y el rendimiento.
+
+    Args:
+        samples (int): Número de peticiones
+        concurrency (int): Peticiones simultáneas
+        reuse (bool): Reutilizar las conexiones entre peticiones
+
+    Returns:
+        dict: Resultado serializable a JSON de profile_endpoint()
+    """
+    return profile_endpoint(url, samples=samples, concurrency=concurrency, reuse=reuse)
 
 if __name__ == "__main__":
-    # Ejemplo de uso de las funciones
-    ip = get_user_ip_json()
-    if ip:
-        print(f"Tu dirección IP pública es: {ip}")
-        
-        # Mostrar información adicional de la respuesta
-        info = get_response_info()
-        if info:
-            print("\nInformación de la respuesta:")
-            print(f"Tipo de contenido: {info['content_type']}")
-            print(f"Tiempo de respuesta: {info['elapsed_time']} ms")
-            print(f"Tamaño de la respuesta: {info['response_size']} bytes")
+    # Ejemplo de uso: una sola petición instrumentada para la información de la
+    # respuesta y el desglose del tiempo por fases
+    info = get_response_info(phases=True)
+    if info:
+        print("Información de la respuesta:")
+        print(f"Tipo de contenido: {info['content_type']}")
+        print(f"Tiempo de respuesta: {info['elapsed_time']:.1f} ms")
+        print(f"Tamaño de la respuesta: {info['response_size']} bytes")
+
+        print("\nTiempo por fases:")
+        for phase in ("dns", "connect", "tls", "ttfb", "transfer", "total"):
+            print(f"  {phase}: {info[phase + '_ms']:.1f} ms")
     else:
-        print("No se pudo obtener la dirección IP")
+        print("No se pudo obtener la información de la respuesta")
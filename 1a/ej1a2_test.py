@@ -9,7 +9,9 @@ import responses
 from unittest.mock import patch, Mock
 import time
 
-from ej1a2 import get_user_ip_json, get_response_info
+from ej1a2 import (get_user_ip_json, get_response_info, get_ip_with_response_info,
+                   get_response_profile)
+from httpkit.timing import TimedResponse
 
 @pytest.fixture
 def mock_responses():
@@ -38,13 +40,13 @@ def test_get_user_ip_json_failure():
     """
     Prueba la función get_user_ip_json cuando la petición falla.
     """
-    with patch('requests.get') as mock_get:
+    with patch('requests.Session.get') as mock_get:
         # Configurar el mock para simular un error
         mock_get.side_effect = Exception("Connection error")
         result = get_user_ip_json()
         assert result is None
 
-@patch('requests.get')
+@patch('requests.Session.get')
 def test_get_user_ip_json_bad_status(mock_get):
     """
     Prueba la función get_user_ip_json cuando la petición devuelve un código de error.
@@ -57,7 +59,7 @@ def test_get_user_ip_json_bad_status(mock_get):
     result = get_user_ip_json()
     assert result is None
 
-@patch('requests.get')
+@patch('requests.Session.get')
 def test_get_response_info(mock_get):
     """
     Prueba la función get_response_info cuando la petición es exitosa.
@@ -82,8 +84,55 @@ def test_get_response_info_failure():
     """
     Prueba la función get_response_info cuando la petición falla.
     """
-    with patch('requests.get') as mock_get:
+    with patch('requests.Session.get') as mock_get:
         # Configurar el mock para simular un error
         mock_get.side_effect = Exception("Connection error")
         result = get_response_info()
         assert result is None
+
+def test_get_ip_with_response_info(mock_responses):
+    """
+    Prueba que una sola petición devuelve la IP junto con la información de la respuesta.
+    """
+    result = get_ip_with_response_info()
+    assert len(mock_responses.calls) == 1, "Debe hacerse una única petición."
+    assert result["ip"] == "98.207.254.136"
+    assert result["content_type"] == "application/json"
+    assert result["elapsed_time"] >= 0
+    assert result["response_size"] == len(b'{"ip": "98.207.254.136"}')
+
+@patch('ej1a2.timed_get')
+def test_get_response_info_phases(mock_timed_get):
+    """
+    Con phases=True se devuelve el desglose por fases y el tamaño contado al descargar.
+    """
+    timings = {"dns": 0.01, "connect": 0.02, "tls": 0.03, "ttfb": 0.04, "transfer": 0.005,
+               "total": 0.105}
+    mock_timed_get.return_value = TimedResponse(
+        200, {"Content-Type": "application/json"}, None, 24, timings)
+
+    result = get_response_info(phases=True)
+
+    assert mock_timed_get.call_args.kwargs["keep_body"] is False
+    assert result["content_type"] == "application/json"
+    assert result["response_size"] == 24
+    assert result["elapsed_time"] == pytest.approx(105)
+    assert result["dns_ms"] == pytest.approx(10)
+    assert result["tls_ms"] == pytest.approx(30)
+    assert result["ttfb_ms"] == pytest.approx(40)
+    assert result["transfer_ms"] == pytest.approx(5)
+
+@patch('ej1a2.timed_get')
+def test_get_response_info_phases_failure(mock_timed_get):
+    mock_timed_get.side_effect = OSError("Connection error")
+    assert get_response_info(phases=True) is None
+
+@patch('ej1a2.profile_endpoint')
+def test_get_response_profile(mock_profile):
+    """
+    El perfil de latencia se toma de la misma URL que get_response_info.
+    """
+    mock_profile.return_value = {"all": {"samples": 5}}
+    assert get_response_profile(samples=5, concurrency=2) == {"all": {"samples": 5}}
+    mock_profile.assert_called_once_with("https://api.ipify.org/?format=json", samples=5,
+                                         concurrency=2, reuse=True)
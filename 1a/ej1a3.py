@@ -18,49 +18,84 @@ Algunos encabezados comunes para esto son: X-Forwarded-For, X-Real-IP o directam
 del cliente mediante self.client_address.
 """
 
-import json
-from http.server import HTTPServer, BaseHTTPRequestHandler
+import os
+import sys
 
-class MyHTTPRequestHandler(BaseHTTPRequestHandler):
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from httpkit.handler import AppRequestHandler
+from httpkit.metrics import Metrics
+from httpkit.routing import Router
+from httpkit.runner import ServerRunner
+from httpkit.servers import build_server
+
+# Tabla de rutas del servidor: cada ruta se asocia a un método del manejador
+router = Router()
+
+class MyHTTPRequestHandler(AppRequestHandler):
     """
-    Manejador de peticiones HTTP personalizado
+    Manejador de peticiones HTTP personalizado (HTTP/1.1 con conexiones persistentes)
     """
 
+    router = router
+
     def do_GET(self):
         """
         Método que se ejecuta cuando se recibe una petición GET.
 
         Rutas implementadas:
         - `/ip`: Devuelve la IP del cliente en formato JSON
+        - `/metrics`: Métricas del servidor en formato Prometheus
 
-        Para otras rutas, devuelve un código de estado 404 (Not Found).
+        Para otras rutas, devuelve un código de estado 404 (Not Found) en formato JSON.
         """
-        # Implementa aquí la lógica para responder a las peticiones GET
-        # 1. Verifica la ruta solicitada (self.path)
-        # 2. Si la ruta es "/ip", envía una respuesta 200 con la IP del cliente en formato JSON
-        # 3. Si la ruta es cualquier otra, envía una respuesta 404
+        # El enrutador compara la ruta (sin la cadena de consulta) con la tabla
+        # de rutas y llama al método correspondiente, o responde 404/405.
+        # Antes se descuenta la petición de la cuota del cliente (si el servidor
+        # limita las peticiones), identificado con client_key()
+        if self.rate_limited():
+            return
+        self.router.dispatch(self)
+
+    @router.get("/ip")
+    def handle_ip(self, match):
+        """
+        Ruta `/ip`: envía una respuesta 200 con la IP del cliente en formato JSON.
 
+        Args:
+            match (RouteMatch): Ruta, parámetros y cadena de consulta de la petición
+        """
         # PISTA: Para obtener la IP del cliente puedes usar el método auxiliar _get_client_ip()
-        # Configuramos la respuesta
-        if self.path == "/ip":
-            ip = self._get_client_ip()
-            payload = {"ip": ip}
-            body = json.dumps(payload).encode("utf-8")
-
-            self.send_response(200)
-            self.send_header("Content-Type", "application/json")
-            self.send_header("Content-Length", str(len(body)))
-            self.end_headers()
-            self.wfile.write(body)
-        else:
-            # Si la ruta es cualquier otra, envía una respuesta 404
-            self.send_error(404, "Not Found")
-
-
-
-
+        ip = self._get_client_ip()
+        payload = {"ip": ip}
+        # Si el servidor tiene base de datos GeoIP se añaden país y ASN
+        geoip = getattr(self.server, "geoip", None)
+        if geoip is not None:
+            payload.update(geoip.lookup(ip) or {})
+        # La respuesta depende del cliente (y de sus cabeceras de proxy): ninguna
+        # caché compartida debe guardarla, y el navegador debe revalidarla en
+        # cada uso. Con el ETag, un cliente que consulta /ip sin parar recibe un
+        # 304 sin cuerpo mientras su IP no cambie
+        self.send_json(200, payload, cache_control="private, no-cache")
+
+    @router.get("/metrics")
+    def handle_metrics(self, match):
+        """
+        Ruta `/metrics`: métricas del servidor en formato de texto de Prometheus.
 
+        Args:
+            match (RouteMatch): Ruta, parámetros y cadena de consulta de la petición
+        """
+        self.send_metrics()
 
+    def client_key(self):
+        """
+        Clave del cliente para el límite de peticiones: la misma IP que
+        devuelve /ip, sea cual sea el método de la petición.
+        """
+        return self._get_client_ip()
 
     def _get_client_ip(self):
         """
@@ -88,20 +123,55 @@ class MyHTTPRequestHandler(BaseHTTPRequestHandler):
 
 
 
-def create_server(host="localhost", port=8000):
+def create_server(host="localhost", port=8000, mode="single", workers=None, queue_size=None,
+                  processes=None, access_log=None, geoip=None, rate_limit=None,
+                  metrics=True):
     """
     Crea y configura el servidor HTTP
+
+    Args:
+        host (str): Dirección donde escuchar
+        port (int): Puerto donde escuchar (0 para que el sistema elija uno libre;
+            el puerto real queda en server.server_port)
+        mode (str): "single" (una conexión cada vez), "threaded" (grupo de hilos),
+            "asyncio" (un único bucle de eventos) o "prefork" (varios procesos)
+        workers (int, opcional): Número de hilos trabajadores por proceso
+        queue_size (int, opcional): Conexiones en espera admitidas por proceso
+        processes (int, opcional): Número de procesos en modo "prefork"
+        access_log (AccessLog, opcional): Registro de accesos en JSON con escritura
+            diferida; None escribe una línea por petición en stderr y False
+            desactiva el registro de peticiones
+        geoip (GeoIPDatabase, opcional): Base de datos para añadir país y ASN a la
+            respuesta de `/ip`. Se abre antes de crear los procesos, así que en
+            modo "prefork" todos comparten la misma proyección en memoria
+        rate_limit (TokenBucketLimiter, opcional): Límite de peticiones por IP de
+            cliente; quien lo supera recibe 429 con Retry-After
+        metrics (Metrics o bool): Métricas expuestas en `/metrics`; True crea
+            unas para las rutas del servidor y False las desactiva
     """
+    if metrics is True:
+        metrics = Metrics(router.paths, processes=processes if mode == "prefork" else 1)
     server_address = (host, port)
-    httpd = HTTPServer(server_address, MyHTTPRequestHandler)
+    httpd = build_server(server_address, MyHTTPRequestHandler, mode=mode, workers=workers,
+                         queue_size=queue_size, processes=processes, access_log=access_log,
+                         geoip=geoip, rate_limit=rate_limit,
+                         metrics=metrics or None)
     return httpd
 
-def run_server(server):
+def run_server(server, ready=None):
     """
-    Inicia el servidor HTTP
+    Inicia el servidor HTTP y lo mantiene en marcha hasta que se detenga
+
+    Args:
+        server: Servidor creado con create_server()
+        ready (callable o threading.Event, opcional): Evento que se activa, o
+            función que recibe el ServerRunner, en cuanto el servidor acepta
+            conexiones; con el ServerRunner se puede consultar la dirección real
+            (runner.url) y detener el servidor de forma ordenada (runner.stop())
     """
+    runner = ServerRunner(server, on_ready=ready)
     print(f"Servidor iniciado en http://{server.server_name}:{server.server_port}")
-    server.serve_forever()
+    runner.run()
 
 if __name__ == '__main__':
     server = create_server()
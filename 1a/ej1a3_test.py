@@ -1,38 +1,31 @@
 import pytest
-import threading
 import requests
 import json
-import time
 from ej1a3 import create_server
+from httpkit.runner import ServerRunner
 
 @pytest.fixture
 def server():
     """
     Fixture para iniciar y detener el servidor HTTP durante las pruebas
     """
-    # Crear el servidor en un puerto específico para pruebas
-    server = create_server(host="localhost", port=8888)
+    # Crear el servidor en un puerto libre elegido por el sistema (puerto 0),
+    # de modo que las pruebas se pueden ejecutar en paralelo
+    server = create_server(host="localhost", port=0)
 
-    # Iniciar el servidor en un hilo separado
-    thread = threading.Thread(target=server.serve_forever)
-    thread.daemon = True
-    thread.start()
-
-    # Esperar un momento para que el servidor se inicie
-    time.sleep(0.5)
+    # Iniciar el servidor en segundo plano y esperar a que acepte conexiones
+    runner = ServerRunner(server).start()
 
     yield server
 
-    # Detener el servidor después de las pruebas
-    server.shutdown()
-    server.server_close()
-    thread.join(1)
+    # Detener el servidor después de las pruebas (terminando las peticiones en curso)
+    runner.stop()
 
 def test_ip_endpoint(server):
     """
     Prueba el endpoint /ip para validar que devuelve la IP del cliente en formato JSON.
     """
-    response = requests.get("http://localhost:8888/ip")
+    response = requests.get(f"http://localhost:{server.server_port}/ip")
     assert response.status_code == 200, "El código de estado debe ser 200."
     assert response.headers['Content-Type'] == 'application/json', "El tipo de contenido debe ser application/json."
 
@@ -50,5 +43,138 @@ def test_nonexistent_endpoint(server):
     """
     Prueba un endpoint que no existe para validar que devuelve un código de error 404.
     """
-    response = requests.get("http://localhost:8888/nonexistent")
+    response = requests.get(f"http://localhost:{server.server_port}/nonexistent")
     assert response.status_code == 404, "El código de estado debe ser 404 para rutas inexistentes."
+
+def test_threaded_mode():
+    """
+    Prueba que el modo con grupo de hilos sirve el endpoint /ip igual que el modo por defecto.
+    """
+    server = create_server(host="localhost", port=0, mode="threaded", workers=2)
+    with ServerRunner(server):
+        response = requests.get(f"http://localhost:{server.server_port}/ip")
+        assert response.status_code == 200, "El código de estado debe ser 200."
+        assert 'ip' in response.json(), "La respuesta debe contener el campo 'ip'."
+
+def test_asyncio_mode():
+    """
+    Prueba que el motor asyncio reutiliza el manejador, incluida la lógica de _get_client_ip.
+    """
+    server = create_server(host="localhost", port=0, mode="asyncio")
+    with ServerRunner(server):
+        base_url = f"http://localhost:{server.server_port}"
+        response = requests.get(f"{base_url}/ip", headers={"X-Forwarded-For": "203.0.113.7, 10.0.0.1"})
+        assert response.status_code == 200, "El código de estado debe ser 200."
+        assert response.json() == {"ip": "203.0.113.7"}, "Debe usarse la primera IP de X-Forwarded-For."
+
+        response = requests.get(f"{base_url}/nonexistent")
+        assert response.status_code == 404, "El código de estado debe ser 404 para rutas inexistentes."
+
+def test_prefork_mode():
+    """
+    Prueba que el modo multiproceso sirve /ip desde procesos trabajadores.
+    """
+    server = create_server(host="localhost", port=0, mode="prefork", processes=2, workers=2)
+    # El evento ready del modo prefork espera a que todos los trabajadores acepten conexiones
+    runner = ServerRunner(server).start()
+    try:
+        response = requests.get(f"http://localhost:{server.server_port}/ip", timeout=1)
+        assert response.status_code == 200, "El código de estado debe ser 200."
+        assert 'ip' in response.json(), "La respuesta debe contener el campo 'ip'."
+    finally:
+        runner.stop()
+
+def test_geoip_enrichment(tmp_path):
+    """
+    Prueba que, con base de datos GeoIP, /ip añade el país y el ASN de la IP del cliente.
+    """
+    from httpkit.geoip import GeoIPDatabase, build_database
+
+    path = tmp_path / "geoip.db"
+    build_database([("203.0.113.0/24", {"country": "ES", "asn": 64500})], str(path))
+    geoip = GeoIPDatabase(str(path))
+    server = create_server(host="localhost", port=0, mode="threaded", workers=2, geoip=geoip)
+    try:
+        with ServerRunner(server):
+            base_url = f"http://localhost:{server.server_port}"
+            response = requests.get(f"{base_url}/ip", headers={"X-Forwarded-For": "203.0.113.7"})
+            assert response.json() == {"ip": "203.0.113.7", "country": "ES", "asn": 64500}
+
+            response = requests.get(f"{base_url}/ip", headers={"X-Forwarded-For": "198.51.100.1"})
+            assert response.json() == {"ip": "198.51.100.1"}, "Sin red conocida solo se devuelve la IP."
+    finally:
+        geoip.close()
+
+def test_conditional_get(server):
+    """
+    Prueba que /ip envía ETag y Cache-Control y responde 304 sin cuerpo si el cliente ya la tiene.
+    """
+    url = f"http://localhost:{server.server_port}/ip"
+    # Una sola conexión: el servidor por defecto atiende una conexión cada vez
+    with requests.Session() as session:
+        response = session.get(url)
+        etag = response.headers['ETag']
+        assert response.headers['Cache-Control'] == "private, no-cache", "La respuesta depende del cliente."
+
+        response = session.get(url, headers={"If-None-Match": etag})
+        assert response.status_code == 304, "Con el mismo ETag el código de estado debe ser 304."
+        assert response.content == b"", "Una respuesta 304 no lleva cuerpo."
+        assert response.headers['ETag'] == etag
+
+        response = session.get(url, headers={"If-None-Match": etag, "X-Forwarded-For": "203.0.113.7"})
+        assert response.status_code == 200, "Si cambia la IP el ETag ya no coincide."
+
+def test_rate_limit():
+    """
+    Prueba que, con límite de peticiones, un cliente que agota su cuota recibe 429 con Retry-After
+    sin afectar a los demás clientes.
+    """
+    from httpkit.ratelimit import TokenBucketLimiter
+
+    limiter = TokenBucketLimiter(rate=0.5, burst=2)
+    server = create_server(host="localhost", port=0, mode="threaded", workers=2, rate_limit=limiter)
+    with ServerRunner(server), requests.Session() as session:
+        url = f"http://localhost:{server.server_port}/ip"
+        client = {"X-Forwarded-For": "203.0.113.7"}
+        assert [session.get(url, headers=client).status_code for _ in range(2)] == [200, 200]
+
+        response = session.get(url, headers=client)
+        assert response.status_code == 429, "Agotada la cuota el código de estado debe ser 429."
+        assert response.headers['Retry-After'] == "2"
+        assert response.json()['code'] == 429
+
+        response = session.get(url, headers={"X-Forwarded-For": "198.51.100.1"})
+        assert response.status_code == 200, "Cada IP tiene su propia cuota."
+
+def test_metrics_endpoint(server):
+    """
+    Prueba que /metrics expone en formato Prometheus las peticiones por ruta y código de estado.
+    """
+    base_url = f"http://localhost:{server.server_port}"
+    with requests.Session() as session:
+        session.get(f"{base_url}/ip")
+        session.get(f"{base_url}/nonexistent")
+        response = session.get(f"{base_url}/metrics")
+    assert response.status_code == 200, "El código de estado debe ser 200."
+    assert response.headers['Content-Type'].startswith("text/plain; version=0.0.4")
+    lines = response.text.splitlines()
+    assert 'http_requests_total{route="/ip",status="200"} 1' in lines
+    assert 'http_requests_total{route="other",status="404"} 1' in lines
+    assert 'http_request_duration_seconds_count{route="/ip"} 1' in lines
+    assert "http_connections_in_flight 1" in lines, "La conexión de la propia petición está abierta."
+
+def test_prefork_metrics_are_aggregated():
+    """
+    Prueba que /metrics suma las peticiones atendidas por todos los procesos trabajadores.
+    """
+    server = create_server(host="localhost", port=0, mode="prefork", processes=2, workers=2)
+    runner = ServerRunner(server).start()
+    try:
+        base_url = f"http://localhost:{server.server_port}"
+        # Cada petición en su propia conexión, que el sistema reparte entre los trabajadores
+        for _ in range(6):
+            requests.get(f"{base_url}/ip", headers={"Connection": "close"}, timeout=1)
+        response = requests.get(f"{base_url}/metrics", headers={"Connection": "close"}, timeout=1)
+        assert 'http_requests_total{route="/ip",status="200"} 6' in response.text.splitlines()
+    finally:
+        runner.stop()
@@ -13,10 +13,24 @@ Tu tarea es completar la función indicada para realizar una consulta a una URL
 en api.ipify.org y manejar el error de forma adecuada.
 """
 
+import json
+import os
+import sys
+
 import requests
 from requests.exceptions import RequestException
 from requests.exceptions import HTTPError
 
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from httpkit.body import read_body, release
+from httpkit.resilience import resilient_client
+
+# Tamaño máximo del cuerpo que se lee de la respuesta
+MAX_BODY_BYTES = 256 * 1024
+
 def get_nonexistent_resource():
     """
     Realiza una petición GET a un recurso inexistente en api.ipify.org y maneja el error.
@@ -39,21 +53,29 @@ def get_nonexistent_resource():
     # 2. Capturar la excepción o error HTTP (no interrumpir la ejecución)
     # 3. Extraer la información solicitada del error
     # 4. Devolver un diccionario con la información del error
+    response = None
     try:
-        response = requests.get(url)
+        # Cliente compartido (httpkit.resilience); con stream=True el cuerpo no
+        # se descarga hasta que se sabe que interesa
+        response = resilient_client.get(url, stream=True)
         response.raise_for_status()
         # Si por algún motivo el recurso existiera, devuelve su JSON o texto
+        body = read_body(response, max_bytes=MAX_BODY_BYTES)
         try:
-            data = response.json()
+            data = json.loads(body)
         except ValueError:
-            data = {"content": response.text}
+            data = {"content": body.decode(response.encoding or "utf-8", "replace")}
         return {"status_code": response.status_code, "data": data}
 
     except (HTTPError, RequestException) as e:
         print(f"Error en la petición HTTP: {e}")
-        # Devuelve un diccionario incluso en caso de error
+        if response is not None:
+            # El cuerpo de la página de error no se usa: no se descarga
+            release(response)
+        # Devuelve un diccionario incluso en caso de error (sin código de
+        # estado si no llegó ninguna respuesta, p. ej. con el circuito abierto)
         return {
-            "status_code": response.status_code,
+            "status_code": response.status_code if response is not None else None,
             "error_message": str(e),
             "requested_url": url
         }
@@ -10,6 +10,7 @@ import responses
 from unittest.mock import patch, Mock
 
 from ej1b1 import get_nonexistent_resource
+from httpkit.resilience import CircuitOpenError
 
 @pytest.fixture
 def mock_responses():
@@ -48,7 +49,7 @@ def test_get_nonexistent_resource_failure():
     """
     Prueba la función get_nonexistent_resource cuando la petición falla por un error de conexión.
     """
-    with patch('requests.get') as mock_get:
+    with patch('requests.Session.get') as mock_get:
         # Configurar el mock para simular un error de conexión
         mock_get.side_effect = Exception("Connection error")
         result = get_nonexistent_resource()
@@ -61,7 +62,7 @@ def test_get_nonexistent_resource_failure():
         assert result['status_code'] is None or isinstance(result['status_code'], int), "El código de estado debe ser None o un número"
         assert result['requested_url'] == "https://api.ipify.org/ip", "La URL debe ser la solicitada"
 
-@patch('requests.get')
+@patch('requests.Session.get')
 def test_get_nonexistent_resource_specific_error(mock_get):
     """
     Prueba la función get_nonexistent_resource cuando la petición devuelve específicamente un código 404.
@@ -80,3 +81,15 @@ def test_get_nonexistent_resource_specific_error(mock_get):
     assert result['status_code'] == 404, "El código de estado debe ser 404"
     assert result['requested_url'] == "https://api.ipify.org/ip", "La URL debe ser la solicitada"
     assert 'error_message' in result, "El diccionario debe contener la clave 'error_message'"
+
+def test_get_nonexistent_resource_circuit_open():
+    """
+    Prueba que con el circuito abierto (sin respuesta) se devuelve el diccionario de error.
+    """
+    with patch('ej1b1.resilient_client.get') as mock_get:
+        mock_get.side_effect = CircuitOpenError("Circuito abierto para api.ipify.org")
+        result = get_nonexistent_resource()
+
+    assert result['status_code'] is None
+    assert result['requested_url'] == "https://api.ipify.org/ip"
+    assert "Circuito abierto" in result['error_message']
@@ -24,8 +24,20 @@ Deberás comprobar que el código en el encabezado HTTP coincide con el campo "c
 en el cuerpo JSON y usar el campo "description" para proporcionar información detallada.
 """
 
+import os
+import sys
+
 import requests
 
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from httpkit.body import read_json
+
+# Tamaño máximo del cuerpo JSON que se lee de la respuesta
+MAX_BODY_BYTES = 64 * 1024
+
 def request_with_error_handling(url):
     """
     Realiza una petición GET a la URL proporcionada y maneja los diferentes tipos de
@@ -50,7 +62,8 @@ def request_with_error_handling(url):
     # - Errores del cliente (códigos 4xx)
     # - Errores del servidor (códigos 5xx)
     try:
-        resp = requests.get(url, allow_redirects=False, timeout=10)
+        # stream=True: el cuerpo no se descarga hasta comprobar tipo y tamaño
+        resp = requests.get(url, allow_redirects=False, timeout=10, stream=True)
     except requests.RequestException as e:
         # Manejo de errores de conexión / tiempo de espera
         return {
@@ -72,12 +85,14 @@ def request_with_error_handling(url):
     body_desc = None
     mismatch_note = ""
     try:
-        data = resp.json()
+        # Lectura acotada: una página de error HTML (o cualquier cuerpo que no
+        # sea JSON) o un cuerpo demasiado grande se descartan sin descargarlos
+        data = read_json(resp, max_bytes=MAX_BODY_BYTES)
         body_code = data.get("code")
         body_desc = data.get("description")
         if body_code is not None and body_code != status:
             mismatch_note = f" (Advertencia: JSON code={body_code} no coincide con HTTP {status})"
-    except:
+    except (requests.RequestException, ValueError, AttributeError):
         #No json
         pass
     # Mensaje base usando la descripción del body o la razón del status
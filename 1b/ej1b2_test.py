@@ -168,3 +168,21 @@ def test_connection_error():
         # Verificación de valores para el caso específico
         assert result['success'] is False, "Para un error de conexión, 'success' debe ser False"
         assert 'connection_error' in str(result['message']).lower(), "El mensaje debe indicar que hubo un error de conexión"
+
+def test_html_error_page_is_not_parsed():
+    """
+    Prueba que una página de error HTML (no JSON) se descarta sin leerla y se usa la razón HTTP.
+    """
+    with responses.RequestsMock() as rsps:
+        rsps.add(
+            responses.GET,
+            "https://httpstatuses.maor.io/503",
+            body="<html>" + "x" * 1024 * 1024 + "</html>",
+            status=503,
+            content_type="text/html"
+        )
+        result = request_with_error_handling("https://httpstatuses.maor.io/503")
+
+    assert result['error_type'] == "server_error"
+    assert result['status_code'] == 503
+    assert "Service Unavailable" in result['message']
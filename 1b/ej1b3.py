@@ -19,84 +19,180 @@ Tu objetivo es asegurar que cuando se acceda a una ruta no definida, se devuelva
 error 404 personalizado en formato JSON.
 """
 
-import json
 import datetime
-from http.server import HTTPServer, BaseHTTPRequestHandler
+import json
+import os
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from httpkit.cache import PerSecondCache
+from httpkit.handler import AppRequestHandler
+from httpkit.metrics import Metrics
+from httpkit.routing import Router
+from httpkit.runner import ServerRunner
+from httpkit.servers import build_server
+from httpkit.sse import EventBroadcaster, format_event
+
+# Tabla de rutas del servidor: cada ruta se asocia a un método del manejador
+router = Router()
+
+
+def build_time_body(now):
+    """
+    Construye el cuerpo JSON de /time para el instante indicado.
+
+    Args:
+        now (float): Segundos desde la época (como time.time())
+
+    Returns:
+        bytes: Cuerpo JSON codificado
+    """
+    current_time = datetime.datetime.fromtimestamp(now)
+    time_info = {
+        "timestamp": current_time.timestamp(),
+        "iso_format": current_time.isoformat(),
+        "readable": current_time.strftime("%Y-%m-%d %H:%M:%S")
+    }
+    return json.dumps(time_info).encode()
+
+
+# El campo "readable" solo cambia una vez por segundo: se reutiliza el cuerpo
+# ya codificado durante todo el segundo
+time_cache = PerSecondCache(build_time_body)
+
+
+def build_time_event(now):
+    """
+    Construye el evento SSE de /time/stream para el instante indicado.
+
+    Args:
+        now (float): Segundos desde la época (como time.time())
+
+    Returns:
+        bytes: Evento codificado, con el segundo como identificador
+    """
+    return format_event(build_time_body(now), event_id=int(now))
 
-class MyHTTPRequestHandler(BaseHTTPRequestHandler):
+
+# Un único temporizador codifica el evento de cada segundo una sola vez y lo
+# envía a todos los clientes suscritos a /time/stream
+time_stream = EventBroadcaster(build_time_event)
+
+class MyHTTPRequestHandler(AppRequestHandler):
     """
-    Manejador de peticiones HTTP personalizado
+    Manejador de peticiones HTTP personalizado (HTTP/1.1 con conexiones persistentes)
     """
 
+    router = router
+
     def do_GET(self):
         """
         Método que se ejecuta cuando se recibe una petición GET.
 
         Rutas implementadas:
         - `/time`: Devuelve la hora actual del sistema en formato JSON
+        - `/time/stream`: Envía la hora cada segundo como Server-Sent Events
+        - `/metrics`: Métricas del servidor en formato Prometheus
 
         Para otras rutas, debes devolver un código de estado 404 (Not Found) con un mensaje
         personalizado en formato JSON.
         """
-        if self.path == "/time":
-            # Esta parte ya está implementada: devuelve la hora del sistema en JSON
-            self.send_response(200)
-            self.send_header("Content-Type", "application/json")
-            self.end_headers()
-
-            current_time = datetime.datetime.now()
-            time_info = {
-                "timestamp": current_time.timestamp(),
-                "iso_format": current_time.isoformat(),
-                "readable": current_time.strftime("%Y-%m-%d %H:%M:%S")
-            }
-
-            self.wfile.write(json.dumps(time_info).encode())
-        else:
-            # Implementa aquí el manejo de errores para rutas no definidas
-            # Debes:
-            # 1. Enviar un código de estado 404
-            # 2. Establecer el tipo de contenido como "application/json"
-            # 3. Devolver un mensaje de error personalizado en formato JSON
-            #    que incluya al menos el código de error y un mensaje descriptivo
-            #
-            # FORMATO DE RESPUESTA DE ERROR:
-            #
-            # {
-            #    "code": 404,
-            #    "message": "Recurso [ruta] no encontrado"
-            # }
-            #
-            # Donde [ruta] debe ser sustituido por la ruta solicitada (self.path)
-            # Ejemplo: Si se solicita "/api/users", el mensaje sería "Recurso /api/users no encontrado"
-            #
-            # Nota: Para los nombres de campo también se aceptan variaciones como:
-            # - Para el código: "code" o "status"
-            # - Para el mensaje: "message", "descripcion" o "detail"
-            self.send_response(404)
-            self.send_header("Content-Type", "application/json")
-            self.end_headers()
-            error_info = {
-                "code": 404,
-                "message": f"Recurso {self.path} no encontrado"
-            }
-            self.wfile.write(json.dumps(error_info).encode())
-
-
-def create_server(host="localhost", port=8000):
+        # El enrutador compara la ruta (sin la cadena de consulta) con la tabla
+        # de rutas y llama al método correspondiente. Para rutas no definidas
+        # responde él mismo con el error 404 personalizado en JSON:
+        #
+        # {
+        #    "code": 404,
+        #    "message": "Recurso [ruta] no encontrado"
+        # }
+        #
+        # Donde [ruta] es la ruta solicitada (self.path). Si la ruta existe pero
+        # no admite el método, responde 405 con la cabecera Allow.
+        self.router.dispatch(self)
+
+    @router.get("/time")
+    def handle_time(self, match):
+        """
+        Ruta `/time`: devuelve la hora del sistema en JSON.
+
+        Args:
+            match (RouteMatch): Ruta, parámetros y cadena de consulta de la petición
+        """
+        # El cuerpo cambia cada segundo y max-age solo admite segundos enteros:
+        # con cualquier valor positivo el cliente podría mostrar una hora ya
+        # desfasada. Dentro del mismo segundo el ETag coincide y la
+        # revalidación devuelve 304 sin cuerpo
+        self.send_body(200, time_cache.get(), cache_control="max-age=0, must-revalidate",
+                       reusable=True)
+
+    @router.get("/time/stream")
+    def handle_time_stream(self, match):
+        """
+        Ruta `/time/stream`: flujo Server-Sent Events con la hora del sistema,
+        un evento por segundo (con el mismo JSON que `/time`).
+
+        Args:
+            match (RouteMatch): Ruta, parámetros y cadena de consulta de la petición
+        """
+        # El primer evento se envía de inmediato; los siguientes, con cada tick
+        self.send_event_stream(time_stream, initial=format_event(time_cache.get()))
+
+    @router.get("/metrics")
+    def handle_metrics(self, match):
+        """
+        Ruta `/metrics`: métricas del servidor en formato de texto de Prometheus.
+
+        Args:
+            match (RouteMatch): Ruta, parámetros y cadena de consulta de la petición
+        """
+        self.send_metrics()
+
+
+def create_server(host="localhost", port=8000, mode="single", workers=None, queue_size=None,
+                  processes=None, access_log=None, metrics=True):
     """
     Crea y configura el servidor HTTP
+
+    Args:
+        host (str): Dirección donde escuchar
+        port (int): Puerto donde escuchar (0 para que el sistema elija uno libre;
+            el puerto real queda en server.server_port)
+        mode (str): "single" (una conexión cada vez), "threaded" (grupo de hilos),
+            "asyncio" (un único bucle de eventos) o "prefork" (varios procesos)
+        workers (int, opcional): Número de hilos trabajadores por proceso
+        queue_size (int, opcional): Conexiones en espera admitidas por proceso
+        processes (int, opcional): Número de procesos en modo "prefork"
+        access_log (AccessLog, opcional): Registro de accesos en JSON con escritura
+            diferida; None escribe una línea por petición en stderr y False
+            desactiva el registro de peticiones
+        metrics (Metrics o bool): Métricas expuestas en `/metrics`; True crea
+            unas para las rutas del servidor y False las desactiva
     """
+    if metrics is True:
+        metrics = Metrics(router.paths, processes=processes if mode == "prefork" else 1)
     server_address = (host, port)
-    httpd = HTTPServer(server_address, MyHTTPRequestHandler)
+    httpd = build_server(server_address, MyHTTPRequestHandler, mode=mode, workers=workers,
+                         queue_size=queue_size, processes=processes, access_log=access_log,
+                         metrics=metrics or None)
     return httpd
 
-def run_server(server):
+def run_server(server, ready=None):
     """
-    Inicia el servidor HTTP
+    Inicia el servidor HTTP y lo mantiene en marcha hasta que se detenga
+
+    Args:
+        server: Servidor creado con create_server()
+        ready (callable o threading.Event, opcional): Evento que se activa, o
+            función que recibe el ServerRunner, en cuanto el servidor acepta
+            conexiones; con el ServerRunner se puede consultar la dirección real
+            (runner.url) y detener el servidor de forma ordenada (runner.stop())
     """
+    runner = ServerRunner(server, on_ready=ready)
     print(f"Servidor iniciado en http://{server.server_name}:{server.server_port}")
-    server.serve_forever()
+    runner.run()
 
 if __name__ == '__main__':
     server = create_server()
@@ -1,38 +1,32 @@
 import pytest
-import threading
 import requests
 import json
-import time
+from unittest.mock import patch
 from ej1b3 import create_server
+from httpkit.runner import ServerRunner
 
 @pytest.fixture
 def server():
     """
     Fixture para iniciar y detener el servidor HTTP durante las pruebas
     """
-    # Crear el servidor en un puerto específico para pruebas
-    server = create_server(host="localhost", port=8888)
+    # Crear el servidor en un puerto libre elegido por el sistema (puerto 0),
+    # de modo que las pruebas se pueden ejecutar en paralelo
+    server = create_server(host="localhost", port=0)
 
-    # Iniciar el servidor en un hilo separado
-    thread = threading.Thread(target=server.serve_forever)
-    thread.daemon = True
-    thread.start()
-
-    # Esperar un momento para que el servidor se inicie
-    time.sleep(0.5)
+    # Iniciar el servidor en segundo plano y esperar a que acepte conexiones
+    runner = ServerRunner(server).start()
 
     yield server
 
-    # Detener el servidor después de las pruebas
-    server.shutdown()
-    server.server_close()
-    thread.join(1)
+    # Detener el servidor después de las pruebas (terminando las peticiones en curso)
+    runner.stop()
 
 def test_time_endpoint(server):
     """
     Prueba el endpoint /time para validar que devuelve la hora del sistema en formato JSON.
     """
-    response = requests.get("http://localhost:8888/time")
+    response = requests.get(f"http://localhost:{server.server_port}/time")
     assert response.status_code == 200, "El código de estado debe ser 200."
     assert response.headers['Content-Type'] == 'application/json', "El tipo de contenido debe ser application/json."
 
@@ -55,7 +49,7 @@ def test_custom_404_error(server):
     """
     # Usamos una ruta específica para poder verificar que se incluye en el mensaje de error
     test_path = "/ruta_no_existente"
-    response = requests.get(f"http://localhost:8888{test_path}")
+    response = requests.get(f"http://localhost:{server.server_port}{test_path}")
 
     assert response.status_code == 404, "El código de estado debe ser 404 para rutas inexistentes."
     assert response.headers['Content-Type'] == 'application/json', "El tipo de contenido del error debe ser application/json."
@@ -81,3 +75,109 @@ def test_custom_404_error(server):
 
     # Verificar que el mensaje de error incluye la ruta solicitada
     assert test_path in data[message_field], f"El mensaje de error debe incluir la ruta solicitada '{test_path}'."
+
+def test_keep_alive_content_length(server):
+    """
+    Prueba que /time y el 404 envían Content-Length y permiten reutilizar la conexión.
+    """
+    with requests.Session() as session:
+        response = session.get(f"http://localhost:{server.server_port}/time")
+        assert response.headers['Content-Length'] == str(len(response.content)), "Debe enviarse Content-Length."
+
+        response = session.get(f"http://localhost:{server.server_port}/ruta_no_existente")
+        assert response.status_code == 404, "El código de estado debe ser 404 para rutas inexistentes."
+        assert response.headers['Content-Length'] == str(len(response.content)), "Debe enviarse Content-Length."
+        assert response.raw.version == 11, "El servidor debe responder con HTTP/1.1."
+
+def test_asyncio_mode():
+    """
+    Prueba que el motor asyncio devuelve la misma hora y el mismo 404 en JSON.
+    """
+    server = create_server(host="localhost", port=0, mode="asyncio")
+    with ServerRunner(server):
+        base_url = f"http://localhost:{server.server_port}"
+        response = requests.get(f"{base_url}/time")
+        assert response.status_code == 200, "El código de estado debe ser 200."
+        assert 'timestamp' in response.json(), "La respuesta debe contener el campo 'timestamp'."
+
+        response = requests.get(f"{base_url}/ruta_no_existente")
+        assert response.status_code == 404, "El código de estado debe ser 404 para rutas inexistentes."
+        assert "/ruta_no_existente" in response.json()["message"], "El mensaje debe incluir la ruta."
+
+def test_time_with_query_string(server):
+    """
+    Prueba que la cadena de consulta no impide resolver la ruta /time.
+    """
+    response = requests.get(f"http://localhost:{server.server_port}/time?tz=utc")
+    assert response.status_code == 200, "El código de estado debe ser 200 aunque haya cadena de consulta."
+    assert 'timestamp' in response.json(), "La respuesta debe contener el campo 'timestamp'."
+
+def test_method_not_allowed(server):
+    """
+    Prueba que un método no admitido en /time devuelve 405 en JSON con la cabecera Allow.
+    """
+    response = requests.post(f"http://localhost:{server.server_port}/time")
+    assert response.status_code == 405, "El código de estado debe ser 405 para métodos no admitidos."
+    assert response.headers['Content-Type'] == 'application/json', "El tipo de contenido del error debe ser application/json."
+    assert response.headers['Allow'] == 'GET', "La cabecera Allow debe indicar los métodos admitidos."
+    assert response.json()['code'] == 405, "El código del error debe ser 405."
+
+def test_time_body_is_cached(server):
+    """
+    Prueba que dos peticiones a /time en el mismo segundo reutilizan el cuerpo ya codificado.
+    """
+    from ej1b3 import build_time_body
+    from httpkit.cache import PerSecondCache
+
+    # Reloj congelado: las dos peticiones caen siempre en el mismo segundo
+    frozen = PerSecondCache(build_time_body, clock=lambda: 1700000000.25)
+    with patch('ej1b3.time_cache', frozen), requests.Session() as session:
+        first = session.get(f"http://localhost:{server.server_port}/time")
+        second = session.get(f"http://localhost:{server.server_port}/time")
+    assert first.content == second.content, "En el mismo segundo el cuerpo debe ser idéntico."
+    assert frozen.stats.snapshot()['misses'] == 1, "El cuerpo debe construirse una sola vez."
+    assert frozen.stats.snapshot()['hits'] == 1, "La segunda petición debe ser un acierto."
+
+def test_time_freshness_headers(server):
+    """
+    Prueba que /time indica que debe revalidarse y que el 404 no lleva ETag.
+    """
+    with requests.Session() as session:
+        response = session.get(f"http://localhost:{server.server_port}/time")
+        assert response.headers['Cache-Control'] == "max-age=0, must-revalidate"
+        assert response.headers['ETag'].startswith('W/"'), "La respuesta debe llevar un ETag."
+
+        response = session.get(f"http://localhost:{server.server_port}/ruta_no_existente")
+        assert 'ETag' not in response.headers, "Los errores no llevan ETag."
+
+@pytest.mark.parametrize("mode", ["single", "threaded", "asyncio"])
+def test_time_stream(mode):
+    """
+    Prueba que /time/stream envía la hora como Server-Sent Events sin ocupar el servidor.
+    """
+    import socket
+    from ej1b3 import time_stream
+
+    server = create_server(host="localhost", port=0, mode=mode)
+    runner = ServerRunner(server).start()
+    sock = socket.create_connection(("localhost", server.server_port), timeout=3)
+    try:
+        sock.sendall(b"GET /time/stream HTTP/1.1\r\nHost: localhost\r\n\r\n")
+        data = b""
+        while data.count(b"\n\n") < 2:
+            chunk = sock.recv(65536)
+            assert chunk, "El servidor no debe cerrar el flujo."
+            data += chunk
+        head, _, body = data.partition(b"\r\n\r\n")
+        assert b"Content-Type: text/event-stream" in head, "El tipo de contenido debe ser text/event-stream."
+        events = [event for event in body.split(b"\n\n") if event]
+        payload = json.loads(events[-1].split(b"data: ")[1])
+        assert 'timestamp' in payload, "Cada evento debe contener el JSON de /time."
+
+        # La conexión cedida no bloquea el resto de peticiones (ni siquiera en modo "single")
+        response = requests.get(f"http://localhost:{server.server_port}/time", timeout=2)
+        assert response.status_code == 200
+        assert time_stream.subscribers >= 1
+    finally:
+        sock.close()
+        runner.stop()
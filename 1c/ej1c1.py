@@ -15,8 +15,22 @@ para entender cómo interactuar con APIs web.
 Tu tarea es completar la implementación de las funciones indicadas.
 """
 
+import os
+import sys
+
 import requests
 
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from httpkit.body import read_json, release
+from httpkit.client import DEFAULT_TIMEOUT
+from httpkit.resilience import resilient_client
+
+# Tamaño máximo aceptado para la respuesta de la API
+MAX_BODY_BYTES = 1024 * 1024
+
 def get_gbfs_feeds():
     """
     Realiza una petición GET a la API de GBFS de Barcelona para obtener
@@ -30,18 +44,24 @@ def get_gbfs_feeds():
     base_url = "https://barcelona-sp.publicbikesystem.net/customer/gbfs/v2/gbfs.json"
 
     try:
-        # Realizar petición GET a la URL
-        response = requests.get(base_url)
+        # Realizar petición GET a la URL, reintentando los fallos temporales y
+        # sin insistir si el servicio está caído (cortacircuitos). Con
+        # stream=True el cuerpo no se descarga hasta leerlo
+        response = resilient_client.get(base_url, send=requests.get, stream=True,
+                                        timeout=DEFAULT_TIMEOUT)
 
         # Comprobar si la petición fue exitosa (código 200)
         if response.status_code == 200:
-            # Devolver los datos en formato JSON
-            return response.json()
+            # Devolver los datos en formato JSON, descartando sin interpretarla
+            # una respuesta que no sea JSON o que supere MAX_BODY_BYTES
+            return read_json(response, MAX_BODY_BYTES)
         else:
             # Si el código de estado no es 200, imprimir un mensaje de error
+            # (y descartar el cuerpo sin leerlo)
+            release(response)
             print(f"Error: La petición no fue exitosa. Código de estado: {response.status_code}")
             return None
-    except requests.exceptions.RequestException as e:
+    except (requests.exceptions.RequestException, ValueError) as e:
         # Capturar cualquier error que pueda ocurrir durante la petición
         print(f"Error al realizar la petición: {e}")
         return None
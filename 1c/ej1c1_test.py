@@ -11,7 +11,8 @@ import io
 import sys
 from unittest.mock import patch, MagicMock
 
-from ej1c1 import get_gbfs_feeds, extract_feeds_info, print_feeds_summary
+from ej1c1 import MAX_BODY_BYTES, get_gbfs_feeds, extract_feeds_info, print_feeds_summary
+from httpkit.client import DEFAULT_TIMEOUT
 
 @pytest.fixture
 def sample_gbfs_response():
@@ -39,21 +40,19 @@ def sample_gbfs_response():
     }
 
 @patch('ej1c1.requests.get')
-def test_get_gbfs_feeds_success(mock_get, sample_gbfs_response):
+def test_get_gbfs_feeds_success(mock_get, sample_gbfs_response, json_response):
     """
     Prueba la función get_gbfs_feeds cuando la petición es exitosa
     """
     # Configurar el mock para retornar una respuesta exitosa
-    mock_response = MagicMock()
-    mock_response.status_code = 200
-    mock_response.json.return_value = sample_gbfs_response
-    mock_get.return_value = mock_response
+    mock_get.return_value = json_response(200, sample_gbfs_response)
 
     # Ejecutar la función
     result = get_gbfs_feeds()
 
     # Verificar que se llamó a requests.get con la URL correcta
-    mock_get.assert_called_once_with("https://barcelona-sp.publicbikesystem.net/customer/gbfs/v2/gbfs.json")
+    mock_get.assert_called_once_with("https://barcelona-sp.publicbikesystem.net/customer/gbfs/v2/gbfs.json",
+                                     stream=True, timeout=DEFAULT_TIMEOUT)
 
     # Verificar que el resultado es el esperado
     assert result == sample_gbfs_response, "La función debe devolver los datos JSON de la respuesta"
@@ -88,6 +87,49 @@ def test_get_gbfs_feeds_connection_error(mock_get):
     # Verificar que el resultado es None cuando hay un error de conexión
     assert result is None, "La función debe devolver None cuando hay un error de conexión"
 
+@patch('ej1c1.requests.get')
+def test_get_gbfs_feeds_retries_temporary_error(mock_get, sample_gbfs_response, json_response):
+    """
+    Prueba que un error temporal (503) se reintenta y se devuelve la respuesta siguiente
+    """
+    unavailable = MagicMock()
+    unavailable.status_code = 503
+    unavailable.headers = {"Retry-After": "0"}
+    mock_get.side_effect = [unavailable, json_response(200, sample_gbfs_response)]
+
+    result = get_gbfs_feeds()
+
+    assert mock_get.call_count == 2, "Un 503 debe reintentarse"
+    assert result == sample_gbfs_response
+
+@patch('ej1c1.requests.get')
+def test_get_gbfs_feeds_unexpected_content_type(mock_get):
+    """
+    Prueba que una respuesta 200 que no es JSON (p. ej. una página HTML) se descarta sin interpretarla
+    """
+    mock_response = MagicMock()
+    mock_response.status_code = 200
+    mock_response.headers = {"Content-Type": "text/html; charset=utf-8"}
+    mock_get.return_value = mock_response
+
+    result = get_gbfs_feeds()
+
+    assert result is None, "La función debe devolver None si la respuesta no es JSON"
+    mock_response.iter_content.assert_not_called()
+    mock_response.close.assert_called()
+
+@patch('ej1c1.requests.get')
+def test_get_gbfs_feeds_body_too_large(mock_get, json_response):
+    """
+    Prueba que la lectura se aborta si el cuerpo supera MAX_BODY_BYTES
+    """
+    mock_response = json_response(200, {})
+    mock_response.iter_content.return_value = iter([b"[" + b"0," * MAX_BODY_BYTES])
+    mock_get.return_value = mock_response
+
+    assert get_gbfs_feeds() is None, "La función debe devolver None si el cuerpo es demasiado grande"
+    mock_response.close.assert_called()
+
 def test_extract_feeds_info_success(sample_gbfs_response):
     """
     Prueba la función extract_feeds_info cuando se proporciona una respuesta válida
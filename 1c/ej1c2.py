@@ -15,9 +15,23 @@ en diferentes formatos utilizando pandas.
 Tu tarea es completar la implementación de las funciones indicadas.
 """
 
+import os
+import sys
+
 import requests
 import pandas as pd
 
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from httpkit.body import read_json, release
+from httpkit.client import DEFAULT_TIMEOUT
+from httpkit.resilience import resilient_client
+
+# Tamaño máximo aceptado para la respuesta de la API
+MAX_BODY_BYTES = 8 * 1024 * 1024
+
 def get_stations_data():
     """
     Realiza una petición a la API para obtener información de las estaciones
@@ -36,15 +50,20 @@ def get_stations_data():
     # 3. Extraer y devolver el objeto 'data' del JSON recibido
     # 4. Manejar posibles errores (conexión, formato, etc.)
     try:
-        # 1 - peticion GET
-        response = requests.get(url)
+        # 1 - peticion GET (con reintentos de los fallos temporales y
+        # cortacircuitos si el servicio está caído); con stream=True el cuerpo
+        # no se descarga hasta leerlo
+        response = resilient_client.get(url, send=requests.get, stream=True,
+                                        timeout=DEFAULT_TIMEOUT)
 
         # 2 - comprobar codigo de estado
         if response.status_code != 200:
+            release(response)
             return None
         
-        # 3 - extraer json y el objeto data
-        payload = response.json()
+        # 3 - extraer json y el objeto data (descartando sin interpretarla una
+        # respuesta que no sea JSON o que supere MAX_BODY_BYTES)
+        payload = read_json(response, MAX_BODY_BYTES)
         data = payload.get("data")
 
         # 4 - validar que data exista y que sea un dict
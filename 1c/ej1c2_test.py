@@ -11,6 +11,7 @@ import requests
 from unittest.mock import patch, MagicMock
 
 from ej1c2 import get_stations_data, get_station_info, get_station_coordinates, create_stations_dataframe
+from httpkit.client import DEFAULT_TIMEOUT
 
 @pytest.fixture
 def sample_stations_response():
@@ -185,21 +186,19 @@ def sample_stations_data(sample_stations_response):
     return sample_stations_response["data"]
 
 @patch('ej1c2.requests.get')
-def test_get_stations_data_success(mock_get, sample_stations_response):
+def test_get_stations_data_success(mock_get, sample_stations_response, json_response):
     """
     Prueba la función get_stations_data cuando la petición es exitosa
     """
     # Configurar el mock para retornar una respuesta exitosa
-    mock_response = MagicMock()
-    mock_response.status_code = 200
-    mock_response.json.return_value = sample_stations_response
-    mock_get.return_value = mock_response
+    mock_get.return_value = json_response(200, sample_stations_response)
 
     # Ejecutar la función
     result = get_stations_data()
 
     # Verificar que se llamó a requests.get con la URL correcta
-    mock_get.assert_called_once_with("https://barcelona.publicbikesystem.net/customer/gbfs/v2/en/station_information")
+    mock_get.assert_called_once_with("https://barcelona.publicbikesystem.net/customer/gbfs/v2/en/station_information",
+                                     stream=True, timeout=DEFAULT_TIMEOUT)
 
     # Verificar que el resultado es el objeto 'data' del JSON
     assert result == sample_stations_response["data"], "La función debe devolver el objeto 'data' de la respuesta JSON"
@@ -0,0 +1,38 @@
+"""
+Fixtures compartidas por los tests de todos los ejercicios.
+"""
+
+import json
+from unittest.mock import MagicMock
+
+import pytest
+
+from httpkit.resilience import resilient_client
+
+
+@pytest.fixture(autouse=True)
+def reset_resilient_client():
+    """
+    Fixture que deja el cliente compartido (cortacircuitos, presupuesto de
+    reintentos y contadores) como nuevo en cada test, para que los fallos
+    simulados de un test no abran el circuito de los siguientes.
+    """
+    resilient_client.reset()
+    yield
+    resilient_client.reset()
+
+
+@pytest.fixture
+def json_response():
+    """
+    Fixture que crea respuestas simuladas de una petición con stream=True cuyo
+    cuerpo JSON se lee por bloques con iter_content().
+    """
+    def make(status_code, payload):
+        response = MagicMock()
+        response.status_code = status_code
+        response.headers = {"Content-Type": "application/json"}
+        response.iter_content.return_value = [json.dumps(payload).encode()]
+        return response
+
+    return make
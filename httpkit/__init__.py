@@ -0,0 +1,12 @@
+"""
+Utilidades compartidas por los ejercicios del tema.
+
+Este paquete agrupa la infraestructura común que usan los servidores
+(ej1a3, ej1b3) y los clientes HTTP del resto de ejercicios, de forma que
+cada ejercicio siga siendo un único fichero y la lógica reutilizable viva
+en un solo sitio.
+
+Los ejercicios se ejecutan como scripts desde su propia carpeta, así que cada
+uno añade la raíz del repositorio (ROOT_DIR) a sys.path antes de importar
+httpkit.
+"""
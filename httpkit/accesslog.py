@@ -0,0 +1,147 @@
+"""
+Registro de accesos estructurado y con escritura diferida.
+
+BaseHTTPRequestHandler.log_message() escribe una línea formateada en stderr de
+forma síncrona en cada petición. AccessLog en cambio:
+
+- Guarda en una cola acotada una tupla por petición (sin formatear nada en el
+  camino de la petición). Si la cola está llena, la entrada se descarta y se
+  cuenta en dropped: registrar nunca bloquea una respuesta.
+- Un hilo en segundo plano formatea las entradas como líneas JSON y las
+  escribe por lotes.
+- Permite muestrear (sample_rate) para registrar solo una fracción de las
+  peticiones.
+
+El hilo escritor se crea en el primer registro de cada proceso, de modo que
+funciona también en los trabajadores del modo pre-fork.
+"""
+
+import json
+import os
+import queue
+import random
+import sys
+import threading
+import time
+
+
+class AccessLog:
+    """
+    Registro de accesos en formato JSON lines.
+
+    Atributos:
+        sample_rate: Fracción de peticiones registradas (1.0 = todas)
+        written: Entradas escritas
+        dropped: Entradas descartadas por tener la cola llena
+    """
+
+    def __init__(self, stream=None, sample_rate=1.0, queue_size=10000, batch_size=256):
+        """
+        Args:
+            stream: Fichero donde escribir (por defecto sys.stderr)
+            sample_rate (float): Fracción de peticiones a registrar, entre 0 y 1
+            queue_size (int): Entradas pendientes máximas antes de descartar
+            batch_size (int): Entradas máximas por escritura
+        """
+        self.stream = stream
+        self.sample_rate = sample_rate
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.written = 0
+        self.dropped = 0
+        self._pid = None
+        self._queue = None
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+    def record(self, client, method, path, status, size, duration):
+        """
+        Registra una petición. Es la única parte que corre en el hilo de la
+        petición: muestreo y encolado, sin formateo ni escritura.
+
+        Args:
+            client (str): Dirección del cliente
+            method (str): Método HTTP
+            path (str): Ruta solicitada
+            status (int): Código de estado de la respuesta
+            size (int): Bytes del cuerpo enviado (None si se desconoce)
+            duration (float): Segundos que ha tardado la petición
+        """
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return
+        if self._pid != os.getpid():
+            self._start()
+        try:
+            self._queue.put_nowait((time.time(), client, method, path, status, size, duration))
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self):
+        """
+        Escribe las entradas pendientes y detiene el hilo escritor.
+        """
+        if self._thread is not None and self._pid == os.getpid():
+            self._queue.put(None)
+            self._thread.join()
+        self._thread = None
+        self._pid = None
+
+    def _start(self):
+        """
+        Crea la cola y el hilo escritor del proceso actual.
+        """
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            self._queue = queue.Queue(self.queue_size)
+            self._thread = threading.Thread(target=self._write_loop, name="access-log",
+                                            daemon=True)
+            self._thread.start()
+            self._pid = os.getpid()
+
+    def _write_loop(self):
+        """
+        Bucle del hilo escritor: espera a que haya entradas y escribe de una vez
+        todas las acumuladas (hasta batch_size), hasta recibir None.
+        """
+        pending = self._queue
+        running = True
+        while running:
+            entry = pending.get()
+            batch = []
+            while entry is not None:
+                batch.append(entry)
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    entry = pending.get_nowait()
+                except queue.Empty:
+                    break
+            else:
+                running = False
+            if batch:
+                self._write(batch)
+
+    def _write(self, batch):
+        """
+        Formatea y escribe un lote de entradas con una sola escritura.
+        """
+        lines = []
+        for ts, client, method, path, status, size, duration in batch:
+            lines.append(json.dumps({
+                "ts": round(ts, 3),
+                "client": client,
+                "method": method,
+                "path": path,
+                "status": status,
+                "bytes": size,
+                "duration_ms": round(duration * 1000, 3),
+            }))
+        stream = self.stream or sys.stderr
+        try:
+            stream.write("\n".join(lines) + "\n")
+            stream.flush()
+        except (OSError, ValueError):
+            self.dropped += len(batch)
+            return
+        self.written += len(batch)
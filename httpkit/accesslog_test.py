@@ -0,0 +1,118 @@
+"""
+Tests para httpkit/accesslog.py
+Comprueban el formato JSON lines, el muestreo, el descarte con la cola llena
+y la integración con AppRequestHandler.
+"""
+
+import io
+import json
+import threading
+
+import requests
+
+from httpkit.accesslog import AccessLog
+from httpkit.handler import AppRequestHandler
+from httpkit.routing import Router
+from httpkit.runner import ServerRunner
+from httpkit.servers import build_server
+
+router = Router()
+
+
+class LoggedHandler(AppRequestHandler):
+    """
+    Manejador con una única ruta /ok.
+    """
+
+    router = router
+
+    @router.get("/ok")
+    def handle_ok(self, match):
+        self.send_json(200, {"ok": True})
+
+
+def run_requests(paths, **extensions):
+    """
+    Arranca un servidor, pide las rutas indicadas y lo detiene.
+    """
+    server = build_server(("127.0.0.1", 0), LoggedHandler, mode="threaded", workers=2,
+                          **extensions)
+    with ServerRunner(server):
+        for path in paths:
+            requests.get(f"http://127.0.0.1:{server.server_port}{path}")
+
+
+def test_json_lines():
+    """
+    Cada entrada se escribe como una línea JSON con todos los campos.
+    """
+    stream = io.StringIO()
+    log = AccessLog(stream=stream)
+    log.record("10.0.0.1", "GET", "/ip", 200, 17, 0.0015)
+    log.record("10.0.0.2", "POST", "/ip", 405, 60, 0.001)
+    log.close()
+
+    lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [line["status"] for line in lines] == [200, 405]
+    assert lines[0]["client"] == "10.0.0.1"
+    assert lines[0]["bytes"] == 17
+    assert lines[0]["duration_ms"] == 1.5
+    assert log.written == 2
+
+
+def test_sampling_disabled():
+    """
+    Con sample_rate=0 no se registra nada.
+    """
+    stream = io.StringIO()
+    log = AccessLog(stream=stream, sample_rate=0.0)
+    for _ in range(100):
+        log.record("10.0.0.1", "GET", "/ip", 200, 17, 0.001)
+    log.close()
+    assert stream.getvalue() == ""
+
+
+def test_full_queue_drops_entries():
+    """
+    Si el escritor no da abasto, las entradas se descartan sin bloquear.
+    """
+    class BlockedStream(io.StringIO):
+        def __init__(self):
+            super().__init__()
+            self.release = threading.Event()
+
+        def write(self, text):
+            self.release.wait()
+            return super().write(text)
+
+    stream = BlockedStream()
+    log = AccessLog(stream=stream, queue_size=2, batch_size=1)
+    for _ in range(10):
+        log.record("10.0.0.1", "GET", "/ip", 200, 17, 0.001)
+    assert log.dropped >= 7
+    stream.release.set()
+    log.close()
+    assert log.written + log.dropped == 10
+
+
+def test_handler_records_requests():
+    """
+    El manejador registra cada petición (incluidos 404) en el AccessLog del servidor.
+    """
+    stream = io.StringIO()
+    log = AccessLog(stream=stream)
+    run_requests(["/ok", "/missing?x=1"], access_log=log)
+    log.close()
+
+    lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [(line["path"], line["status"]) for line in lines] == [("/ok", 200), ("/missing?x=1", 404)]
+    assert lines[0]["bytes"] == len(b'{"ok": true}')
+    assert lines[0]["duration_ms"] >= 0
+
+
+def test_access_log_disabled(capfd):
+    """
+    Con access_log=False no se escribe ninguna línea por petición.
+    """
+    run_requests(["/ok"], access_log=False)
+    assert '"GET /ok' not in capfd.readouterr().err
@@ -0,0 +1,271 @@
+"""
+Motor de servidor basado en asyncio.
+
+Un único bucle de eventos atiende todas las conexiones, por lo que miles de
+clientes inactivos o lentos no consumen un hilo cada uno. Las peticiones se
+siguen procesando con la misma clase manejadora de http.server: el motor lee
+la petición completa del socket, se la entrega al manejador a través de un
+buffer en memoria y envía al cliente lo que el manejador haya escrito. Así las
+rutas, cabeceras y errores son idénticos en todos los motores.
+
+El manejador se ejecuta dentro del bucle de eventos, de modo que este motor
+está pensado para manejadores rápidos que no se bloquean (como /ip o /time).
+
+Como el cuerpo se lee entero en memoria antes de llamar al manejador, se
+comprueba antes su tamaño: las peticiones con un Content-Length mayor que
+max_body_size reciben 413, las que no tienen uno válido 400, y las que envían
+el cuerpo por partes (Transfer-Encoding: chunked), que este motor no
+interpreta, 501. En todos los casos se cierra la conexión sin leer el cuerpo.
+"""
+
+import asyncio
+import io
+import socket
+import threading
+
+from httpkit.handler import AppRequestHandler
+
+HEADER_END = b"\r\n\r\n"
+
+
+def _body_length(head, max_body_size):
+    """
+    Obtiene la longitud del cuerpo de una petición a partir de sus cabeceras.
+
+    Args:
+        head (bytes): Línea de petición y cabeceras, terminadas en línea vacía
+        max_body_size (int): Tamaño máximo admitido del cuerpo
+
+    Returns:
+        tuple: (longitud, None) con la longitud del cuerpo (0 si no hay
+            Content-Length), o (0, código) con el código de error con el que
+            rechazar la petición: 501 si lleva Transfer-Encoding, 400 si
+            Content-Length no es válido o se repite con valores distintos y 413
+            si supera max_body_size
+    """
+    lengths = set()
+    for line in head.split(b"\r\n")[1:]:
+        name, _, value = line.partition(b":")
+        name = name.strip().lower()
+        if name == b"transfer-encoding":
+            return 0, 501
+        if name == b"content-length":
+            lengths.add(value.strip())
+    if not lengths:
+        return 0, None
+    if len(lengths) > 1 or not next(iter(lengths)).isdigit():
+        return 0, 400
+    length = int(lengths.pop())
+    if length > max_body_size:
+        return 0, 413
+    return length, None
+
+
+class AsyncHTTPServer:
+    """
+    Servidor HTTP asíncrono con la misma interfaz que http.server.HTTPServer
+    (serve_forever, shutdown, server_close, server_address, server_port).
+
+    Atributos:
+        RequestHandlerClass: Clase manejadora de las peticiones
+        max_header_bytes: Tamaño máximo de la línea de petición más cabeceras que
+            se lee del socket (431 si se supera); los límites de cada parte los
+            aplica el manejador
+        max_body_size: Tamaño máximo del cuerpo de una petición, que se lee
+            entero en memoria (413 si Content-Length lo supera)
+        draining: True mientras se detiene el servidor (shutdown() espera a que
+            terminen de enviarse las respuestas en curso)
+    """
+
+    max_header_bytes = 65536
+    max_body_size = 1024 * 1024
+
+    def __init__(self, server_address, RequestHandlerClass, bind_and_activate=True):
+        """
+        Crea el socket de escucha (de forma síncrona, para conocer el puerto).
+
+        Args:
+            server_address: Tupla (host, puerto) donde escuchar
+            RequestHandlerClass: Clase manejadora de las peticiones
+            bind_and_activate (bool): Si es False no se enlaza el socket (igual
+                que en HTTPServer, por ejemplo para adoptar uno ya abierto)
+        """
+        self.RequestHandlerClass = RequestHandlerClass
+        if bind_and_activate:
+            self.socket = socket.create_server(server_address, backlog=1024)
+            self.server_address = self.socket.getsockname()[:2]
+        else:
+            self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self.server_address = server_address
+        host, self.server_port = self.server_address
+        self.server_name = socket.getfqdn(host)
+        self._loop = None
+        self._stop = None
+        self._shutdown_request = False
+        self._connections = set()
+        self._busy = set()
+        self.draining = False
+        self._is_shut_down = threading.Event()
+        self._is_shut_down.set()
+
+    def serve_forever(self, poll_interval=None):
+        """
+        Ejecuta el bucle de eventos hasta que se llame a shutdown().
+        """
+        self._is_shut_down.clear()
+        loop = asyncio.new_event_loop()
+        try:
+            self._stop = asyncio.Event()
+            self._loop = loop
+            loop.run_until_complete(self._serve())
+        finally:
+            self._loop = None
+            self._shutdown_request = False
+            loop.close()
+            self._is_shut_down.set()
+
+    def shutdown(self):
+        """
+        Detiene serve_forever() y espera a que termine. Se debe llamar desde
+        otro hilo, igual que en socketserver.
+        """
+        self._shutdown_request = True
+        loop = self._loop
+        if loop is not None:
+            loop.call_soon_threadsafe(self._stop.set)
+        self._is_shut_down.wait()
+
+    def server_close(self):
+        """
+        Cierra el socket de escucha.
+        """
+        self.socket.close()
+
+    async def _serve(self):
+        """
+        Acepta conexiones hasta que se solicite la parada y cierra las activas.
+        """
+        server = await asyncio.start_server(
+            self._handle_connection, sock=self.socket, limit=self.max_header_bytes
+        )
+        async with server:
+            if not self._shutdown_request:
+                await self._stop.wait()
+            server.close()
+            # Parada ordenada: se cancelan las conexiones que esperan la
+            # siguiente petición y se deja terminar a las que están enviando
+            # una respuesta (que cierran la conexión al acabar)
+            self.draining = True
+            tasks = list(self._connections)
+            for task in tasks:
+                if task not in self._busy:
+                    task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self.draining = False
+
+    async def _handle_connection(self, reader, writer):
+        """
+        Atiende todas las peticiones de una conexión (keep-alive incluido).
+        """
+        self._connections.add(asyncio.current_task())
+        handler = self._new_handler(writer.get_extra_info("peername"))
+        idle_timeout = getattr(handler, "timeout", None)
+        header_timeout = getattr(handler, "header_timeout", None)
+        read_timeout = getattr(handler, "read_timeout", None)
+        try:
+            while True:
+                # Inactividad: se espera el primer byte de la siguiente petición
+                try:
+                    first = await asyncio.wait_for(reader.readexactly(1), idle_timeout)
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+                    break
+                # Desde el primer byte, la petición tiene un plazo total (y el
+                # cuerpo, read_timeout); si no llega a tiempo o sus cabeceras
+                # no caben en el límite, se responde 408 o 431 y se cierra. Un
+                # cuerpo demasiado grande o sin longitud conocida no se lee
+                # (413, 400 o 501, ver _body_length)
+                rejection = None
+                try:
+                    head = first + await asyncio.wait_for(reader.readuntil(HEADER_END),
+                                                          header_timeout)
+                    length, rejection = _body_length(head, self.max_body_size)
+                    body = (await asyncio.wait_for(reader.readexactly(length), read_timeout)
+                            if length else b"")
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except asyncio.TimeoutError:
+                    rejection = 408
+                except asyncio.LimitOverrunError:
+                    rejection = 431
+
+                if rejection is None:
+                    output, close = self._run_handler(handler, head + body)
+                else:
+                    output, close = self._run_handler(handler, b"", reject=rejection)
+                if output:
+                    writer.write(output)
+                    self._busy.add(asyncio.current_task())
+                    try:
+                        await writer.drain()
+                    finally:
+                        self._busy.discard(asyncio.current_task())
+                take = getattr(handler, "detached", None)
+                if take is not None:
+                    # El manejador cede la conexión: cuando el transporte ha
+                    # enviado todo, se entrega un duplicado del socket y el
+                    # transporte cierra solo su descriptor
+                    writer.transport.set_write_buffer_limits(high=0)
+                    await writer.drain()
+                    take(writer.get_extra_info("socket").dup())
+                    break
+                if close or self.draining:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            self._connections.discard(asyncio.current_task())
+            if isinstance(handler, AppRequestHandler):
+                handler.close_connection_state()
+            writer.close()
+
+    def _new_handler(self, peername):
+        """
+        Crea una instancia del manejador sin socket asociado. Los atributos
+        son los que StreamRequestHandler prepararía en setup().
+        """
+        handler = self.RequestHandlerClass.__new__(self.RequestHandlerClass)
+        handler.request = None
+        handler.connection = None
+        handler.client_address = tuple(peername[:2]) if peername else ("", 0)
+        handler.server = self
+        if isinstance(handler, AppRequestHandler):
+            handler.init_connection_state()
+        return handler
+
+    def _run_handler(self, handler, raw_request, reject=None):
+        """
+        Procesa una petición completa con el manejador.
+
+        Args:
+            handler: Instancia del manejador asociada a la conexión
+            raw_request (bytes): Petición completa (línea, cabeceras y cuerpo)
+            reject (int, opcional): Código de error con el que responder sin
+                procesar la petición (ver AppRequestHandler.reject)
+
+        Returns:
+            tuple: (bytes a enviar al cliente, True si hay que cerrar la conexión)
+        """
+        handler.rfile = io.BytesIO(raw_request)
+        handler.wfile = io.BytesIO()
+        handler.close_connection = True
+        try:
+            if reject is None:
+                handler.handle_one_request()
+            elif isinstance(handler, AppRequestHandler):
+                handler.reject(reject)
+            else:
+                return b"", True
+        except Exception:
+            handler.log_error("Error procesando la petición en el motor asyncio")
+            return b"", True
+        return handler.wfile.getvalue(), handler.close_connection
@@ -0,0 +1,144 @@
+"""
+Tests para httpkit/aio.py
+Comprueban que el motor asyncio reutiliza la clase manejadora, mantiene las
+conexiones persistentes y atiende muchas conexiones inactivas a la vez.
+"""
+
+import http.client
+import json
+import socket
+
+import pytest
+
+from httpkit.aio import AsyncHTTPServer, _body_length
+from httpkit.handler import AppRequestHandler
+from httpkit.runner import ServerRunner
+from httpkit.servers import build_server
+
+
+class EchoPathHandler(AppRequestHandler):
+    """
+    Manejador mínimo que devuelve la ruta y la IP del cliente en JSON.
+    """
+
+    def do_GET(self):
+        if self.path == "/missing":
+            self.send_error(404, "Not Found")
+            return
+        body = json.dumps({"path": self.path, "ip": self.client_address[0]}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    """
+    Servidor asyncio en un puerto libre ejecutándose en otro hilo.
+    """
+    server = build_server(("127.0.0.1", 0), EchoPathHandler, mode="asyncio")
+    with ServerRunner(server):
+        yield server
+
+
+def test_body_length():
+    """
+    Se extrae Content-Length sin importar mayúsculas ni espacios, y se
+    rechazan los cuerpos que no se pueden leer.
+    """
+    head = b"POST / HTTP/1.1\r\nHost: x\r\ncontent-LENGTH:  12 \r\n\r\n"
+    assert _body_length(head, 100) == (12, None)
+    assert _body_length(b"GET / HTTP/1.1\r\nHost: x\r\n\r\n", 100) == (0, None)
+    assert _body_length(head, 10) == (0, 413)
+    assert _body_length(b"POST / HTTP/1.1\r\nContent-Length: -1\r\n\r\n", 100) == (0, 400)
+    assert _body_length(b"POST / HTTP/1.1\r\nContent-Length: 1\r\n"
+                        b"Content-Length: 2\r\n\r\n", 100) == (0, 400)
+    assert _body_length(b"POST / HTTP/1.1\r\nTransfer-Encoding: chunked\r\n\r\n",
+                        100) == (0, 501)
+
+
+@pytest.mark.parametrize("headers, status", [
+    (b"Content-Length: 10000000000\r\n", 413),
+    (b"Transfer-Encoding: chunked\r\n", 501),
+], ids=["too-large", "chunked"])
+def test_unreadable_body_is_rejected(server, headers, status):
+    """
+    Un cuerpo mayor que max_body_size o enviado por partes no se lee: se
+    responde con un error y se cierra la conexión.
+    """
+    with socket.create_connection(("127.0.0.1", server.server_port), timeout=2) as sock:
+        sock.sendall(b"POST /echo HTTP/1.1\r\nHost: x\r\n" + headers + b"\r\n" + b"x" * 100)
+        response = b""
+        while True:
+            data = sock.recv(65536)
+            if not data:
+                break
+            response += data
+    assert response.startswith(b"HTTP/1.1 %d " % status)
+    assert response.count(b"HTTP/1.1 ") == 1
+
+
+def test_build_server_asyncio():
+    """
+    El modo "asyncio" crea un AsyncHTTPServer ya enlazado a un puerto.
+    """
+    server = build_server(("127.0.0.1", 0), EchoPathHandler, mode="asyncio")
+    try:
+        assert isinstance(server, AsyncHTTPServer)
+        assert server.server_port > 0
+    finally:
+        server.server_close()
+
+
+def test_keep_alive_requests(server):
+    """
+    Varias peticiones (GET, POST y 404) por la misma conexión.
+    """
+    conn = http.client.HTTPConnection("127.0.0.1", server.server_port, timeout=2)
+    try:
+        conn.request("GET", "/hello")
+        response = conn.getresponse()
+        data = json.loads(response.read())
+        assert response.status == 200
+        assert data == {"path": "/hello", "ip": "127.0.0.1"}
+        sock = conn.sock
+
+        conn.request("POST", "/echo", body=b"payload")
+        response = conn.getresponse()
+        assert response.read() == b"payload"
+
+        conn.request("GET", "/missing")
+        response = conn.getresponse()
+        response.read()
+        assert response.status == 404
+        assert conn.sock is sock or conn.sock is None
+    finally:
+        conn.close()
+
+
+def test_many_idle_connections(server):
+    """
+    Cientos de conexiones abiertas sin enviar nada no impiden atender una petición.
+    """
+    idle = [socket.create_connection(("127.0.0.1", server.server_port)) for _ in range(300)]
+    try:
+        conn = http.client.HTTPConnection("127.0.0.1", server.server_port, timeout=2)
+        conn.request("GET", "/busy")
+        response = conn.getresponse()
+        assert response.status == 200
+        conn.close()
+    finally:
+        for sock in idle:
+            sock.close()
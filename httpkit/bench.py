@@ -0,0 +1,412 @@
+"""
+Banco de pruebas de carga para los servidores de los ejercicios (ej1a3, ej1b3).
+
+Arranca create_server() del ejercicio en un puerto libre, lanza un número
+configurable de clientes concurrentes (con o sin conexiones persistentes) y
+mide peticiones por segundo y latencias p50/p95/p99 por ruta. Puede comparar
+varios modos de servidor en una misma ejecución y compararse con una ejecución
+anterior guardada en JSON para detectar regresiones de rendimiento.
+
+Con --writes mide en cambio cuántas escrituras al socket (llamadas al sistema
+send/sendall/sendmsg) hace el manejador por respuesta y cuánto tarda en
+atenderla, con la escritura única de AppRequestHandler.write_response() y con
+el camino de http.server (cabeceras y cuerpo por separado).
+
+Uso:
+    python -m httpkit.bench --target ej1b3 --modes single threaded asyncio \\
+        --clients 8 --requests 200 --keep-alive both --output bench.json
+    python -m httpkit.bench --target ej1a3 --baseline bench.json --max-regression 0.15
+    python -m httpkit.bench --target ej1b3 --writes --requests 2000
+"""
+
+import argparse
+import http.client
+import importlib.util
+import json
+import math
+import os
+import socket
+import sys
+import threading
+import time
+
+from httpkit.runner import ServerRunner
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Ejercicios que se pueden medir: fichero y rutas por defecto
+TARGETS = {
+    "ej1a3": ("1a/ej1a3.py", ["/ip", "/nonexistent"]),
+    "ej1b3": ("1b/ej1b3.py", ["/time", "/nonexistent"]),
+}
+
+
+def load_target(name):
+    """
+    Carga el módulo de un ejercicio a partir de su ruta.
+
+    Args:
+        name (str): Clave de TARGETS
+
+    Returns:
+        module: El módulo del ejercicio (con create_server)
+    """
+    relative_path, _ = TARGETS[name]
+    spec = importlib.util.spec_from_file_location(name, os.path.join(ROOT_DIR, relative_path))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def percentile(sorted_values, fraction):
+    """
+    Percentil por el método del rango más cercano.
+
+    Args:
+        sorted_values (list): Valores ordenados de menor a mayor
+        fraction (float): Percentil entre 0 y 1 (0.95 para p95)
+
+    Returns:
+        float: El valor del percentil, o 0.0 si no hay valores
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(latencies, errors, elapsed):
+    """
+    Resume las latencias (en segundos) de una ruta.
+
+    Returns:
+        dict: requests, errors, rps y latencias en milisegundos
+    """
+    values = sorted(latencies)
+    return {
+        "requests": len(values),
+        "errors": errors,
+        "rps": len(values) / elapsed if elapsed > 0 else 0.0,
+        "p50_ms": percentile(values, 0.50) * 1000,
+        "p95_ms": percentile(values, 0.95) * 1000,
+        "p99_ms": percentile(values, 0.99) * 1000,
+        "max_ms": (values[-1] if values else 0.0) * 1000,
+    }
+
+
+class ServerUnderTest:
+    """
+    Servidor de un ejercicio ejecutándose en segundo plano en un puerto libre
+    (con ServerRunner, que avisa cuando ya acepta conexiones).
+    """
+
+    def __init__(self, create_server, **options):
+        """
+        Args:
+            create_server: Función create_server del ejercicio
+            **options: Opciones para create_server (mode, workers, processes...)
+        """
+        self.server = create_server(host="127.0.0.1", port=0, **options)
+        self.port = self.server.server_port
+        self._runner = ServerRunner(self.server)
+
+    def __enter__(self):
+        self._runner.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._runner.stop()
+
+
+def _client(port, routes, count, keep_alive, results, lock):
+    """
+    Cliente de carga: envía count peticiones repartidas entre las rutas.
+    """
+    latencies = {route: [] for route in routes}
+    errors = {route: 0 for route in routes}
+    headers = {} if keep_alive else {"Connection": "close"}
+    conn = None
+    for index in range(count):
+        route = routes[index % len(routes)]
+        start = time.perf_counter()
+        try:
+            if conn is None:
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+            conn.request("GET", route, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            latencies[route].append(time.perf_counter() - start)
+            if not keep_alive or response.will_close:
+                conn.close()
+                conn = None
+        except (OSError, http.client.HTTPException):
+            errors[route] += 1
+            if conn is not None:
+                conn.close()
+            conn = None
+    if conn is not None:
+        conn.close()
+    with lock:
+        for route in routes:
+            results[route][0].extend(latencies[route])
+            results[route][1] += errors[route]
+
+
+def run_load(port, routes, clients=8, requests_per_client=100, keep_alive=True):
+    """
+    Lanza la carga contra un servidor ya arrancado.
+
+    Args:
+        port (int): Puerto del servidor (en 127.0.0.1)
+        routes (list): Rutas a pedir, por turnos
+        clients (int): Número de clientes concurrentes
+        requests_per_client (int): Peticiones que envía cada cliente
+        keep_alive (bool): Reutilizar la conexión entre peticiones
+
+    Returns:
+        dict: {"total": resumen global, "routes": {ruta: resumen}}
+    """
+    results = {route: [[], 0] for route in routes}
+    lock = threading.Lock()
+    threads = [
+        threading.Thread(target=_client,
+                         args=(port, routes, requests_per_client, keep_alive, results, lock))
+        for _ in range(clients)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    all_latencies = [value for latencies, _ in results.values() for value in latencies]
+    all_errors = sum(errors for _, errors in results.values())
+    return {
+        "total": summarize(all_latencies, all_errors, elapsed),
+        "routes": {route: summarize(latencies, errors, elapsed)
+                   for route, (latencies, errors) in results.items()},
+    }
+
+
+def run_matrix(target, modes=("single",), keep_alive=(True, False), clients=8,
+               requests_per_client=100, routes=None, server_options=None):
+    """
+    Mide un ejercicio en cada combinación de modo de servidor y keep-alive.
+
+    Args:
+        target (str): Clave de TARGETS ("ej1a3" o "ej1b3")
+        modes (tuple): Modos de create_server a comparar
+        keep_alive (tuple): Valores de keep-alive a comparar
+        clients (int): Número de clientes concurrentes
+        requests_per_client (int): Peticiones por cliente
+        routes (list, opcional): Rutas a pedir (por defecto las de TARGETS)
+        server_options (dict, opcional): Opciones extra para create_server. Por
+            defecto se desactiva el registro de accesos (access_log=False), que
+            falsearía las medidas
+
+    Returns:
+        list: Un diccionario por combinación con target, mode, keep_alive y resultados
+    """
+    module = load_target(target)
+    routes = routes or TARGETS[target][1]
+    options = {"access_log": False, **(server_options or {})}
+    runs = []
+    for mode in modes:
+        for reuse in keep_alive:
+            with ServerUnderTest(module.create_server, mode=mode, **options) as sut:
+                result = run_load(sut.port, routes, clients, requests_per_client, reuse)
+            runs.append({"target": target, "mode": mode, "keep_alive": reuse, **result})
+    return runs
+
+
+class CountingSocket:
+    """
+    Envoltorio de un socket que cuenta las llamadas de escritura (una llamada
+    al sistema por cada una en un socket bloqueante con respuestas pequeñas).
+    """
+
+    def __init__(self, sock):
+        self._sock = sock
+        self.writes = 0
+
+    def send(self, data, *args):
+        self.writes += 1
+        return self._sock.send(data, *args)
+
+    def sendall(self, data, *args):
+        self.writes += 1
+        return self._sock.sendall(data, *args)
+
+    def sendmsg(self, buffers, *args):
+        self.writes += 1
+        return self._sock.sendmsg(buffers, *args)
+
+    def __getattr__(self, name):
+        return getattr(self._sock, name)
+
+
+def measure_writes(target, route, requests=1000, single_write=True):
+    """
+    Atiende requests peticiones seguidas por una conexión persistente con el
+    manejador del ejercicio y cuenta las escrituras al socket.
+
+    Las peticiones se envían de antemano (en cadena) y el manejador se ejecuta
+    en el hilo actual, sin servidor ni planificación de hilos de por medio.
+
+    Args:
+        target (str): Clave de TARGETS
+        route (str): Ruta a pedir
+        requests (int): Número de peticiones
+        single_write (bool): Valor de AppRequestHandler.single_write
+
+    Returns:
+        dict: single_write, writes_per_response y us_per_response
+    """
+    module = load_target(target)
+    server = module.create_server(host="127.0.0.1", port=0, access_log=False, metrics=False)
+    handler_class = type("BenchHandler", (server.RequestHandlerClass,), {
+        "single_write": single_write,
+        "max_keepalive_requests": requests + 1,
+    })
+    request = f"GET {route} HTTP/1.1\r\nHost: bench\r\n\r\n".encode()
+    last = f"GET {route} HTTP/1.1\r\nHost: bench\r\nConnection: close\r\n\r\n".encode()
+
+    client = socket.create_connection(server.server_address)
+    connection, address = server.socket.accept()
+    counting = CountingSocket(connection)
+
+    def send_requests():
+        client.sendall(request * (requests - 1) + last)
+
+    def drain():
+        while client.recv(65536):
+            pass
+
+    sender = threading.Thread(target=send_requests)
+    reader = threading.Thread(target=drain)
+    sender.start()
+    reader.start()
+    start = time.perf_counter()
+    try:
+        handler_class(counting, address, server)
+        elapsed = time.perf_counter() - start
+    finally:
+        connection.close()
+        sender.join()
+        reader.join()
+        client.close()
+        server.server_close()
+    return {
+        "single_write": single_write,
+        "writes_per_response": counting.writes / requests,
+        "us_per_response": elapsed / requests * 1e6,
+    }
+
+
+def format_writes_report(target, route, results):
+    """
+    Da formato de tabla a los resultados de measure_writes().
+    """
+    lines = [f"{'target':7} {'route':14} {'single_write':12} {'writes/resp':>11} {'us/resp':>9}"]
+    for result in results:
+        lines.append(f"{target:7} {route:14} {str(result['single_write']):12} "
+                     f"{result['writes_per_response']:11.2f} {result['us_per_response']:9.1f}")
+    return "\n".join(lines)
+
+
+def find_regressions(runs, baseline, max_regression=0.10):
+    """
+    Compara las RPS con una ejecución anterior.
+
+    Args:
+        runs (list): Resultado de run_matrix()
+        baseline (list): Resultado anterior de run_matrix() (por ejemplo, leído de JSON)
+        max_regression (float): Caída máxima tolerada (0.10 = 10 %)
+
+    Returns:
+        list: Mensajes, uno por combinación cuyo rendimiento ha empeorado
+    """
+    previous = {(run["target"], run["mode"], run["keep_alive"]): run for run in baseline}
+    problems = []
+    for run in runs:
+        before = previous.get((run["target"], run["mode"], run["keep_alive"]))
+        if before is None or before["total"]["rps"] <= 0:
+            continue
+        drop = 1 - run["total"]["rps"] / before["total"]["rps"]
+        if drop > max_regression:
+            problems.append(
+                f"{run['target']} mode={run['mode']} keep_alive={run['keep_alive']}: "
+                f"{before['total']['rps']:.0f} -> {run['total']['rps']:.0f} rps (-{drop:.0%})"
+            )
+    return problems
+
+
+def format_report(runs):
+    """
+    Da formato de tabla a los resultados.
+
+    Returns:
+        str: Una línea por combinación y ruta
+    """
+    lines = [f"{'target':7} {'mode':9} {'keepalive':9} {'route':14} {'rps':>9} "
+             f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>6}"]
+    for run in runs:
+        for route, stats in [("(total)", run["total"])] + list(run["routes"].items()):
+            lines.append(
+                f"{run['target']:7} {run['mode']:9} {str(run['keep_alive']):9} {route:14} "
+                f"{stats['rps']:9.0f} {stats['p50_ms']:8.2f} {stats['p95_ms']:8.2f} "
+                f"{stats['p99_ms']:8.2f} {stats['errors']:6d}"
+            )
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pruebas de carga de ej1a3/ej1b3")
+    parser.add_argument("--target", choices=sorted(TARGETS), default="ej1a3")
+    parser.add_argument("--modes", nargs="+", default=["single", "threaded", "asyncio"])
+    parser.add_argument("--keep-alive", choices=["on", "off", "both"], default="both")
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=200, help="peticiones por cliente")
+    parser.add_argument("--routes", nargs="+")
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--processes", type=int)
+    parser.add_argument("--output", help="guardar los resultados en este fichero JSON")
+    parser.add_argument("--baseline", help="fichero JSON de una ejecución anterior")
+    parser.add_argument("--max-regression", type=float, default=0.10)
+    parser.add_argument("--writes", action="store_true",
+                        help="contar las escrituras al socket por respuesta")
+    args = parser.parse_args(argv)
+
+    if args.writes:
+        route = (args.routes or TARGETS[args.target][1])[0]
+        results = [measure_writes(args.target, route, args.requests, single_write)
+                   for single_write in (False, True)]
+        print(format_writes_report(args.target, route, results))
+        if args.output:
+            with open(args.output, "w") as file:
+                json.dump(results, file, indent=2)
+        return 0
+
+    keep_alive = {"on": (True,), "off": (False,), "both": (True, False)}[args.keep_alive]
+    options = {key: value for key, value in
+               (("workers", args.workers), ("processes", args.processes)) if value}
+    runs = run_matrix(args.target, args.modes, keep_alive, args.clients, args.requests,
+                      args.routes, options)
+    print(format_report(runs))
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(runs, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            problems = find_regressions(runs, json.load(file), args.max_regression)
+        for problem in problems:
+            print(f"REGRESIÓN: {problem}", file=sys.stderr)
+        return 1 if problems else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
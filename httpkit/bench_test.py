@@ -0,0 +1,79 @@
+"""
+Tests para httpkit/bench.py
+Comprueban los percentiles, la detección de regresiones y una ejecución
+corta del banco de pruebas contra los dos servidores.
+"""
+
+import json
+
+from httpkit.bench import (find_regressions, format_report, main, measure_writes, percentile,
+                           run_matrix)
+
+
+def test_percentile_nearest_rank():
+    """
+    El percentil usa el método del rango más cercano.
+    """
+    values = list(range(1, 101))
+    assert percentile(values, 0.50) == 50
+    assert percentile(values, 0.95) == 95
+    assert percentile(values, 0.99) == 99
+    assert percentile([7], 0.99) == 7
+    assert percentile([], 0.5) == 0.0
+
+
+def test_find_regressions():
+    """
+    Solo se informa de las combinaciones que caen más de lo tolerado.
+    """
+    def run(mode, rps):
+        return {"target": "ej1a3", "mode": mode, "keep_alive": True, "total": {"rps": rps}}
+
+    baseline = [run("single", 1000), run("threaded", 1000)]
+    current = [run("single", 950), run("threaded", 700), run("asyncio", 10)]
+    problems = find_regressions(current, baseline, max_regression=0.10)
+    assert len(problems) == 1
+    assert "threaded" in problems[0]
+
+
+def test_run_matrix_both_targets():
+    """
+    Una ejecución corta mide cada ruta sin errores en varios modos.
+    """
+    for target, route in (("ej1a3", "/ip"), ("ej1b3", "/time")):
+        runs = run_matrix(target, modes=("threaded", "asyncio"), keep_alive=(True, False),
+                          clients=2, requests_per_client=10)
+        assert len(runs) == 4
+        for result in runs:
+            assert result["total"]["requests"] == 20
+            assert result["total"]["errors"] == 0
+            assert result["routes"][route]["requests"] == 10
+            assert result["total"]["p50_ms"] <= result["total"]["p99_ms"]
+        assert route in format_report(runs)
+
+
+def test_cli_baseline(tmp_path, capsys):
+    """
+    La línea de órdenes guarda el JSON y falla si hay regresión frente a la base.
+    """
+    output = tmp_path / "bench.json"
+    assert main(["--target", "ej1b3", "--modes", "asyncio", "--keep-alive", "on",
+                 "--clients", "1", "--requests", "5", "--output", str(output)]) == 0
+    runs = json.loads(output.read_text())
+    assert runs[0]["mode"] == "asyncio"
+
+    runs[0]["total"]["rps"] = 10 ** 9
+    output.write_text(json.dumps(runs))
+    assert main(["--target", "ej1b3", "--modes", "asyncio", "--keep-alive", "on",
+                 "--clients", "1", "--requests", "5", "--baseline", str(output)]) == 1
+    assert "REGRESIÓN" in capsys.readouterr().err
+
+
+def test_single_write_halves_socket_writes():
+    """
+    Con write_response() cada respuesta sale en una escritura en lugar de dos.
+    """
+    separate = measure_writes("ej1b3", "/time", requests=50, single_write=False)
+    single = measure_writes("ej1b3", "/time", requests=50, single_write=True)
+    assert separate["writes_per_response"] == 2
+    assert single["writes_per_response"] == 1
@@ -0,0 +1,177 @@
+"""
+Lectura acotada del cuerpo de las respuestas de requests.
+
+response.content y response.json() descargan el cuerpo entero en memoria antes
+de poder comprobar nada: un servidor que falla puede devolver megabytes de
+HTML en lugar del JSON esperado. Con la petición hecha con stream=True,
+read_body():
+
+- Rechaza la respuesta antes de leer el cuerpo si su Content-Type no es uno de
+  los esperados o si su Content-Length ya supera el máximo.
+- Lee el cuerpo por bloques contando los bytes recibidos (ya descomprimidos) y
+  aborta en cuanto se supera el máximo, de modo que la memoria usada por
+  petición nunca pasa de max_bytes más un bloque.
+
+Al rechazar una respuesta se cierra su conexión sin leer el resto del cuerpo.
+Las excepciones heredan de requests.RequestException, igual que los errores de
+lectura del propio requests (ChunkedEncodingError...), de modo que el código
+que ya captura los errores de requests las trata igual.
+
+Uso:
+    response = shared_client.get(url, stream=True)
+    data = read_json(response, max_bytes=256 * 1024)
+"""
+
+import json
+
+from requests.exceptions import RequestException
+
+# Tamaño máximo por defecto de un cuerpo
+MAX_BODY_BYTES = 1024 * 1024
+
+# Tamaño máximo del cuerpo que release() lee para devolver la conexión al grupo
+DRAIN_LIMIT = 64 * 1024
+
+CHUNK_SIZE = 16 * 1024
+
+JSON_TYPES = ("application/json", "text/json")
+
+
+class ResponseRejected(RequestException):
+    """
+    La respuesta se ha descartado sin leer su cuerpo entero.
+    """
+
+
+class UnexpectedContentType(ResponseRejected):
+    """
+    El Content-Type de la respuesta no es ninguno de los esperados.
+    """
+
+
+class BodyTooLarge(ResponseRejected):
+    """
+    El cuerpo de la respuesta supera el tamaño máximo.
+    """
+
+
+def media_type(response):
+    """
+    Devuelve el tipo de la cabecera Content-Type sin parámetros ("application/json").
+
+    Returns:
+        str: Tipo en minúsculas
+        None: Si la respuesta no tiene Content-Type
+    """
+    value = response.headers.get("Content-Type")
+    if not isinstance(value, str) or not value.strip():
+        return None
+    return value.split(";", 1)[0].strip().lower()
+
+
+def declared_length(response):
+    """
+    Devuelve el tamaño del cuerpo según la cabecera Content-Length.
+
+    Returns:
+        int: Bytes anunciados
+        None: Si la cabecera no existe o no es válida
+    """
+    value = response.headers.get("Content-Length")
+    if not isinstance(value, str) or not value.strip().isdigit():
+        return None
+    return int(value)
+
+
+def check_headers(response, max_bytes=MAX_BODY_BYTES, content_types=None):
+    """
+    Comprueba, sin leer el cuerpo, el Content-Type y el Content-Length de una
+    respuesta. Si la respuesta no los cumple se cierra.
+
+    Una respuesta sin Content-Type se acepta (el cliente puede examinar el
+    contenido); su tamaño lo limita en ese caso la lectura.
+
+    Args:
+        response (requests.Response): La respuesta
+        max_bytes (int): Tamaño máximo del cuerpo
+        content_types (tuple, opcional): Tipos aceptados (sin parámetros)
+
+    Raises:
+        UnexpectedContentType: Si el tipo no es ninguno de content_types
+        BodyTooLarge: Si Content-Length supera max_bytes
+    """
+    kind = media_type(response)
+    if content_types and kind is not None and kind not in content_types:
+        response.close()
+        raise UnexpectedContentType(
+            f"Content-Type inesperado: {kind} (se esperaba {', '.join(content_types)})",
+            response=response)
+    length = declared_length(response)
+    if length is not None and length > max_bytes:
+        response.close()
+        raise BodyTooLarge(f"El cuerpo anuncia {length} bytes (máximo {max_bytes})",
+                           response=response)
+
+
+def read_body(response, max_bytes=MAX_BODY_BYTES, content_types=None, chunk_size=CHUNK_SIZE):
+    """
+    Lee el cuerpo de una respuesta pedida con stream=True, sin pasar de max_bytes.
+
+    Args:
+        response (requests.Response): La respuesta
+        max_bytes (int): Tamaño máximo del cuerpo (ya descomprimido)
+        content_types (tuple, opcional): Tipos aceptados (ver check_headers())
+        chunk_size (int): Tamaño de los bloques de lectura
+
+    Returns:
+        bytes: El cuerpo
+
+    Raises:
+        UnexpectedContentType: Si el tipo no es ninguno de content_types
+        BodyTooLarge: Si el cuerpo supera max_bytes
+        RequestException: Si falla la lectura
+    """
+    check_headers(response, max_bytes, content_types)
+    body = bytearray()
+    try:
+        for chunk in response.iter_content(chunk_size):
+            body += chunk
+            if len(body) > max_bytes:
+                raise BodyTooLarge(f"El cuerpo supera el máximo de {max_bytes} bytes",
+                                   response=response)
+    except BaseException:
+        response.close()
+        raise
+    return bytes(body)
+
+
+def read_json(response, max_bytes=MAX_BODY_BYTES, content_types=JSON_TYPES,
+              chunk_size=CHUNK_SIZE):
+    """
+    Lee el cuerpo con read_body() y lo interpreta como JSON.
+
+    Returns:
+        El objeto JSON
+
+    Raises:
+        ValueError: Si el cuerpo no es JSON válido
+        ResponseRejected: Ver read_body()
+    """
+    body = read_body(response, max_bytes, content_types, chunk_size)
+    return json.loads(body)
+
+
+def release(response, max_bytes=DRAIN_LIMIT):
+    """
+    Descarta el cuerpo de una respuesta pedida con stream=True que no se va a
+    leer. Si anuncia un cuerpo pequeño se lee y la conexión vuelve al grupo;
+    si no, se cierra la conexión en lugar de descargar un cuerpo que no interesa.
+    """
+    length = declared_length(response)
+    if length is None or length > max_bytes:
+        response.close()
+        return
+    try:
+        read_body(response, max_bytes)
+    except RequestException:
+        pass
@@ -0,0 +1,128 @@
+"""
+Tests para httpkit/body.py
+Comprueban, contra un servidor local, que las respuestas con un Content-Type
+inesperado o demasiado grandes se rechazan sin descargar el cuerpo entero.
+"""
+
+import json
+
+import pytest
+import requests
+
+from httpkit.body import (BodyTooLarge, UnexpectedContentType, read_body, read_json, release)
+from httpkit.handler import AppRequestHandler
+from httpkit.runner import ServerRunner
+from httpkit.servers import build_server
+
+MIB = 1024 * 1024
+
+
+class UpstreamHandler(AppRequestHandler):
+    """
+    Servidor que se comporta bien (/json, /text) o mal (/html, /declared, /endless).
+    """
+
+    def do_GET(self):
+        if self.path == "/json":
+            self.send_body(200, json.dumps({"ok": True}).encode())
+        elif self.path == "/text":
+            self.send_body(404, b"Not Found", content_type="text/plain")
+        elif self.path == "/html":
+            self.send_body(500, b"<html>" + b"x" * MIB, content_type="text/html")
+        elif self.path == "/declared":
+            self.send_body(200, b"[" + b"0," * MIB + b"0]")
+        elif self.path == "/endless":
+            # Cuerpo sin Content-Length, mucho mayor que el máximo
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            chunk = b"0," * 8192
+            try:
+                for _ in range(1000):
+                    self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+                self.wfile.write(b"0\r\n\r\n")
+            except OSError:
+                pass
+            self.close_connection = True
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def base_url():
+    server = build_server(("127.0.0.1", 0), UpstreamHandler, mode="threaded", workers=8)
+    with ServerRunner(server) as runner:
+        yield runner.url
+
+
+@pytest.fixture
+def session():
+    with requests.Session() as session:
+        yield session
+
+
+def test_read_json(base_url, session):
+    response = session.get(f"{base_url}/json", stream=True)
+    assert read_json(response) == {"ok": True}
+
+
+def test_unexpected_content_type_is_not_read(base_url, session):
+    response = session.get(f"{base_url}/html", stream=True)
+    with pytest.raises(UnexpectedContentType) as info:
+        read_json(response)
+    assert info.value.response is response
+    assert not response._content_consumed
+
+
+def test_declared_length_over_limit(base_url, session):
+    response = session.get(f"{base_url}/declared", stream=True)
+    with pytest.raises(BodyTooLarge):
+        read_body(response, max_bytes=64 * 1024)
+    assert not response._content_consumed
+
+
+def test_body_is_counted_while_streaming(base_url, session):
+    """
+    Sin Content-Length la lectura se aborta en cuanto se supera el máximo.
+    """
+    response = session.get(f"{base_url}/endless", stream=True)
+    received = []
+    iter_content = response.iter_content
+
+    def counting(chunk_size):
+        for chunk in iter_content(chunk_size):
+            received.append(len(chunk))
+            yield chunk
+
+    response.iter_content = counting
+    with pytest.raises(BodyTooLarge):
+        read_body(response, max_bytes=100 * 1024, chunk_size=8192)
+    assert sum(received) <= 100 * 1024 + 8192
+
+
+def test_read_body_within_limit(base_url, session):
+    response = session.get(f"{base_url}/declared", stream=True)
+    body = read_body(response, max_bytes=4 * MIB)
+    assert len(body) == len(b"[" + b"0," * MIB + b"0]")
+
+
+def test_rejections_are_request_exceptions():
+    assert issubclass(BodyTooLarge, requests.RequestException)
+    assert issubclass(UnexpectedContentType, requests.RequestException)
+
+
+def test_release(base_url, session):
+    """
+    Un cuerpo pequeño se descarta leyéndolo; uno grande no se descarga.
+    """
+    small = session.get(f"{base_url}/text", stream=True)
+    release(small)
+    assert small._content_consumed
+
+    large = session.get(f"{base_url}/html", stream=True)
+    release(large)
+    assert not large._content_consumed
+    # La sesión sigue funcionando después de cerrar la conexión
+    assert session.get(f"{base_url}/json").json() == {"ok": True}
@@ -0,0 +1,242 @@
+"""
+Caché de respuestas ya serializadas.
+
+- PerSecondCache reutiliza el cuerpo codificado de una respuesta mientras no
+  cambie el segundo actual (por ejemplo /time, cuyo campo "readable" solo
+  cambia una vez por segundo).
+- JSONTemplate guarda un cuerpo JSON precodificado con huecos de texto, de
+  modo que los errores 404/405 solo necesitan concatenar bytes en lugar de
+  construir y serializar un diccionario en cada petición.
+- StaleWhileRevalidateCache guarda el resultado de una consulta lenta (por
+  ejemplo, la IP pública) durante ttl segundos y, cuando caduca, lo sigue
+  sirviendo mientras lo refresca en segundo plano.
+
+Todos llevan estadísticas de aciertos y fallos (CacheStats).
+"""
+
+import json
+import threading
+import time
+
+# Carácter de control que json.dumps() siempre escapa como \u0000: marca los
+# huecos en el JSON ya serializado
+_SLOT = "\x00"
+_ENCODED_SLOT = json.dumps(_SLOT)[1:-1]
+
+
+class CacheStats:
+    """
+    Contadores de aciertos y fallos de una caché, seguros entre hilos.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def hit(self):
+        with self._lock:
+            self.hits += 1
+
+    def miss(self):
+        with self._lock:
+            self.misses += 1
+
+    def snapshot(self):
+        """
+        Devuelve las estadísticas actuales.
+
+        Returns:
+            dict: hits, misses y hit_ratio (proporción de aciertos entre 0 y 1)
+        """
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        total = hits + misses
+        return {"hits": hits, "misses": misses, "hit_ratio": hits / total if total else 0.0}
+
+
+class PerSecondCache:
+    """
+    Cuerpo de respuesta que se recalcula como mucho una vez por segundo.
+
+    Atributos:
+        stats: Estadísticas de aciertos y fallos
+    """
+
+    def __init__(self, build, clock=time.time):
+        """
+        Args:
+            build: Función build(now) que devuelve el cuerpo (bytes) para el
+                instante now (segundos desde la época, como time.time())
+            clock: Función que devuelve el instante actual
+        """
+        self._build = build
+        self._clock = clock
+        self._entry = (None, b"")
+        self.stats = CacheStats()
+
+    def get(self):
+        """
+        Devuelve el cuerpo del segundo actual, construyéndolo si es necesario.
+
+        Returns:
+            bytes: Cuerpo codificado
+        """
+        now = self._clock()
+        second = int(now)
+        cached_second, body = self._entry
+        if cached_second == second:
+            self.stats.hit()
+            return body
+        self.stats.miss()
+        body = self._build(now)
+        # La tupla se sustituye de una vez: otro hilo nunca ve un estado a medias
+        self._entry = (second, body)
+        return body
+
+
+class JSONTemplate:
+    """
+    Cuerpo JSON precodificado con huecos de texto.
+
+    Ejemplo:
+        template = JSONTemplate({"code": 404, "message": "Recurso {} no encontrado"})
+        template.render("/nope")  # b'{"code": 404, "message": "Recurso /nope no encontrado"}'
+
+    Atributos:
+        stats: Estadísticas (cada render reutiliza la plantilla: cuenta como acierto)
+    """
+
+    def __init__(self, payload, slot="{}"):
+        """
+        Args:
+            payload (dict): Objeto JSON cuyos valores de texto contienen los huecos
+            slot (str): Marca de hueco dentro de los textos
+        """
+        marked = {
+            key: value.replace(slot, _SLOT) if isinstance(value, str) else value
+            for key, value in payload.items()
+        }
+        encoded = json.dumps(marked)
+        self._parts = [part.encode("ascii") for part in encoded.split(_ENCODED_SLOT)]
+        self.stats = CacheStats()
+        self.stats.miss()
+
+    def render(self, *values):
+        """
+        Rellena los huecos, en orden, con los textos dados.
+
+        Returns:
+            bytes: Cuerpo JSON equivalente a serializar el objeto con json.dumps()
+        """
+        self.stats.hit()
+        parts = self._parts
+        chunks = [parts[0]]
+        for value, part in zip(values, parts[1:]):
+            chunks.append(json.dumps(str(value))[1:-1].encode("ascii"))
+            chunks.append(part)
+        return b"".join(chunks)
+
+
+class StaleWhileRevalidateCache:
+    """
+    Resultado de una consulta que se sirve desde memoria y se refresca en
+    segundo plano cuando caduca (stale-while-revalidate).
+
+    - Mientras el valor es fresco (menos de ttl segundos) se devuelve sin más.
+    - Cuando caduca se sigue devolviendo de inmediato y se lanza un único
+      refresco en segundo plano, por muchos hilos que lo pidan a la vez.
+    - Si el refresco falla (la consulta lanza una excepción o devuelve None)
+      se conserva el último valor conocido y se reintenta pasados
+      retry_interval segundos.
+    - Solo la primera consulta (sin valor todavía) espera a la red; los hilos
+      que llegan mientras tanto esperan a esa misma consulta.
+
+    Atributos:
+        ttl: Segundos durante los que el valor es fresco
+        retry_interval: Segundos entre reintentos tras un refresco fallido
+        refreshes: Consultas realizadas
+        failures: Consultas fallidas
+        stats: Estadísticas de aciertos (valor servido desde memoria) y fallos
+    """
+
+    def __init__(self, fetch, ttl, retry_interval=None, clock=time.monotonic):
+        """
+        Args:
+            fetch: Función sin argumentos que hace la consulta y devuelve el
+                valor, o None si falla
+            ttl (float): Segundos durante los que el valor es fresco
+            retry_interval (float, opcional): Segundos entre reintentos tras un
+                fallo (por defecto, el menor entre ttl y 30)
+            clock: Función que devuelve el instante actual en segundos
+        """
+        self._fetch = fetch
+        self.ttl = ttl
+        self.retry_interval = retry_interval if retry_interval is not None else min(ttl, 30)
+        self._clock = clock
+        self._value = None
+        self._expires = 0.0
+        self._refreshing = None
+        self._lock = threading.Lock()
+        self.refreshes = 0
+        self.failures = 0
+        self.stats = CacheStats()
+
+    def get(self):
+        """
+        Devuelve el valor en memoria (fresco o caducado) o, si todavía no hay
+        ninguno, lo consulta.
+
+        Returns:
+            El valor, o None si nunca se ha podido obtener
+        """
+        value = self._value
+        if value is not None:
+            self.stats.hit()
+            if self._clock() >= self._expires:
+                done, owner = self._begin_refresh()
+                if owner:
+                    threading.Thread(target=self._refresh, args=(done,),
+                                     name="cache-refresh", daemon=True).start()
+            return value
+
+        self.stats.miss()
+        done, owner = self._begin_refresh()
+        if owner:
+            self._refresh(done)
+        else:
+            done.wait()
+        return self._value
+
+    def _begin_refresh(self):
+        """
+        Registra un refresco, salvo que ya haya uno en curso.
+
+        Returns:
+            tuple: (evento que se activa al terminar el refresco, True si le
+                toca hacerlo a quien llama)
+        """
+        with self._lock:
+            if self._refreshing is not None:
+                return self._refreshing, False
+            self._refreshing = threading.Event()
+            return self._refreshing, True
+
+    def _refresh(self, done):
+        """
+        Hace la consulta y guarda el resultado (o conserva el anterior si falla).
+        """
+        try:
+            value = self._fetch()
+        except Exception:
+            value = None
+        with self._lock:
+            self.refreshes += 1
+            if value is not None:
+                self._value = value
+                self._expires = self._clock() + self.ttl
+            else:
+                self.failures += 1
+                self._expires = self._clock() + self.retry_interval
+            self._refreshing = None
+        done.set()
@@ -0,0 +1,168 @@
+"""
+Tests para httpkit/cache.py
+Comprueban la reutilización del cuerpo por segundo, las plantillas JSON, la
+caché stale-while-revalidate y las estadísticas de aciertos y fallos.
+"""
+
+import json
+import threading
+
+from httpkit.cache import CacheStats, JSONTemplate, PerSecondCache, StaleWhileRevalidateCache
+
+
+class FakeClock:
+    """
+    Reloj controlable para los tests.
+    """
+
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_per_second_cache_reuses_body():
+    """
+    Dentro del mismo segundo se reutiliza el cuerpo; al cambiar, se reconstruye.
+    """
+    clock = FakeClock(1000.2)
+    built = []
+
+    def build(now):
+        built.append(now)
+        return str(int(now)).encode()
+
+    cache = PerSecondCache(build, clock=clock)
+    assert cache.get() == b"1000"
+    clock.now = 1000.9
+    assert cache.get() == b"1000"
+    clock.now = 1001.1
+    assert cache.get() == b"1001"
+
+    assert built == [1000.2, 1001.1]
+    assert cache.stats.snapshot() == {"hits": 1, "misses": 2, "hit_ratio": 1 / 3}
+
+
+def test_json_template_matches_json_dumps():
+    """
+    La plantilla produce exactamente los mismos bytes que json.dumps().
+    """
+    template = JSONTemplate({"code": 405, "message": "Método {} no permitido en {}"})
+    body = template.render("POST", '/ruta "rara" ñ')
+    expected = json.dumps({"code": 405, "message": 'Método POST no permitido en /ruta "rara" ñ'})
+    assert body == expected.encode()
+    assert json.loads(body)["code"] == 405
+
+
+def test_json_template_stats():
+    """
+    La plantilla se construye una vez (fallo) y cada render es un acierto.
+    """
+    template = JSONTemplate({"code": 404, "message": "Recurso {} no encontrado"})
+    for path in ("/a", "/b", "/c"):
+        template.render(path)
+    assert template.stats.snapshot()["hits"] == 3
+    assert template.stats.snapshot()["misses"] == 1
+
+
+def test_empty_stats():
+    """
+    Sin accesos la proporción de aciertos es 0.
+    """
+    assert CacheStats().snapshot() == {"hits": 0, "misses": 0, "hit_ratio": 0.0}
+
+
+class SlowFetch:
+    """
+    Consulta que espera a que el test la libere y devuelve los valores dados.
+    """
+
+    def __init__(self, *values):
+        self.values = list(values)
+        self.calls = 0
+        self.release = threading.Event()
+
+    def __call__(self):
+        self.calls += 1
+        self.release.wait(2)
+        value = self.values.pop(0)
+        if isinstance(value, Exception):
+            raise value
+        return value
+
+
+def test_swr_fresh_value_is_served_from_memory():
+    clock = FakeClock(0)
+    fetch = SlowFetch("1.1.1.1")
+    fetch.release.set()
+    cache = StaleWhileRevalidateCache(fetch, ttl=60, clock=clock)
+    assert cache.get() == "1.1.1.1"
+    clock.now = 59
+    assert cache.get() == "1.1.1.1"
+    assert fetch.calls == 1
+    assert cache.stats.snapshot()["hits"] == 1
+
+
+def test_swr_first_fetch_is_coalesced():
+    """
+    Los hilos que piden el valor antes de tenerlo esperan a una única consulta.
+    """
+    fetch = SlowFetch("1.1.1.1")
+    cache = StaleWhileRevalidateCache(fetch, ttl=60)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get())) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    fetch.release.set()
+    for thread in threads:
+        thread.join(2)
+    assert results == ["1.1.1.1"] * 5
+    assert fetch.calls == 1
+
+
+def test_swr_stale_value_is_served_while_refreshing():
+    """
+    Un valor caducado se devuelve de inmediato y se refresca una sola vez en
+    segundo plano.
+    """
+    clock = FakeClock(0)
+    fetch = SlowFetch("1.1.1.1", "2.2.2.2")
+    fetch.release.set()
+    cache = StaleWhileRevalidateCache(fetch, ttl=60, clock=clock)
+    cache.get()
+
+    fetch.release.clear()
+    clock.now = 61
+    assert [cache.get() for _ in range(3)] == ["1.1.1.1"] * 3
+    done = cache._refreshing
+    fetch.release.set()
+    done.wait(2)
+    assert cache.get() == "2.2.2.2"
+    assert fetch.calls == 2
+
+
+def test_swr_keeps_last_value_on_failure():
+    clock = FakeClock(0)
+    fetch = SlowFetch("1.1.1.1", None, ConnectionError("sin red"), "3.3.3.3")
+    fetch.release.set()
+    cache = StaleWhileRevalidateCache(fetch, ttl=60, retry_interval=5, clock=clock)
+    cache.get()
+
+    for now in (61, 67, 73):
+        clock.now = now
+        value = cache.get()
+        refreshing = cache._refreshing
+        if refreshing is not None:
+            refreshing.wait(2)
+        assert value in ("1.1.1.1", "3.3.3.3")
+    assert cache.failures == 2
+    assert cache.get() == "3.3.3.3"
+
+
+def test_swr_without_value_returns_none_on_failure():
+    fetch = SlowFetch(None, "1.1.1.1")
+    fetch.release.set()
+    cache = StaleWhileRevalidateCache(fetch, ttl=60)
+    assert cache.get() is None
+    assert cache.get() == "1.1.1.1"
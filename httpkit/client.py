@@ -0,0 +1,141 @@
+"""
+Cliente HTTP compartido con conexiones persistentes para los ejercicios.
+
+requests.get() crea una sesión nueva en cada llamada: cada petición abre su
+propia conexión TCP y repite el saludo TLS, y sin timeout una petición a un
+servidor que no responde puede quedarse esperando indefinidamente.
+PooledClient en cambio:
+
+- Reutiliza las conexiones: todas las sesiones del cliente montan el mismo
+  HTTPAdapter, cuyo grupo de conexiones (urllib3) mantiene abiertas las
+  conexiones ya establecidas para las siguientes peticiones.
+- Es seguro entre hilos: cada hilo usa su propia requests.Session (cabeceras y
+  cookies no se comparten), pero todas comparten el grupo de conexiones, que sí
+  está preparado para usarse desde varios hilos.
+- Aplica un timeout por defecto (conexión y lectura) a todas las peticiones.
+
+Las sesiones y el adaptador se crean de nuevo en cada proceso, de modo que un
+proceso hijo (fork) nunca reutiliza los sockets del padre.
+
+Uso:
+    from httpkit.client import shared_client
+
+    response = shared_client.get("https://api.ipify.org")
+"""
+
+import os
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# (conexión, lectura) en segundos; 3.05 está justo por encima del tiempo de
+# retransmisión del primer SYN (3 s), como recomienda la documentación de requests
+DEFAULT_TIMEOUT = (3.05, 10)
+
+
+class PooledClient:
+    """
+    Cliente HTTP con un grupo de conexiones compartido entre hilos.
+
+    Atributos:
+        pool_connections: Número de hosts distintos cuyas conexiones se guardan
+        pool_maxsize: Conexiones guardadas como máximo por host (una por hilo
+            concurrente que consulte ese host)
+        timeout: Timeout por defecto: segundos o tupla (conexión, lectura)
+    """
+
+    def __init__(self, pool_connections=10, pool_maxsize=10, timeout=DEFAULT_TIMEOUT):
+        """
+        Args:
+            pool_connections (int): Número de hosts distintos cuyas conexiones se guardan
+            pool_maxsize (int): Conexiones guardadas como máximo por host
+            timeout (float o tuple): Timeout por defecto de las peticiones
+        """
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._pid = None
+        self._adapter = None
+        self._local = threading.local()
+
+    def session(self):
+        """
+        Devuelve la sesión del hilo actual (creándola si hace falta).
+
+        Returns:
+            requests.Session: Sesión que usa el grupo de conexiones compartido
+        """
+        session = getattr(self._local, "session", None)
+        if session is None or self._local.pid != os.getpid():
+            session = requests.Session()
+            adapter = self._shared_adapter()
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            self._local.session = session
+            self._local.pid = os.getpid()
+        return session
+
+    def request(self, method, url, **kwargs):
+        """
+        Realiza una petición con la sesión del hilo y el timeout por defecto
+        (salvo que se indique otro).
+
+        Args:
+            method (str): Método HTTP
+            url (str): URL de la petición
+            **kwargs: Argumentos de requests.Session.request()
+
+        Returns:
+            requests.Response: La respuesta
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        return self.session().request(method, url, **kwargs)
+
+    def get(self, url, **kwargs):
+        """
+        Realiza una petición GET (ver request()).
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        return self.session().get(url, **kwargs)
+
+    def configure(self, pool_connections=None, pool_maxsize=None, timeout=None):
+        """
+        Cambia el tamaño del grupo de conexiones o el timeout por defecto. Si
+        cambia el grupo, las conexiones abiertas se cierran y las sesiones se
+        crean de nuevo en su siguiente uso.
+        """
+        if timeout is not None:
+            self.timeout = timeout
+        if pool_connections is None and pool_maxsize is None:
+            return
+        self.pool_connections = pool_connections or self.pool_connections
+        self.pool_maxsize = pool_maxsize or self.pool_maxsize
+        self.close()
+
+    def close(self):
+        """
+        Cierra las conexiones guardadas. Las sesiones se crean de nuevo en su
+        siguiente uso.
+        """
+        with self._lock:
+            adapter, self._adapter, self._pid = self._adapter, None, None
+            self._local = threading.local()
+        if adapter is not None:
+            adapter.close()
+
+    def _shared_adapter(self):
+        """
+        Devuelve el adaptador (grupo de conexiones) del proceso actual.
+        """
+        with self._lock:
+            if self._pid != os.getpid():
+                self._adapter = HTTPAdapter(pool_connections=self.pool_connections,
+                                            pool_maxsize=self.pool_maxsize)
+                self._pid = os.getpid()
+            return self._adapter
+
+
+# Cliente compartido por las funciones de los ejercicios
+shared_client = PooledClient()
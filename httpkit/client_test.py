@@ -0,0 +1,81 @@
+"""
+Tests para httpkit/client.py
+Comprueban que las peticiones reutilizan la conexión, que las sesiones son
+por hilo pero comparten el grupo de conexiones, y el timeout por defecto.
+"""
+
+import threading
+
+import pytest
+
+from httpkit.client import DEFAULT_TIMEOUT, PooledClient
+from httpkit.handler import AppRequestHandler
+from httpkit.runner import ServerRunner
+from httpkit.servers import build_server
+
+
+class PeerHandler(AppRequestHandler):
+    """
+    Responde con el puerto de origen del cliente: si se repite, la conexión
+    se ha reutilizado.
+    """
+
+    def do_GET(self):
+        self.send_json(200, {"port": self.client_address[1]})
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def url():
+    server = build_server(("127.0.0.1", 0), PeerHandler, mode="threaded", workers=4)
+    with ServerRunner(server) as runner:
+        yield runner.url
+
+
+def test_connection_is_reused(url):
+    client = PooledClient()
+    ports = {client.get(url).json()["port"] for _ in range(5)}
+    assert len(ports) == 1, "Las peticiones deben viajar por la misma conexión"
+    client.close()
+
+
+def test_sessions_per_thread_share_the_pool(url):
+    """
+    Cada hilo tiene su propia sesión, pero todas usan el mismo adaptador.
+    """
+    client = PooledClient(pool_maxsize=4)
+    sessions = []
+
+    def worker():
+        client.get(url)
+        sessions.append(client.session())
+
+    threads = [threading.Thread(target=worker) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len({id(session) for session in sessions}) == 3
+    assert len({id(session.get_adapter(url)) for session in sessions}) == 1
+    client.close()
+
+
+def test_default_timeout(monkeypatch):
+    client = PooledClient()
+    calls = []
+    monkeypatch.setattr(client.session(), "get", lambda url, **kwargs: calls.append(kwargs))
+    client.get("http://example.invalid/")
+    client.get("http://example.invalid/", timeout=1)
+    assert calls == [{"timeout": DEFAULT_TIMEOUT}, {"timeout": 1}]
+
+
+def test_configure_recreates_pool(url):
+    client = PooledClient()
+    session = client.session()
+    client.configure(pool_maxsize=2, timeout=5)
+    assert client.timeout == 5
+    assert client.session() is not session
+    assert client.session().get_adapter(url)._pool_maxsize == 2
+    client.close()
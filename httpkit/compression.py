@@ -0,0 +1,153 @@
+"""
+Compresión de respuestas negociada con Accept-Encoding.
+
+- negotiate() elige la codificación (gzip o deflate) según la cabecera
+  Accept-Encoding del cliente, respetando los valores q.
+- CompressedBodyCache guarda las variantes comprimidas de los cuerpos que
+  quien responde marca como reutilizables (el de /time durante todo un
+  segundo, los errores precodificados), con un límite de entradas (LRU), de
+  modo que se comprimen una sola vez. Los demás cuerpos (una respuesta JSON
+  generada en cada petición, /metrics) cambian casi siempre: guardarlos solo
+  desplazaría a los que sí se repiten, así que se comprimen directamente.
+
+gzip se genera con mtime=0, de modo que un mismo cuerpo produce siempre los
+mismos bytes comprimidos.
+"""
+
+import gzip
+import threading
+import zlib
+from collections import OrderedDict
+
+from httpkit.cache import CacheStats
+
+# Orden de preferencia cuando el cliente acepta varias con el mismo valor q
+ENCODINGS = ("gzip", "deflate")
+
+# Tipos de contenido que merece la pena comprimir (texto)
+COMPRESSIBLE_TYPES = ("application/json", "text/")
+
+
+def is_compressible(content_type):
+    """
+    Indica si un tipo de contenido es texto y, por tanto, se comprime bien.
+    """
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+def negotiate(accept_encoding):
+    """
+    Elige la codificación de la respuesta.
+
+    Args:
+        accept_encoding (str): Valor de la cabecera Accept-Encoding (o None)
+
+    Returns:
+        str: "gzip", "deflate" o None para enviar el cuerpo sin comprimir
+    """
+    if not accept_encoding:
+        return None
+    weights = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.partition(";")
+        name = name.strip().lower()
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        weights[name] = quality
+
+    best, best_quality = None, 0.0
+    for encoding in ENCODINGS:
+        quality = weights.get(encoding, weights.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress(body, encoding, level=6):
+    """
+    Comprime un cuerpo con la codificación indicada.
+
+    Args:
+        body (bytes): Cuerpo sin comprimir
+        encoding (str): "gzip" o "deflate" (formato zlib, como exige HTTP)
+        level (int): Nivel de compresión de 1 a 9
+
+    Returns:
+        bytes: Cuerpo comprimido
+    """
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=level, mtime=0)
+    if encoding == "deflate":
+        return zlib.compress(body, level)
+    raise ValueError(f"Codificación no soportada: {encoding!r}")
+
+
+class CompressedBodyCache:
+    """
+    Caché LRU de cuerpos comprimidos, segura entre hilos.
+
+    La clave es el propio cuerpo (bytes), cuyo hash Python calcula una sola vez
+    por objeto: reutilizar el mismo objeto bytes (como hacen PerSecondCache o
+    las constantes de error) hace la búsqueda prácticamente gratuita. Solo
+    deben guardarse cuerpos que se vayan a enviar muchas veces.
+
+    Atributos:
+        max_entries: Número máximo de variantes guardadas
+        max_body_size: Los cuerpos mayores se comprimen sin guardarse
+        stats: Estadísticas de aciertos y fallos
+    """
+
+    def __init__(self, max_entries=256, max_body_size=1024 * 1024, level=6):
+        """
+        Args:
+            max_entries (int): Número máximo de variantes guardadas
+            max_body_size (int): Tamaño máximo de un cuerpo para guardarlo
+            level (int): Nivel de compresión de 1 a 9
+        """
+        self.max_entries = max_entries
+        self.max_body_size = max_body_size
+        self.level = level
+        self.stats = CacheStats()
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, body, encoding):
+        """
+        Devuelve el cuerpo comprimido, comprimiéndolo solo si no estaba guardado.
+
+        Args:
+            body (bytes): Cuerpo sin comprimir
+            encoding (str): "gzip" o "deflate"
+
+        Returns:
+            bytes: Cuerpo comprimido
+        """
+        if len(body) > self.max_body_size:
+            self.stats.miss()
+            return compress(body, encoding, self.level)
+        key = (encoding, body)
+        with self._lock:
+            compressed = self._entries.get(key)
+            if compressed is not None:
+                self._entries.move_to_end(key)
+        if compressed is not None:
+            self.stats.hit()
+            return compressed
+
+        # Se comprime fuera del candado para no bloquear a los demás hilos
+        self.stats.miss()
+        compressed = compress(body, encoding, self.level)
+        with self._lock:
+            self._entries[key] = compressed
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return compressed
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
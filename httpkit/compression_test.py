@@ -0,0 +1,82 @@
+"""
+Tests para httpkit/compression.py
+Comprueban la negociación de Accept-Encoding, la compresión y la caché de
+cuerpos comprimidos.
+"""
+
+import gzip
+import zlib
+
+import pytest
+
+from httpkit.compression import CompressedBodyCache, compress, is_compressible, negotiate
+
+
+@pytest.mark.parametrize("header, expected", [
+    (None, None),
+    ("", None),
+    ("gzip", "gzip"),
+    ("deflate", "deflate"),
+    ("gzip, deflate, br", "gzip"),
+    ("deflate;q=1.0, gzip;q=0.5", "deflate"),
+    ("gzip;q=0, deflate", "deflate"),
+    ("gzip;q=0", None),
+    ("identity", None),
+    ("*", "gzip"),
+    ("*;q=0.1, gzip;q=0", "deflate"),
+    ("br", None),
+])
+def test_negotiate(header, expected):
+    """
+    Se elige la codificación con mayor q, prefiriendo gzip en caso de empate.
+    """
+    assert negotiate(header) == expected
+
+
+def test_compress_round_trip():
+    """
+    gzip y deflate (formato zlib) se pueden descomprimir y son deterministas.
+    """
+    body = b'{"data": "' + b"x" * 4000 + b'"}'
+    assert gzip.decompress(compress(body, "gzip")) == body
+    assert zlib.decompress(compress(body, "deflate")) == body
+    assert compress(body, "gzip") == compress(body, "gzip")
+    with pytest.raises(ValueError):
+        compress(body, "br")
+
+
+def test_is_compressible():
+    assert is_compressible("application/json")
+    assert is_compressible("text/plain; charset=utf-8")
+    assert not is_compressible("image/png")
+
+
+def test_cache_reuses_compressed_body():
+    """
+    El mismo cuerpo solo se comprime una vez por codificación.
+    """
+    cache = CompressedBodyCache()
+    body = b"a" * 2000
+    first = cache.get(body, "gzip")
+    assert cache.get(body, "gzip") is first
+    assert cache.get(bytes(body), "gzip") is first
+    cache.get(body, "deflate")
+    assert cache.stats.snapshot()["hits"] == 2
+    assert cache.stats.snapshot()["misses"] == 2
+
+
+def test_cache_is_bounded():
+    """
+    Al superar max_entries se descarta la variante usada hace más tiempo, y
+    los cuerpos demasiado grandes no se guardan.
+    """
+    cache = CompressedBodyCache(max_entries=2, max_body_size=100)
+    cache.get(b"1" * 50, "gzip")
+    cache.get(b"2" * 50, "gzip")
+    cache.get(b"1" * 50, "gzip")
+    cache.get(b"3" * 50, "gzip")
+    assert len(cache._entries) == 2
+    assert ("gzip", b"2" * 50) not in cache._entries
+
+    cache.get(b"4" * 200, "gzip")
+    assert ("gzip", b"4" * 200) not in cache._entries
@@ -0,0 +1,246 @@
+"""
+Enriquecimiento GeoIP local para el endpoint /ip.
+
+La base de datos es un fichero binario con un árbol de prefijos (radix binario)
+para IPv4 y otro para IPv6. El fichero se proyecta en memoria con mmap: no se
+analiza nada al arrancar ni en cada petición, y al ser una proyección de solo
+lectura el sistema comparte las mismas páginas entre todos los procesos
+trabajadores del modo pre-fork.
+
+Formato del fichero (enteros sin signo de 32 bits, little-endian):
+
+    cabecera   MAGIC, nº nodos, nº registros, raíz IPv4, raíz IPv6
+    nodos      nº nodos × (hijo 0, hijo 1)
+    registros  nº registros × (desplazamiento, longitud) dentro del bloque JSON
+    bloque     registros codificados en JSON (UTF-8)
+
+Cada hijo es EMPTY (sin datos), un índice de nodo o LEAF_FLAG | índice de
+registro. La búsqueda recorre un bit de la dirección por nivel. Las
+direcciones consultadas recientemente se guardan además en una caché LRU por
+proceso, porque los clientes que sondean /ip repiten siempre la misma IP.
+
+Uso:
+    python -m httpkit.geoip build redes.csv geoip.db   (columnas network,country,asn)
+"""
+
+import csv
+import ipaddress
+import json
+import mmap
+import socket
+import struct
+import sys
+from functools import lru_cache
+
+MAGIC = b"HKGEO1\0\0"
+HEADER = struct.Struct("<8s4I")
+EMPTY = 0xFFFFFFFF
+LEAF_FLAG = 0x80000000
+_IPV4_MAPPED_PREFIX = b"\0" * 10 + b"\xff\xff"
+
+
+def build_database(entries, path):
+    """
+    Escribe una base de datos GeoIP a partir de redes y sus datos.
+
+    Las redes más específicas tienen prioridad sobre las que las contienen,
+    sin importar el orden de entrada.
+
+    Args:
+        entries: Iterable de pares (red, registro), p. ej. ("8.8.8.0/24",
+            {"country": "US", "asn": 15169})
+        path (str): Fichero de salida
+    """
+    nodes = []
+    records = []
+    record_index = {}
+
+    def new_node():
+        nodes.append([EMPTY, EMPTY])
+        return len(nodes) - 1
+
+    roots = {4: new_node(), 6: new_node()}
+    networks = sorted(
+        ((ipaddress.ip_network(network, strict=False), record) for network, record in entries),
+        key=lambda item: (item[0].version, item[0].prefixlen),
+    )
+    for network, record in networks:
+        encoded = json.dumps(record, sort_keys=True, separators=(",", ":")).encode("utf-8")
+        if encoded not in record_index:
+            record_index[encoded] = len(records)
+            records.append(encoded)
+        leaf = LEAF_FLAG | record_index[encoded]
+
+        bits = network.max_prefixlen
+        value = int(network.network_address)
+        node = roots[network.version]
+        if network.prefixlen == 0:
+            # Red por defecto: ambas ramas de la raíz (sin pisar nodos ya creados)
+            for side in (0, 1):
+                if nodes[node][side] == EMPTY or nodes[node][side] & LEAF_FLAG:
+                    nodes[node][side] = leaf
+            continue
+        for depth in range(network.prefixlen - 1):
+            bit = (value >> (bits - 1 - depth)) & 1
+            child = nodes[node][bit]
+            if child == EMPTY or child & LEAF_FLAG:
+                # Se baja la hoja de la red menos específica un nivel
+                created = new_node()
+                nodes[created] = [child, child]
+                nodes[node][bit] = created
+                child = created
+            node = child
+        nodes[node][(value >> (bits - network.prefixlen)) & 1] = leaf
+
+    blob = b"".join(records)
+    with open(path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, len(nodes), len(records), roots[4], roots[6]))
+        file.write(struct.pack(f"<{len(nodes) * 2}I", *(child for node in nodes for child in node)))
+        offset = 0
+        table = []
+        for encoded in records:
+            table.extend((offset, len(encoded)))
+            offset += len(encoded)
+        file.write(struct.pack(f"<{len(table)}I", *table))
+        file.write(blob)
+
+
+class _LittleEndianWords:
+    """
+    Acceso a enteros little-endian en sistemas big-endian (donde no sirve
+    memoryview.cast()).
+    """
+
+    def __init__(self, buffer, offset):
+        self._buffer = buffer
+        self._offset = offset
+
+    def __getitem__(self, index):
+        return struct.unpack_from("<I", self._buffer, self._offset + index * 4)[0]
+
+
+class GeoIPDatabase:
+    """
+    Base de datos GeoIP proyectada en memoria.
+
+    Atributos:
+        path: Fichero de la base de datos
+        node_count: Número de nodos del árbol
+        record_count: Número de registros distintos
+    """
+
+    def __init__(self, path, cache_size=4096):
+        """
+        Args:
+            path (str): Fichero generado con build_database()
+            cache_size (int): Direcciones recientes que se recuerdan por proceso
+
+        Raises:
+            ValueError: Si el fichero no es una base de datos válida
+        """
+        self.path = path
+        with open(path, "rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mmap) < HEADER.size:
+            self._invalid("es más corto que la cabecera")
+        magic, self.node_count, self.record_count, root4, root6 = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC:
+            self._invalid("no empieza por la marca de GeoIP")
+        self._roots = {4: (root4, 32), 6: (root6, 128)}
+
+        nodes_offset = HEADER.size
+        table_offset = nodes_offset + self.node_count * 8
+        self._blob_offset = table_offset + self.record_count * 8
+        if len(self._mmap) < self._blob_offset:
+            # Un fichero truncado: las vistas quedarían recortadas sin aviso
+            self._invalid("está truncado")
+        if sys.byteorder == "little":
+            view = memoryview(self._mmap)
+            self._nodes = view[nodes_offset:table_offset].cast("I")
+            self._table = view[table_offset:self._blob_offset].cast("I")
+        else:
+            self._nodes = _LittleEndianWords(self._mmap, nodes_offset)
+            self._table = _LittleEndianWords(self._mmap, table_offset)
+        self._records = {}
+        self.lookup = lru_cache(maxsize=cache_size)(self._lookup)
+
+    def _invalid(self, reason):
+        """
+        Libera la proyección en memoria y rechaza el fichero.
+        """
+        self._mmap.close()
+        raise ValueError(f"{self.path} no es una base de datos GeoIP válida: {reason}")
+
+    def close(self):
+        """
+        Libera la proyección en memoria.
+        """
+        self.lookup.cache_clear()
+        for view in (self._nodes, self._table):
+            if isinstance(view, memoryview):
+                view.release()
+        self._mmap.close()
+
+    def _lookup(self, ip):
+        """
+        Busca los datos de una dirección (accesible como lookup(ip), con caché).
+
+        Args:
+            ip (str): Dirección IPv4 o IPv6
+
+        Returns:
+            dict: Datos de la red más específica que contiene la dirección, o
+                None si no hay ninguna o la dirección no es válida
+        """
+        # inet_pton es bastante más rápido que ipaddress.ip_address()
+        try:
+            if ":" in ip:
+                packed = socket.inet_pton(socket.AF_INET6, ip)
+                if packed[:12] == _IPV4_MAPPED_PREFIX:
+                    packed = packed[12:]
+            else:
+                packed = socket.inet_pton(socket.AF_INET, ip)
+        except (OSError, ValueError):
+            return None
+        node, bits = self._roots[4 if len(packed) == 4 else 6]
+        value = int.from_bytes(packed, "big")
+        nodes = self._nodes
+        for shift in range(bits - 1, -1, -1):
+            child = nodes[node * 2 + ((value >> shift) & 1)]
+            if child == EMPTY:
+                return None
+            if child & LEAF_FLAG:
+                return self._record(child & ~LEAF_FLAG)
+            node = child
+        return None
+
+    def _record(self, index):
+        """
+        Decodifica (una sola vez por proceso) el registro número index.
+        """
+        record = self._records.get(index)
+        if record is None:
+            offset, length = self._table[index * 2], self._table[index * 2 + 1]
+            start = self._blob_offset + offset
+            record = json.loads(self._mmap[start:start + length])
+            self._records[index] = record
+        return record
+
+
+def build_from_csv(csv_path, path):
+    """
+    Genera la base de datos a partir de un CSV con columnas network, country y asn.
+    """
+    with open(csv_path, newline="") as file:
+        entries = [
+            (row["network"], {"country": row["country"], "asn": int(row["asn"])})
+            for row in csv.DictReader(file)
+        ]
+    build_database(entries, path)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 4 or sys.argv[1] != "build":
+        print("Uso: python -m httpkit.geoip build redes.csv geoip.db", file=sys.stderr)
+        sys.exit(2)
+    build_from_csv(sys.argv[2], sys.argv[3])
@@ -0,0 +1,89 @@
+"""
+Tests para httpkit/geoip.py
+Comprueban la búsqueda de la red más específica en IPv4 e IPv6, las
+direcciones desconocidas o no válidas y el formato del fichero.
+"""
+
+import pytest
+
+from httpkit.geoip import GeoIPDatabase, build_database
+
+ENTRIES = [
+    ("10.0.0.0/8", {"country": "AA", "asn": 1}),
+    ("10.1.0.0/16", {"country": "BB", "asn": 2}),
+    ("10.1.2.3/32", {"country": "CC", "asn": 3}),
+    ("2001:db8::/32", {"country": "DD", "asn": 4}),
+    ("192.0.2.0/24", {"country": "AA", "asn": 1}),
+]
+
+
+@pytest.fixture
+def database(tmp_path):
+    """
+    Base de datos de prueba, construida en orden inverso para comprobar que
+    el orden de entrada no importa.
+    """
+    path = tmp_path / "geoip.db"
+    build_database(reversed(ENTRIES), str(path))
+    db = GeoIPDatabase(str(path))
+    yield db
+    db.close()
+
+
+def test_longest_prefix_match(database):
+    """
+    Gana siempre la red más específica que contiene la dirección.
+    """
+    assert database.lookup("10.200.0.1") == {"country": "AA", "asn": 1}
+    assert database.lookup("10.1.9.9") == {"country": "BB", "asn": 2}
+    assert database.lookup("10.1.2.3") == {"country": "CC", "asn": 3}
+    assert database.lookup("10.1.2.4") == {"country": "BB", "asn": 2}
+
+
+def test_ipv6_and_mapped_ipv4(database):
+    """
+    IPv6 tiene su propio árbol y las direcciones IPv4 mapeadas usan el de IPv4.
+    """
+    assert database.lookup("2001:db8::1") == {"country": "DD", "asn": 4}
+    assert database.lookup("::ffff:10.1.2.3") == {"country": "CC", "asn": 3}
+    assert database.lookup("2001:db9::1") is None
+
+
+def test_unknown_and_invalid(database):
+    """
+    Las direcciones sin red conocida o mal formadas devuelven None.
+    """
+    assert database.lookup("8.8.8.8") is None
+    assert database.lookup("no-es-una-ip") is None
+    assert database.lookup("") is None
+
+
+def test_records_are_deduplicated(database):
+    """
+    Los registros idénticos se guardan una sola vez en el fichero.
+    """
+    assert database.record_count == 4
+    assert database.lookup("192.0.2.1") is database.lookup("10.200.0.1")
+
+
+def test_invalid_file(tmp_path):
+    """
+    Un fichero que no es una base de datos GeoIP se rechaza con ValueError.
+    """
+    path = tmp_path / "other.db"
+    path.write_bytes(b"x" * 64)
+    with pytest.raises(ValueError):
+        GeoIPDatabase(str(path))
+
+
+@pytest.mark.parametrize("size", [3, 40], ids=["header", "tables"])
+def test_truncated_file(tmp_path, database, size):
+    """
+    Un fichero cortado (dentro de la cabecera o de las tablas) se rechaza con
+    ValueError en lugar de fallar más tarde en las búsquedas.
+    """
+    path = tmp_path / "truncated.db"
+    with open(database.path, "rb") as file:
+        path.write_bytes(file.read(size))
+    with pytest.raises(ValueError):
+        GeoIPDatabase(str(path))
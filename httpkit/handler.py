@@ -0,0 +1,628 @@
+"""
+Manejador base compartido por los servidores de los ejercicios.
+
+AppRequestHandler habla HTTP/1.1 con conexiones persistentes (keep-alive):
+el cliente puede enviar varias peticiones por la misma conexión TCP, con un
+tiempo máximo de inactividad entre peticiones y un número máximo de peticiones
+por conexión. Los manejadores solo pueden leer de rfile el cuerpo de su
+petición y lo que no lean se descarta antes de leer la siguiente (o se cierra
+la conexión si no se puede), para que nunca se interprete como otra petición. Si la subclase define un
+enrutador (httpkit.routing.Router), todas las peticiones se resuelven a través
+de él.
+
+Si el servidor tiene un atributo access_log (httpkit.accesslog.AccessLog), cada
+petición se registra ahí en lugar de escribir una línea en stderr; con
+access_log=False no se registran las peticiones.
+
+Si el servidor anota sus conexiones (httpkit.servers.ConnectionTrackingMixin),
+el manejador marca la conexión como ocupada mientras atiende una petición y,
+cuando el servidor se está deteniendo (draining), anuncia el cierre de la
+conexión en la respuesta.
+
+Las respuestas de send_body() salen en una sola escritura al socket (línea de
+estado, cabeceras y cuerpo juntos, ver write_response) en lugar de una para
+las cabeceras y otra para el cuerpo.
+
+send_body() comprime con gzip o deflate (httpkit.compression) los cuerpos de
+texto a partir de compress_min_size bytes cuando el cliente lo acepta, y
+reutiliza las variantes comprimidas de los cuerpos marcados como reutilizables
+(reusable=True).
+
+send_body() también implementa las peticiones condicionales: las respuestas
+200 a GET llevan un ETag calculado a partir del cuerpo y, si el cliente envía
+ese mismo ETag en If-None-Match, se responde 304 sin cuerpo. Cada ruta indica
+con cache_control durante cuánto tiempo es válida su respuesta.
+
+La lectura de cada petición tiene plazos (httpkit.limits): un cliente que no
+completa la línea de petición y las cabeceras en header_timeout segundos
+recibe 408, y las líneas de petición o cabeceras demasiado grandes reciben 414
+o 431. Así un cliente lento no retiene un hilo trabajador indefinidamente.
+
+Si el servidor tiene un atributo rate_limit (httpkit.ratelimit.TokenBucketLimiter),
+dispatch() limita las peticiones de cada cliente y responde 429 con Retry-After
+a quien supera su cuota.
+
+Si el servidor tiene un atributo metrics (httpkit.metrics.Metrics), cada
+petición se contabiliza por ruta y código de estado, con su latencia y sus
+bytes enviados, junto con las conexiones abiertas; send_metrics() envía la
+exposición en formato Prometheus.
+"""
+
+import hashlib
+import io
+import json
+import socket
+import time
+from http.server import BaseHTTPRequestHandler
+
+from httpkit.compression import CompressedBodyCache, compress, is_compressible, negotiate
+from httpkit.limits import BodyReader, DeadlineReader, HeaderBudget
+from httpkit.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE
+from httpkit.ratelimit import TOO_MANY_REQUESTS_BODY, TokenBucketLimiter
+
+
+class AppRequestHandler(BaseHTTPRequestHandler):
+    """
+    Manejador HTTP/1.1 con conexiones persistentes.
+
+    Atributos de clase (se pueden redefinir en las subclases):
+        timeout: Segundos de inactividad tras los que se cierra la conexión
+        header_timeout: Segundos máximos para recibir la línea de petición y las
+            cabeceras completas, desde su primer byte (408 si se agotan)
+        read_timeout: Segundos máximos de espera en cada lectura del cuerpo
+        max_request_line: Tamaño máximo de la línea de petición (414 si se supera)
+        max_header_bytes: Tamaño máximo de las cabeceras (431 si se supera)
+        max_keepalive_requests: Peticiones máximas servidas por una misma conexión
+        max_body_size: Tamaño máximo del cuerpo de una petición que se puede
+            descartar (si el manejador no lo lee) manteniendo abierta la conexión
+        router: Enrutador que resuelve las peticiones (None si la subclase
+            implementa directamente los métodos do_*)
+        compress_min_size: Tamaño mínimo del cuerpo para comprimirlo (None
+            desactiva la compresión)
+        compression_cache: Caché de los cuerpos reutilizables comprimidos
+            (compartida por todas las conexiones)
+        etag_responses: Añadir ETag a las respuestas 200 a GET y atender
+            If-None-Match
+        single_write: Enviar cabeceras y cuerpo en una sola escritura (ver
+            write_response)
+        writev_min_size: Tamaño del cuerpo a partir del cual se envía sin
+            copiarlo, con sendmsg()
+    """
+
+    # Las cabeceras y el cuerpo salen en escrituras separadas: con Nagle activo,
+    # en una conexión persistente la segunda espera al ACK retardado del
+    # cliente (~40 ms por respuesta)
+    disable_nagle_algorithm = True
+    protocol_version = "HTTP/1.1"
+    timeout = 5
+    # Un cliente que envía la petición byte a byte no puede retener el hilo
+    # más de header_timeout segundos, por lento que sea
+    header_timeout = 10
+    read_timeout = 5
+    max_request_line = 8190
+    max_header_bytes = 16384
+    max_keepalive_requests = 100
+    # Lo que el manejador no lee del cuerpo se descarta hasta este tamaño; con
+    # uno mayor (o con Transfer-Encoding) se cierra la conexión
+    max_body_size = 64 * 1024
+    router = None
+    # Por debajo de ~1 KB la cabecera de gzip y el coste de CPU no compensan
+    # el ahorro (un cuerpo pequeño cabe igualmente en un solo paquete)
+    compress_min_size = 1024
+    compression_cache = CompressedBodyCache()
+    etag_responses = True
+    single_write = True
+    # Por debajo de este tamaño copiar el cuerpo cuesta menos que preparar sendmsg()
+    writev_min_size = 64 * 1024
+    _reader = None
+
+    def setup(self):
+        """
+        Prepara la conexión (leyendo el socket con plazos) e inicializa el
+        contador de peticiones servidas.
+        """
+        super().setup()
+        self.rfile.close()
+        self._reader = DeadlineReader(self.connection)
+        self.rfile = io.BufferedReader(self._reader)
+        self.init_connection_state()
+
+    def finish(self):
+        super().finish()
+        self.close_connection_state()
+
+    def init_connection_state(self):
+        """
+        Reinicia el estado asociado a la conexión. Los motores que no usan
+        setup() (por ejemplo el de asyncio) lo llaman al abrir cada conexión.
+        """
+        self.requests_served = 0
+        self._connection_header_sent = False
+        self.detached = None
+        self._metrics_slot = getattr(self.server, "worker_index", 0)
+        metrics = getattr(self.server, "metrics", None)
+        if metrics is not None:
+            metrics.connection_opened(self._metrics_slot)
+
+    def close_connection_state(self):
+        """
+        Anota el cierre de la conexión. Los motores que no usan finish() lo
+        llaman al cerrar cada conexión.
+        """
+        metrics = getattr(self.server, "metrics", None)
+        if metrics is not None:
+            metrics.connection_closed(self._metrics_slot)
+
+    def handle_one_request(self):
+        """
+        Lee y atiende una petición y, al terminar, la anota en el registro de
+        accesos y en las métricas.
+
+        Sustituye a la de BaseHTTPRequestHandler para aplicar los plazos de
+        lectura (ver httpkit.limits.DeadlineReader) y el tamaño máximo de la
+        línea de petición, y responder 408 a quien no completa la petición a
+        tiempo en lugar de cerrar la conexión sin más.
+        """
+        self._start_request()
+        reader = self._reader
+        if reader is not None:
+            reader.expect_request(self.timeout, self.header_timeout, self.read_timeout)
+        try:
+            self.raw_requestline = self.rfile.readline(self.max_request_line + 1)
+            if len(self.raw_requestline) > self.max_request_line:
+                self._send_rejection(414)
+                return
+            if not self.raw_requestline:
+                self.close_connection = True
+                return
+            if not self.parse_request():
+                return
+            length = self._skippable_body()
+            if length is None:
+                # Cuerpo que no se va a descartar: tras la respuesta se cierra
+                # la conexión en lugar de interpretarlo como otra petición
+                self.close_connection = True
+            if reader is not None:
+                reader.expect_body()
+            method = getattr(self, "do_" + self.command, None)
+            if method is None:
+                self.send_error(501, f"Unsupported method ({self.command!r})")
+                return
+            rfile = self.rfile
+            if length is not None:
+                # El manejador solo puede leer su cuerpo; lo que no lea se descarta
+                self.rfile = BodyReader(rfile, length)
+            try:
+                method()
+                self.wfile.flush()
+                if length and not self.close_connection and not self.rfile.discard():
+                    self.close_connection = True
+            finally:
+                self.rfile = rfile
+        except TimeoutError as error:
+            self.close_connection = True
+            if reader is not None and reader.in_request and self._response_status is None:
+                # Petición empezada pero no completada a tiempo (cliente lento)
+                self._send_rejection(408)
+            else:
+                self.log_error("Request timed out: %r", error)
+        finally:
+            self._finish_request()
+
+    def _skippable_body(self):
+        """
+        Tamaño del cuerpo de la petición actual, si se puede descartar leyéndolo.
+
+        Returns:
+            int: Tamaño del cuerpo según Content-Length (0 si no lleva)
+            None: Si el cuerpo no se puede descartar: lleva
+                Transfer-Encoding, Content-Length no es válido (o hay varios
+                distintos) o supera max_body_size
+        """
+        if self.headers.get("Transfer-Encoding") is not None:
+            return None
+        values = {value.strip() for value in self.headers.get_all("Content-Length", [])}
+        if not values:
+            return 0
+        if len(values) != 1:
+            return None
+        value = values.pop()
+        if not value.isdigit() or int(value) > self.max_body_size:
+            return None
+        return int(value)
+
+    def reject(self, code):
+        """
+        Responde con un error y cierra la conexión sin leer la petición. Lo
+        usan los motores que leen la petición por su cuenta (por ejemplo el de
+        asyncio) cuando el cliente no la completa a tiempo (408), sus
+        cabeceras son demasiado grandes (431) o su cuerpo no se puede leer
+        (400, 413 o 501).
+
+        Args:
+            code (int): Código de estado HTTP
+        """
+        self._start_request()
+        try:
+            self._send_rejection(code)
+        finally:
+            self._finish_request()
+
+    def _send_rejection(self, code):
+        """
+        Envía una respuesta de error cuando no hay petición válida y cierra la conexión.
+        """
+        self.requestline = ""
+        self.request_version = ""
+        self.command = ""
+        self.close_connection = True
+        try:
+            self.send_error(code)
+            self.wfile.flush()
+        except OSError:
+            # El cliente ya no está (o tampoco lee): solo queda cerrar
+            pass
+
+    def _start_request(self):
+        """
+        Reinicia el estado asociado a la petición.
+        """
+        self._request_started = None
+        self._response_status = None
+        self._response_bytes = None
+        self.route_match = None
+        self.command = self.path = ""
+
+    def _finish_request(self):
+        """
+        Libera la conexión y anota la petición en el registro de accesos y en las métricas.
+        """
+        if self._request_started is not None:
+            self._set_busy(False)
+        status = self._response_status
+        if status is None:
+            return
+        started = self._request_started
+        duration = time.perf_counter() - started if started else 0.0
+        access_log = getattr(self.server, "access_log", None)
+        if access_log:
+            access_log.record(self.client_address[0], self.command, self.path, status,
+                              self._response_bytes, duration)
+        metrics = getattr(self.server, "metrics", None)
+        if metrics is not None:
+            route = self.route_match.route if self.route_match is not None else None
+            metrics.record(self._metrics_slot, route, status, self._response_bytes, duration)
+
+    def parse_request(self):
+        """
+        Anota el instante en que empieza la petición (ya recibida su primera
+        línea) y lee las cabeceras limitando su tamaño total.
+        """
+        self._request_started = time.perf_counter()
+        self._set_busy(True)
+        rfile = self.rfile
+        self.rfile = HeaderBudget(rfile, self.max_header_bytes)
+        try:
+            return super().parse_request()
+        finally:
+            self.rfile = rfile
+
+    def _set_busy(self, busy):
+        """
+        Informa al servidor (si anota sus conexiones) de si la conexión está
+        atendiendo una petición.
+        """
+        set_busy = getattr(self.server, "set_busy", None)
+        if set_busy is not None:
+            set_busy(self.connection, busy)
+
+    def log_request(self, code="-", size="-"):
+        """
+        Anota el código de estado para el registro de accesos y las métricas
+        del servidor y, si el servidor no tiene registro de accesos, escribe la
+        línea habitual en stderr.
+        """
+        self._response_status = int(code)
+        if getattr(self.server, "access_log", None) is None:
+            super().log_request(code, size)
+
+    def send_response(self, code, message=None):
+        """
+        Envía la línea de estado y contabiliza la petición en la conexión actual.
+        """
+        self._connection_header_sent = False
+        self.requests_served += 1
+        super().send_response(code, message)
+
+    def send_header(self, keyword, value):
+        """
+        Envía una cabecera, anotando si la respuesta ya decide sobre la conexión.
+        """
+        if keyword.lower() == "connection":
+            self._connection_header_sent = True
+        super().send_header(keyword, value)
+
+    def end_headers(self):
+        """
+        Cierra las cabeceras, anunciando el cierre de la conexión cuando se ha
+        alcanzado el límite de peticiones por conexión o el servidor se está
+        deteniendo.
+        """
+        self._announce_close()
+        super().end_headers()
+
+    def _announce_close(self):
+        """
+        Añade Connection: close si la conexión se va a cerrar tras esta respuesta.
+        """
+        if ((self.requests_served >= self.max_keepalive_requests
+                or self.close_connection
+                or getattr(self.server, "draining", False))
+                and not self._connection_header_sent):
+            self.send_header("Connection", "close")
+
+    def write_response(self, body=b""):
+        """
+        Cierra las cabeceras (las de send_response() y send_header()) y las
+        envía junto con el cuerpo en una sola llamada al sistema.
+
+        Los cuerpos pequeños se copian a continuación de las cabeceras en un
+        único buffer; a partir de writev_min_size bytes se envían cabeceras y
+        cuerpo sin copiarlos con socket.sendmsg() (writev). Con single_write
+        desactivado se usa el camino de http.server: una escritura para las
+        cabeceras y otra para el cuerpo.
+
+        Args:
+            body (bytes): Cuerpo de la respuesta (vacío si no lleva)
+        """
+        if not self.single_write:
+            self.end_headers()
+            if body:
+                self.wfile.write(body)
+            return
+        # Mismo tratamiento que end_headers(), sin enviar todavía nada
+        self._announce_close()
+        self._headers_buffer.append(b"\r\n")
+        head = b"".join(self._headers_buffer)
+        self._headers_buffer = []
+        if self.connection is None or len(body) < self.writev_min_size or not _HAS_SENDMSG:
+            # Motores sin socket (asyncio) o cuerpo pequeño: un solo buffer
+            self.wfile.write(head + body if body else head)
+        else:
+            _sendmsg_all(self.connection, (head, body))
+
+    def client_key(self):
+        """
+        Clave con la que se identifica al cliente para limitar sus peticiones.
+        Por defecto es la IP de la conexión; los manejadores que identifican
+        al cliente de otra forma (cabeceras de un proxy) la redefinen.
+
+        Returns:
+            str: Clave del cliente
+        """
+        return self.client_address[0]
+
+    def rate_limited(self, client=None):
+        """
+        Consume una petición de la cuota del cliente y, si la ha agotado,
+        responde 429 con la cabecera Retry-After.
+
+        Las cubetas están en memoria compartida, así que en el modo pre-fork
+        todos los trabajadores descuentan de la misma cuota.
+
+        Args:
+            client (str, opcional): Clave del cliente (por defecto client_key())
+
+        Returns:
+            bool: True si la petición se ha rechazado (y ya se ha respondido)
+        """
+        limiter = getattr(self.server, "rate_limit", None)
+        if limiter is None:
+            return False
+        wait = limiter.check(self.client_key() if client is None else client)
+        if not wait:
+            return False
+        self.send_body(429, TOO_MANY_REQUESTS_BODY, reusable=True,
+                       headers={"Retry-After": TokenBucketLimiter.retry_after(wait)},
+                       cache_control="no-store")
+        return True
+
+    def dispatch(self):
+        """
+        Resuelve la petición con el enrutador de la clase.
+        """
+        if self.rate_limited():
+            return
+        if self.router is None:
+            self.send_error(501, f"Unsupported method ({self.command!r})")
+            return
+        self.router.dispatch(self)
+
+    do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = dispatch
+
+    def send_json(self, status, payload, headers=None, cache_control=None):
+        """
+        Envía una respuesta completa con el objeto payload serializado en JSON.
+
+        Args:
+            status (int): Código de estado HTTP
+            payload: Objeto serializable a JSON
+            headers (dict, opcional): Cabeceras adicionales
+            cache_control (str, opcional): Valor de la cabecera Cache-Control
+        """
+        self.send_body(status, json.dumps(payload).encode("utf-8"), headers=headers,
+                       cache_control=cache_control)
+
+    def send_body(self, status, body, content_type="application/json", headers=None,
+                  cache_control=None, reusable=False):
+        """
+        Envía una respuesta completa con un cuerpo ya codificado (por ejemplo,
+        uno reutilizado de una caché), comprimido si el cliente lo acepta, o un
+        304 sin cuerpo si el cliente ya tiene esa misma respuesta.
+
+        Args:
+            status (int): Código de estado HTTP
+            body (bytes): Cuerpo de la respuesta
+            content_type (str): Valor de la cabecera Content-Type
+            headers (dict, opcional): Cabeceras adicionales
+            cache_control (str, opcional): Valor de la cabecera Cache-Control,
+                por ejemplo "max-age=60" o "no-cache"
+            reusable (bool): El mismo cuerpo se envía en muchas respuestas (uno
+                de una caché o una constante): su variante comprimida se guarda
+                en compression_cache. Los demás se comprimen sin guardarse
+        """
+        negotiable = self.compress_min_size is not None and is_compressible(content_type)
+        etag = None
+        if status == 200 and self.etag_responses and self.command == "GET":
+            etag = body_etag(body)
+            if etag_matches(self.headers.get("If-None-Match"), etag):
+                self._send_not_modified(etag, negotiable, cache_control, headers)
+                return
+
+        encoding = None
+        if negotiable and len(body) >= self.compress_min_size:
+            encoding = negotiate(self.headers.get("Accept-Encoding"))
+            if encoding is not None:
+                if reusable:
+                    body = self.compression_cache.get(body, encoding)
+                else:
+                    body = compress(body, encoding, self.compression_cache.level)
+
+        self._response_bytes = len(body)
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        if negotiable:
+            # Las cachés intermedias deben distinguir las variantes comprimidas
+            self.send_header("Vary", "Accept-Encoding")
+        if encoding is not None:
+            self.send_header("Content-Encoding", encoding)
+        if etag is not None:
+            self.send_header("ETag", etag)
+        if cache_control is not None:
+            self.send_header("Cache-Control", cache_control)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.write_response(body)
+
+    def _send_not_modified(self, etag, negotiable, cache_control, headers):
+        """
+        Responde 304: mismas cabeceras de validación y caché que el 200, sin cuerpo.
+        """
+        self._response_bytes = 0
+        self.send_response(304)
+        self.send_header("ETag", etag)
+        if negotiable:
+            self.send_header("Vary", "Accept-Encoding")
+        if cache_control is not None:
+            self.send_header("Cache-Control", cache_control)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.write_response()
+
+    def send_metrics(self):
+        """
+        Envía las métricas del servidor en formato de texto de Prometheus (404
+        si el servidor no tiene métricas).
+        """
+        metrics = getattr(self.server, "metrics", None)
+        if metrics is None:
+            self.router.not_found(self)
+            return
+        self.send_body(200, metrics.render(), content_type=METRICS_CONTENT_TYPE,
+                       cache_control="no-store")
+
+    def send_event_stream(self, broadcaster, initial=b""):
+        """
+        Responde con un flujo Server-Sent Events y entrega la conexión al
+        difusor (httpkit.sse.EventBroadcaster), que le enviará los eventos.
+
+        Args:
+            broadcaster: Difusor al que se suscribe la conexión
+            initial (bytes): Evento a enviar de inmediato
+        """
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        # Sin Content-Length: el cuerpo termina al cerrar la conexión
+        self.send_header("Connection", "close")
+        self.write_response()
+        self.detach(lambda sock: broadcaster.subscribe(sock, initial))
+
+    def detach(self, take):
+        """
+        Cede la conexión: el manejador deja de atenderla (y el hilo o la tarea
+        queda libre) y take(sock) recibe un duplicado del socket, una vez
+        enviado todo lo escrito hasta ahora.
+
+        Args:
+            take: Función que recibe el socket y pasa a ser su dueña
+        """
+        self.close_connection = True
+        if self.connection is None:
+            # Motores sin socket en el manejador (asyncio): el motor entrega
+            # el socket tras enviar la respuesta
+            self.detached = take
+            return
+        self.wfile.flush()
+        sock = self.connection.dup()
+        self.server.detach_connection(self.connection)
+        take(sock)
+
+
+_HAS_SENDMSG = hasattr(socket.socket, "sendmsg")
+
+
+def _sendmsg_all(sock, buffers):
+    """
+    Envía varios buffers con una llamada a sendmsg() (writev) y, si el envío
+    queda a medias, el resto con sendall().
+    """
+    sent = sock.sendmsg(buffers)
+    for buffer in buffers:
+        if sent >= len(buffer):
+            sent -= len(buffer)
+            continue
+        sock.sendall(memoryview(buffer)[sent:])
+        sent = 0
+
+
+def body_etag(body):
+    """
+    Calcula el ETag de un cuerpo sin comprimir.
+
+    Es débil (W/) porque la variante comprimida con gzip o deflate representa
+    el mismo contenido y comparte el mismo ETag.
+
+    Args:
+        body (bytes): Cuerpo de la respuesta
+
+    Returns:
+        str: ETag listo para la cabecera, por ejemplo W/"3f2a9c0d1b7e4a55"
+    """
+    return 'W/"' + hashlib.blake2b(body, digest_size=8).hexdigest() + '"'
+
+
+def etag_matches(if_none_match, etag):
+    """
+    Compara la cabecera If-None-Match con un ETag (comparación débil).
+
+    Args:
+        if_none_match (str): Valor de la cabecera (o None)
+        etag (str): ETag de la respuesta actual
+
+    Returns:
+        bool: True si el cliente ya tiene esta respuesta
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
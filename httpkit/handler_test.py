@@ -0,0 +1,407 @@
+"""
+Tests para httpkit/handler.py
+Comprueban las conexiones persistentes: reutilización, límite de peticiones
+por conexión y cierre por inactividad, los plazos y límites de lectura de la
+petición, y la compresión negociada y las peticiones condicionales (ETag) de
+send_body().
+"""
+
+import gzip
+import http.client
+import json
+import select
+import socket
+import threading
+import time
+
+import pytest
+
+from httpkit.handler import AppRequestHandler, body_etag, etag_matches
+from httpkit.runner import ServerRunner
+from httpkit.servers import build_server
+
+
+class PingHandler(AppRequestHandler):
+    """
+    Manejador mínimo con un límite bajo de peticiones y de inactividad.
+    """
+
+    timeout = 0.3
+    max_keepalive_requests = 3
+
+    def do_GET(self):
+        body = b"pong"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    """
+    Servidor con grupo de hilos en un puerto libre.
+    """
+    server = build_server(("127.0.0.1", 0), PingHandler, mode="threaded", workers=2)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join(1)
+
+
+def test_connection_is_reused(server):
+    """
+    Dos peticiones seguidas deben viajar por la misma conexión TCP.
+    """
+    conn = http.client.HTTPConnection("127.0.0.1", server.server_port, timeout=2)
+    try:
+        conn.request("GET", "/")
+        first = conn.getresponse()
+        assert first.read() == b"pong"
+        sock = conn.sock
+
+        conn.request("GET", "/")
+        second = conn.getresponse()
+        assert second.read() == b"pong"
+        assert conn.sock is sock, "La conexión debe mantenerse abierta entre peticiones"
+        assert second.getheader("Connection") is None
+    finally:
+        conn.close()
+
+
+def test_connection_closed_after_request_cap(server):
+    """
+    La última petición permitida anuncia Connection: close.
+    """
+    conn = http.client.HTTPConnection("127.0.0.1", server.server_port, timeout=2)
+    try:
+        for _ in range(PingHandler.max_keepalive_requests - 1):
+            conn.request("GET", "/")
+            response = conn.getresponse()
+            response.read()
+            assert response.getheader("Connection") is None
+
+        conn.request("GET", "/")
+        response = conn.getresponse()
+        response.read()
+        assert response.getheader("Connection") == "close"
+    finally:
+        conn.close()
+
+
+def test_idle_connection_is_closed(server):
+    """
+    Una conexión inactiva más allá de timeout la cierra el servidor.
+    """
+    sock = socket.create_connection(("127.0.0.1", server.server_port), timeout=2)
+    try:
+        time.sleep(PingHandler.timeout * 2)
+        assert sock.recv(1) == b"", "El servidor debe cerrar la conexión inactiva"
+    finally:
+        sock.close()
+
+
+class StrictHandler(PingHandler):
+    """
+    Manejador con plazos y límites de lectura bajos.
+    """
+
+    timeout = 1
+    header_timeout = 0.5
+    max_request_line = 64
+    max_header_bytes = 256
+
+
+def read_response(sock):
+    """
+    Lee lo que envía el servidor hasta que cierra la conexión.
+    """
+    data = b""
+    while True:
+        chunk = sock.recv(4096)
+        if not chunk:
+            return data
+        data += chunk
+
+
+@pytest.mark.parametrize("mode", ["single", "threaded", "asyncio"])
+def test_slow_headers_get_408(mode):
+    """
+    Un cliente que envía las cabeceras poco a poco (sin agotar nunca el
+    tiempo de inactividad) recibe 408 al agotarse el plazo de cabeceras.
+    """
+    server = build_server(("127.0.0.1", 0), StrictHandler, mode=mode, workers=2)
+    with ServerRunner(server):
+        sock = socket.create_connection(("127.0.0.1", server.server_port), timeout=3)
+        try:
+            start = time.monotonic()
+            sock.sendall(b"GET / HTTP/1.1\r\n")
+            # Una cabecera cada 0,1 s hasta que el servidor responda
+            while not select.select([sock], [], [], 0.1)[0]:
+                assert time.monotonic() - start < 3, "El servidor debe responder 408"
+                sock.sendall(b"X-Slow: 1\r\n")
+            response = read_response(sock)
+        finally:
+            sock.close()
+    assert response.startswith(b"HTTP/1.1 408")
+    assert time.monotonic() - start < StrictHandler.header_timeout * 4
+
+
+@pytest.mark.parametrize("mode", ["single", "threaded", "asyncio"])
+@pytest.mark.parametrize("request_bytes, status", [
+    (b"GET /" + b"a" * 100 + b" HTTP/1.1\r\n\r\n", b"414"),
+    (b"GET / HTTP/1.1\r\n" + b"X-Big: " + b"b" * 300 + b"\r\n\r\n", b"431"),
+    (b"GET / HTTP/1.1\r\n" + b"X-Many: 1\r\n" * 30 + b"\r\n", b"431"),
+], ids=["request-line", "header-size", "header-total"])
+def test_oversized_requests_are_rejected(mode, request_bytes, status):
+    """
+    Una línea de petición o unas cabeceras mayores que el límite reciben 414 o 431.
+    """
+    server = build_server(("127.0.0.1", 0), StrictHandler, mode=mode, workers=2)
+    with ServerRunner(server):
+        sock = socket.create_connection(("127.0.0.1", server.server_port), timeout=3)
+        try:
+            sock.sendall(request_bytes)
+            response = read_response(sock)
+        finally:
+            sock.close()
+    assert response.startswith(b"HTTP/1.1 " + status)
+
+
+def read_responses(sock, count):
+    """
+    Lee count respuestas con Content-Length de una conexión persistente.
+    """
+    data = b""
+    responses = []
+    while len(responses) < count:
+        head, separator, rest = data.partition(b"\r\n\r\n")
+        if separator:
+            length = 0
+            for line in head.split(b"\r\n")[1:]:
+                name, _, value = line.partition(b":")
+                if name.strip().lower() == b"content-length":
+                    length = int(value)
+            if len(rest) >= length:
+                responses.append(head + separator + rest[:length])
+                data = rest[length:]
+                continue
+        chunk = sock.recv(4096)
+        if not chunk:
+            break
+        data += chunk
+    return responses, data
+
+
+class EchoPathHandler(PingHandler):
+    """
+    Responde a GET y POST con la ruta pedida, sin leer el cuerpo.
+    """
+
+    def do_GET(self):
+        self.send_body(200, self.path.encode(), content_type="text/plain")
+
+    do_POST = do_GET
+
+
+@pytest.mark.parametrize("mode", ["single", "threaded", "asyncio"])
+def test_request_body_is_not_parsed_as_a_request(mode):
+    """
+    El cuerpo de una petición que el manejador no lee se descarta: una
+    petición escondida en él no se atiende como una petición más.
+    """
+    server = build_server(("127.0.0.1", 0), EchoPathHandler, mode=mode, workers=2)
+    hidden = b"GET /hidden HTTP/1.1\r\n\r\n"
+    with ServerRunner(server):
+        sock = socket.create_connection(("127.0.0.1", server.server_port), timeout=3)
+        try:
+            sock.sendall(b"POST /post HTTP/1.1\r\nContent-Length: %d\r\n\r\n%s"
+                         b"GET /get HTTP/1.1\r\n\r\n" % (len(hidden), hidden))
+            responses, extra = read_responses(sock, 2)
+            sock.settimeout(0.3)
+            try:
+                extra += sock.recv(4096)
+            except socket.timeout:
+                pass
+        finally:
+            sock.close()
+    assert [response.rpartition(b"\r\n")[2] for response in responses] == [b"/post", b"/get"]
+    assert extra == b"", "No debe haber una tercera respuesta"
+
+
+@pytest.mark.parametrize("mode", ["single", "threaded"])
+@pytest.mark.parametrize("headers", [
+    b"Transfer-Encoding: chunked\r\n",
+    b"Content-Length: %d\r\n" % (AppRequestHandler.max_body_size + 1),
+], ids=["chunked", "too-large"])
+def test_unskippable_body_closes_connection(mode, headers):
+    """
+    Un cuerpo que no se puede descartar (chunked o demasiado grande) cierra la
+    conexión tras la respuesta, anunciándolo con Connection: close.
+    """
+    server = build_server(("127.0.0.1", 0), PingHandler, mode=mode, workers=2)
+    with ServerRunner(server):
+        sock = socket.create_connection(("127.0.0.1", server.server_port), timeout=3)
+        try:
+            sock.sendall(b"GET / HTTP/1.1\r\n" + headers + b"\r\n"
+                         b"0\r\n\r\nGET /hidden HTTP/1.1\r\n\r\n")
+            response = read_response(sock)
+        finally:
+            sock.close()
+    assert response.startswith(b"HTTP/1.1 200")
+    assert b"Connection: close" in response
+    assert response.count(b"HTTP/1.1") == 1
+
+
+class DocumentHandler(AppRequestHandler):
+    """
+    Manejador con un cuerpo JSON grande (/big), uno grande reutilizado
+    (/shared) y otro pequeño (/small).
+    """
+
+    SHARED_BODY = json.dumps({"items": list(range(1000))}).encode()
+
+    def do_GET(self):
+        if self.path == "/big":
+            self.send_json(200, {"items": list(range(1000))})
+        elif self.path == "/shared":
+            self.send_body(200, self.SHARED_BODY, reusable=True)
+        else:
+            self.send_json(200, {"ok": True})
+
+    def log_message(self, format, *args):
+        pass
+
+
+def get(port, path, accept_encoding=None):
+    """
+    Hace una petición GET y devuelve (respuesta, cuerpo sin descomprimir).
+    """
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=2)
+    try:
+        headers = {"Accept-Encoding": accept_encoding} if accept_encoding else {}
+        conn.request("GET", path, headers=headers)
+        response = conn.getresponse()
+        return response, response.read()
+    finally:
+        conn.close()
+
+
+def test_compression_negotiation():
+    """
+    Los cuerpos grandes se comprimen si el cliente lo acepta; los pequeños y
+    los clientes sin Accept-Encoding reciben el cuerpo tal cual, siempre con Vary.
+    """
+    server = build_server(("127.0.0.1", 0), DocumentHandler, mode="threaded", workers=2)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        port = server.server_port
+        plain, plain_body = get(port, "/big")
+        assert plain.getheader("Content-Encoding") is None
+        assert plain.getheader("Vary") == "Accept-Encoding"
+
+        compressed, body = get(port, "/big", "gzip, deflate")
+        assert compressed.getheader("Content-Encoding") == "gzip"
+        assert compressed.getheader("Vary") == "Accept-Encoding"
+        assert int(compressed.getheader("Content-Length")) == len(body) < len(plain_body)
+        assert gzip.decompress(body) == plain_body
+
+        small, small_body = get(port, "/small", "gzip")
+        assert small.getheader("Content-Encoding") is None
+        assert small_body == b'{"ok": true}'
+
+        # Solo se guardan (y se reutilizan) los cuerpos marcados como reutilizables
+        stats = DocumentHandler.compression_cache.stats
+        before = stats.snapshot()
+        get(port, "/big", "gzip")
+        assert stats.snapshot() == before
+        shared, shared_body = get(port, "/shared", "gzip")
+        shared, again = get(port, "/shared", "gzip")
+        assert again == shared_body and gzip.decompress(again) == DocumentHandler.SHARED_BODY
+        assert stats.snapshot()["hits"] == before["hits"] + 1
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join(1)
+
+
+def test_etag_matching():
+    """
+    If-None-Match admite listas, "*" y ETag débiles o fuertes con el mismo valor.
+    """
+    etag = body_etag(b'{"ok": true}')
+    assert etag.startswith('W/"') and etag == body_etag(b'{"ok": true}')
+    assert etag != body_etag(b'{"ok": false}')
+    opaque = etag[2:]
+    assert etag_matches(etag, etag)
+    assert etag_matches(opaque, etag)
+    assert etag_matches(f'"otro", {etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('"otro"', etag)
+    assert not etag_matches(None, etag)
+
+
+def test_not_modified_keeps_connection():
+    """
+    El 304 no lleva cuerpo, conserva Vary y ETag, y la conexión sigue siendo
+    reutilizable (también con el cuerpo comprimido).
+    """
+    server = build_server(("127.0.0.1", 0), DocumentHandler, mode="threaded", workers=2)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    conn = http.client.HTTPConnection("127.0.0.1", server.server_port, timeout=2)
+    try:
+        conn.request("GET", "/big", headers={"Accept-Encoding": "gzip"})
+        response = conn.getresponse()
+        response.read()
+        etag = response.getheader("ETag")
+
+        conn.request("GET", "/big", headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+        response = conn.getresponse()
+        assert response.status == 304
+        assert response.read() == b""
+        assert response.getheader("ETag") == etag
+        assert response.getheader("Vary") == "Accept-Encoding"
+
+        conn.request("GET", "/small")
+        assert conn.getresponse().read() == b'{"ok": true}'
+    finally:
+        conn.close()
+        server.shutdown()
+        server.server_close()
+        thread.join(1)
+
+
+class WritevHandler(DocumentHandler):
+    """
+    DocumentHandler que envía con sendmsg() cualquier cuerpo.
+    """
+
+    writev_min_size = 1
+
+
+@pytest.mark.parametrize("handler_class", [DocumentHandler, WritevHandler])
+def test_single_write_response(handler_class):
+    """
+    La respuesta escrita de una vez (en un buffer o con sendmsg) llega completa
+    y la conexión se puede reutilizar.
+    """
+    server = build_server(("127.0.0.1", 0), handler_class, mode="threaded", workers=2)
+    with ServerRunner(server):
+        conn = http.client.HTTPConnection("127.0.0.1", server.server_port, timeout=2)
+        try:
+            for path, expected in (("/big", 1000), ("/small", None)):
+                conn.request("GET", path)
+                response = conn.getresponse()
+                body = json.loads(response.read())
+                assert response.status == 200
+                assert len(body.get("items", [])) == (expected or 0)
+        finally:
+            conn.close()
@@ -0,0 +1,174 @@
+"""
+Peticiones GET con cobertura (hedging) entre varios servidores equivalentes.
+
+Con un único servidor, su latencia de cola (la de las peticiones más lentas)
+pasa a ser la nuestra. hedged_get() envía la petición al primer servidor y,
+si no ha respondido tras delay segundos, lanza la misma petición al siguiente
+(y así sucesivamente); se queda con la primera respuesta válida y cancela las
+demás. Si una petición falla, se lanza la siguiente sin esperar.
+
+Cancelar una petición cierra su socket (shutdown), lo que desbloquea al
+instante el hilo que esperaba la respuesta; una petición cancelada mientras
+aún se conectaba se cierra al terminar la conexión, sin llegar a enviarse. Por eso se usa http.client
+directamente en lugar de requests, que no permite interrumpir una petición en
+curso.
+"""
+
+import http.client
+import queue
+import socket
+import threading
+import time
+from urllib.parse import urlsplit
+
+# Tamaño máximo del cuerpo que se lee de cada respuesta
+MAX_BODY = 64 * 1024
+
+
+class HedgeResult:
+    """
+    Resultado de hedged_get().
+
+    Atributos:
+        value: Valor de la primera respuesta válida (None si no hubo ninguna)
+        url: Servidor que dio esa respuesta (None si no hubo ninguna)
+        launched: Peticiones lanzadas
+        cancelled: Peticiones canceladas por llegar tarde
+        elapsed: Segundos hasta obtener el resultado
+    """
+
+    __slots__ = ("value", "url", "launched", "cancelled", "elapsed")
+
+    def __init__(self, value, url, launched, cancelled, elapsed):
+        self.value = value
+        self.url = url
+        self.launched = launched
+        self.cancelled = cancelled
+        self.elapsed = elapsed
+
+
+class _Attempt:
+    """
+    Una petición GET en su propio hilo, cancelable desde otro hilo.
+    """
+
+    def __init__(self, url, timeout, validate, results):
+        self.url = url
+        self.timeout = timeout
+        self.validate = validate
+        self.results = results
+        self.cancelled = False
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        threading.Thread(target=self._run, name="hedge", daemon=True).start()
+
+    def cancel(self):
+        """
+        Cierra la conexión, lo que interrumpe la espera de la respuesta.
+        """
+        with self._lock:
+            self.cancelled = True
+            conn = self._conn
+        if conn is not None and conn.sock is not None:
+            try:
+                conn.sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def _run(self):
+        value = None
+        try:
+            value = self._fetch()
+        except Exception:
+            value = None
+        self.results.put((self, value))
+
+    def _fetch(self):
+        """
+        Hace la petición y devuelve el valor validado, o None si no es válido.
+        """
+        parts = urlsplit(self.url)
+        connection_class = (http.client.HTTPSConnection if parts.scheme == "https"
+                            else http.client.HTTPConnection)
+        conn = connection_class(parts.hostname, parts.port, timeout=self.timeout)
+        try:
+            with self._lock:
+                if self.cancelled:
+                    return None
+            # Hasta que termina la conexión no hay socket que cancel() pueda
+            # cerrar: si se ha cancelado mientras tanto, no se envía la petición
+            conn.connect()
+            with self._lock:
+                if self.cancelled:
+                    return None
+                self._conn = conn
+            path = parts.path or "/"
+            if parts.query:
+                path += "?" + parts.query
+            conn.request("GET", path)
+            response = conn.getresponse()
+            if response.status != 200:
+                return None
+            return self.validate(response.read(MAX_BODY))
+        finally:
+            conn.close()
+
+
+def hedged_get(urls, delay=0.2, timeout=5.0, validate=bytes):
+    """
+    Pide lo mismo a varios servidores con cobertura y devuelve la primera
+    respuesta válida.
+
+    Args:
+        urls (list): URLs equivalentes, por orden de preferencia
+        delay (float): Segundos de espera antes de lanzar la petición al
+            siguiente servidor
+        timeout (float): Segundos máximos en total
+        validate: Función que recibe el cuerpo (bytes) de una respuesta 200 y
+            devuelve el valor, o lanza una excepción (o devuelve None) si la
+            respuesta no es válida
+
+    Returns:
+        HedgeResult: Valor, servidor ganador y peticiones lanzadas y canceladas
+    """
+    start = time.monotonic()
+    deadline = start + timeout
+    results = queue.Queue()
+    attempts = []
+    finished = set()
+    winner = None
+
+    def launch():
+        attempt = _Attempt(urls[len(attempts)], max(0.0, deadline - time.monotonic()),
+                           validate, results)
+        attempts.append(attempt)
+        attempt.start()
+
+    launch()
+    while len(finished) < len(attempts):
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        can_hedge = len(attempts) < len(urls)
+        try:
+            attempt, value = results.get(timeout=min(delay, remaining) if can_hedge
+                                         else remaining)
+        except queue.Empty:
+            if can_hedge:
+                launch()
+            continue
+        finished.add(attempt)
+        if value is not None:
+            winner = attempt
+            break
+        # Esta petición ha fallado: se lanza la siguiente sin esperar
+        if len(attempts) < len(urls):
+            launch()
+
+    losers = [attempt for attempt in attempts if attempt not in finished]
+    for attempt in losers:
+        attempt.cancel()
+    return HedgeResult(value if winner else None, winner.url if winner else None,
+                       len(attempts), len(losers), time.monotonic() - start)
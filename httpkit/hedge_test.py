@@ -0,0 +1,122 @@
+"""
+Tests para httpkit/hedge.py
+Comprueban, contra servidores locales que hacen de servicios de IP, qué
+servidor gana, cuándo se lanza la petición de cobertura y la cancelación de
+las peticiones que llegan tarde.
+"""
+
+import http.client
+import threading
+import time
+
+import pytest
+
+from httpkit.handler import AppRequestHandler
+from httpkit.hedge import hedged_get
+from httpkit.runner import ServerRunner
+from httpkit.servers import build_server
+
+
+class StandInHandler(AppRequestHandler):
+    """
+    Servicio de IP simulado: /fast responde al momento, /slow tarda 1 s,
+    /error responde 500 y /garbage devuelve algo que no es una IP.
+    """
+
+    served = []
+
+    def do_GET(self):
+        self.served.append(self.path)
+        if self.path == "/slow":
+            time.sleep(1)
+        if self.path == "/error":
+            self.send_body(500, b"error", content_type="text/plain")
+        elif self.path == "/garbage":
+            self.send_body(200, b"<html>", content_type="text/plain")
+        else:
+            self.send_body(200, self.path.encode(), content_type="text/plain")
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def base_url():
+    StandInHandler.served = []
+    server = build_server(("127.0.0.1", 0), StandInHandler, mode="threaded", workers=8)
+    with ServerRunner(server) as runner:
+        yield runner.url
+
+
+def valid(body):
+    if body == b"<html>":
+        raise ValueError("respuesta no válida")
+    return body.decode()
+
+
+def test_fast_primary_needs_no_hedge(base_url):
+    result = hedged_get([f"{base_url}/fast", f"{base_url}/slow"], delay=0.5, validate=valid)
+    assert (result.value, result.url) == ("/fast", f"{base_url}/fast")
+    assert result.launched == 1
+    assert StandInHandler.served == ["/fast"]
+
+
+def test_slow_primary_is_hedged_and_cancelled(base_url):
+    """
+    Si el primario tarda más que delay se lanza el de respaldo, que gana, y la
+    petición al primario se cancela sin esperar a su respuesta.
+    """
+    result = hedged_get([f"{base_url}/slow", f"{base_url}/fast"], delay=0.1, validate=valid)
+    assert result.url == f"{base_url}/fast"
+    assert result.launched == 2
+    assert result.cancelled == 1
+    assert result.elapsed < 0.5
+
+
+def test_failure_hedges_immediately(base_url):
+    """
+    Un error o una respuesta no válida lanzan la siguiente petición sin esperar a delay.
+    """
+    urls = [f"{base_url}/error", f"{base_url}/garbage", f"{base_url}/fast"]
+    result = hedged_get(urls, delay=5, validate=valid)
+    assert result.url == f"{base_url}/fast"
+    assert result.launched == 3
+    assert result.elapsed < 1
+
+
+def test_no_valid_answer(base_url):
+    result = hedged_get([f"{base_url}/error", f"{base_url}/slow"], delay=0.05, timeout=0.3,
+                        validate=valid)
+    assert result.value is None and result.url is None
+    assert result.cancelled == 1
+
+
+def test_unreachable_endpoint_falls_back(base_url):
+    result = hedged_get(["http://127.0.0.1:9/", f"{base_url}/fast"], delay=5, validate=valid)
+    assert result.url == f"{base_url}/fast"
+
+
+def test_cancel_while_connecting(base_url, monkeypatch):
+    """
+    Una petición cancelada mientras se conecta no llega a enviarse y su hilo
+    termina en cuanto acaba la conexión, sin esperar al timeout.
+    """
+    connect = http.client.HTTPConnection.connect
+
+    def slow_connect(conn):
+        # El servidor de "localhost" tarda en aceptar la conexión
+        if conn.host == "localhost":
+            time.sleep(0.3)
+        connect(conn)
+
+    monkeypatch.setattr(http.client.HTTPConnection, "connect", slow_connect)
+    slow_url = base_url.replace("127.0.0.1", "localhost") + "/slow"
+    result = hedged_get([slow_url, f"{base_url}/fast"], delay=0.05, timeout=5, validate=valid)
+    assert result.url == f"{base_url}/fast"
+    assert result.cancelled == 1
+
+    deadline = time.monotonic() + 1
+    while any(thread.name == "hedge" for thread in threading.enumerate()):
+        assert time.monotonic() < deadline, "El hilo cancelado debe terminar al conectar."
+        time.sleep(0.01)
+    assert "/slow" not in StandInHandler.served
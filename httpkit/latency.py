@@ -0,0 +1,198 @@
+"""
+Perfil de latencia de un endpoint a partir de muchas peticiones repetidas.
+
+Una sola medida (como la de get_response_info()) no dice nada de la
+distribución. profile_endpoint() envía N peticiones GET a una URL con varios
+clientes concurrentes y resume las latencias (min/mean/p50/p95/p99/max, en
+milisegundos) y el rendimiento (peticiones y bytes por segundo).
+
+Las muestras se separan en frías y calientes: una muestra es fría si su
+petición tuvo que abrir la conexión (resolución DNS, conexión TCP y saludo
+TLS incluidos) y caliente si reutilizó una conexión persistente abierta por
+una petición anterior del mismo cliente. Con reuse=False todas son frías.
+
+El resultado es un diccionario serializable a JSON, para comparar rutas de red
+y configuraciones del cliente entre ejecuciones.
+
+Uso:
+    python -m httpkit.latency https://api.ipify.org/?format=json \\
+        --samples 200 --concurrency 4 --output ipify.json
+    python -m httpkit.latency http://127.0.0.1:8000/ip --no-reuse
+"""
+
+import argparse
+import http.client
+import json
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+from httpkit.bench import percentile
+
+
+def summarize_latencies(latencies):
+    """
+    Resume latencias en segundos.
+
+    Args:
+        latencies (list): Latencias de las muestras, en segundos
+
+    Returns:
+        dict: samples y min/mean/p50/p95/p99/max en milisegundos (0.0 sin muestras)
+    """
+    values = sorted(latencies)
+    count = len(values)
+    return {
+        "samples": count,
+        "min_ms": (values[0] if values else 0.0) * 1000,
+        "mean_ms": (sum(values) / count if values else 0.0) * 1000,
+        "p50_ms": percentile(values, 0.50) * 1000,
+        "p95_ms": percentile(values, 0.95) * 1000,
+        "p99_ms": percentile(values, 0.99) * 1000,
+        "max_ms": (values[-1] if values else 0.0) * 1000,
+    }
+
+
+class _Sampler:
+    """
+    Cliente que toma muestras por una conexión persistente, abriéndola de nuevo
+    cuando hace falta (la primera vez, si el servidor la cierra o si reuse=False).
+    """
+
+    def __init__(self, url, timeout, headers, reuse):
+        parts = urlsplit(url)
+        self.connection_class = (http.client.HTTPSConnection if parts.scheme == "https"
+                                 else http.client.HTTPConnection)
+        self.host = parts.hostname
+        self.port = parts.port
+        self.path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        self.timeout = timeout
+        self.headers = dict(headers or {})
+        if not reuse:
+            self.headers["Connection"] = "close"
+        self.reuse = reuse
+        self.conn = None
+
+    def sample(self):
+        """
+        Envía una petición y lee la respuesta completa.
+
+        Returns:
+            tuple: (fría, segundos, bytes de cuerpo, código de estado)
+        """
+        cold = self.conn is None
+        start = time.perf_counter()
+        try:
+            if cold:
+                self.conn = self.connection_class(self.host, self.port, timeout=self.timeout)
+            self.conn.request("GET", self.path, headers=self.headers)
+            response = self.conn.getresponse()
+            size = len(response.read())
+            elapsed = time.perf_counter() - start
+        except (OSError, http.client.HTTPException):
+            self.close()
+            raise
+        if not self.reuse or response.will_close:
+            self.close()
+        return cold, elapsed, size, response.status
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+
+def profile_endpoint(url, samples=100, concurrency=1, reuse=True, timeout=10.0,
+                     headers=None):
+    """
+    Toma samples muestras de latencia de una URL y las resume.
+
+    Args:
+        url (str): URL http:// o https:// a pedir con GET
+        samples (int): Número total de peticiones
+        concurrency (int): Clientes concurrentes (cada uno con su conexión)
+        reuse (bool): Reutilizar la conexión de cada cliente entre peticiones
+        timeout (float): Segundos máximos de cada operación de red
+        headers (dict, opcional): Cabeceras adicionales
+
+    Returns:
+        dict: Parámetros de la ejecución, elapsed_s, throughput_rps,
+              throughput_bytes_s, errors, statuses y los resúmenes de
+              latencia "all", "cold" y "warm" (ver summarize_latencies())
+    """
+    concurrency = max(1, min(concurrency, samples))
+    remaining = [samples]
+    cold, warm, statuses = [], [], {}
+    totals = {"bytes": 0, "errors": 0}
+    lock = threading.Lock()
+
+    def client():
+        sampler = _Sampler(url, timeout, headers, reuse)
+        try:
+            while True:
+                with lock:
+                    if remaining[0] <= 0:
+                        return
+                    remaining[0] -= 1
+                try:
+                    is_cold, elapsed, size, status = sampler.sample()
+                except (OSError, http.client.HTTPException):
+                    with lock:
+                        totals["errors"] += 1
+                    continue
+                with lock:
+                    (cold if is_cold else warm).append(elapsed)
+                    totals["bytes"] += size
+                    statuses[str(status)] = statuses.get(str(status), 0) + 1
+        finally:
+            sampler.close()
+
+    threads = [threading.Thread(target=client, name="latency", daemon=True)
+               for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    completed = len(cold) + len(warm)
+    return {
+        "url": url,
+        "samples": samples,
+        "concurrency": concurrency,
+        "reuse": reuse,
+        "elapsed_s": elapsed,
+        "throughput_rps": completed / elapsed if elapsed > 0 else 0.0,
+        "throughput_bytes_s": totals["bytes"] / elapsed if elapsed > 0 else 0.0,
+        "errors": totals["errors"],
+        "statuses": statuses,
+        "all": summarize_latencies(cold + warm),
+        "cold": summarize_latencies(cold),
+        "warm": summarize_latencies(warm),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Perfil de latencia de un endpoint HTTP")
+    parser.add_argument("url")
+    parser.add_argument("--samples", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--no-reuse", action="store_true",
+                        help="abrir una conexión nueva en cada petición (todas frías)")
+    parser.add_argument("--timeout", type=float, default=10.0)
+    parser.add_argument("--output", help="guardar el resultado en este fichero JSON")
+    args = parser.parse_args(argv)
+
+    result = profile_endpoint(args.url, args.samples, args.concurrency,
+                              reuse=not args.no_reuse, timeout=args.timeout)
+    print(json.dumps(result, indent=2))
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(result, file, indent=2)
+    return 1 if result["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+"""
+Tests para httpkit/latency.py
+Comprueban, contra un servidor local, el reparto de muestras frías y
+calientes, las estadísticas y la salida JSON de la línea de órdenes.
+"""
+
+import json
+
+import pytest
+
+from httpkit.handler import AppRequestHandler
+from httpkit.latency import main, profile_endpoint, summarize_latencies
+from httpkit.runner import ServerRunner
+from httpkit.servers import build_server
+
+STAT_KEYS = {"samples", "min_ms", "mean_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms"}
+
+
+class EchoHandler(AppRequestHandler):
+    """
+    Responde "ok" a cualquier ruta; /close además cierra la conexión.
+    """
+
+    def do_GET(self):
+        headers = {"Connection": "close"} if self.path == "/close" else None
+        if headers:
+            self.close_connection = True
+        self.send_body(200, b"ok", content_type="text/plain", headers=headers)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def base_url():
+    server = build_server(("127.0.0.1", 0), EchoHandler, mode="threaded", workers=8)
+    with ServerRunner(server) as runner:
+        yield runner.url
+
+
+def test_summarize_latencies():
+    stats = summarize_latencies([0.003, 0.001, 0.002, 0.004])
+    assert set(stats) == STAT_KEYS
+    assert stats["samples"] == 4
+    assert stats["min_ms"] == pytest.approx(1)
+    assert stats["mean_ms"] == pytest.approx(2.5)
+    assert stats["p50_ms"] == pytest.approx(2)
+    assert stats["max_ms"] == pytest.approx(4)
+    assert summarize_latencies([])["max_ms"] == 0.0
+
+
+def test_one_cold_sample_per_client(base_url):
+    """
+    Con conexiones persistentes solo la primera petición de cada cliente es fría.
+    """
+    result = profile_endpoint(f"{base_url}/ok", samples=40, concurrency=4)
+    assert result["errors"] == 0
+    assert result["statuses"] == {"200": 40}
+    assert result["cold"]["samples"] == 4
+    assert result["warm"]["samples"] == 36
+    assert result["all"]["samples"] == 40
+    assert result["throughput_rps"] > 0
+    assert result["throughput_bytes_s"] > 0
+    assert result["all"]["min_ms"] <= result["all"]["p50_ms"] <= result["all"]["max_ms"]
+
+
+def test_without_reuse_every_sample_is_cold(base_url):
+    result = profile_endpoint(f"{base_url}/ok", samples=10, concurrency=2, reuse=False)
+    assert result["cold"]["samples"] == 10
+    assert result["warm"]["samples"] == 0
+
+
+def test_server_closing_the_connection_makes_samples_cold(base_url):
+    result = profile_endpoint(f"{base_url}/close", samples=5)
+    assert result["cold"]["samples"] == 5
+
+
+def test_errors_are_counted():
+    result = profile_endpoint("http://127.0.0.1:9/", samples=3)
+    assert result["errors"] == 3
+    assert result["all"]["samples"] == 0
+
+
+def test_main_writes_json(base_url, tmp_path, capsys):
+    output = tmp_path / "profile.json"
+    assert main([f"{base_url}/ok", "--samples", "5", "--output", str(output)]) == 0
+    printed = json.loads(capsys.readouterr().out)
+    saved = json.loads(output.read_text())
+    assert printed["all"]["samples"] == saved["all"]["samples"] == 5
+    assert set(saved["warm"]) == STAT_KEYS
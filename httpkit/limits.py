@@ -0,0 +1,182 @@
+"""
+Plazos y límites de tamaño para la lectura de peticiones.
+
+http.server solo aplica un tiempo máximo a cada lectura del socket: un cliente
+que envía la petición byte a byte (slowloris), sin agotar nunca ese tiempo,
+ocupa un hilo trabajador indefinidamente. DeadlineReader distingue tres plazos:
+
+- inactividad: espera al primer byte de la siguiente petición (keep-alive);
+  si se agota, la conexión se cierra sin responder,
+- cabeceras: desde el primer byte, la línea de petición y las cabeceras deben
+  llegar completas antes de header_timeout segundos en total,
+- lectura: el resto de lecturas (el cuerpo) no pueden esperar más de
+  read_timeout segundos cada una.
+
+HeaderBudget limita el tamaño total de las cabeceras: http.client solo limita
+cada línea (64 KB) y su número (100). BodyReader limita la lectura al cuerpo
+de la petición actual, de modo que nunca se lee parte de la siguiente.
+"""
+
+import http.client
+import io
+import time
+
+
+class HeaderTooLarge(http.client.LineTooLong):
+    """
+    Las cabeceras superan el tamaño máximo (BaseHTTPRequestHandler responde 431).
+    """
+
+    def __init__(self, limit):
+        http.client.HTTPException.__init__(self, f"cabeceras de más de {limit} bytes")
+
+
+class DeadlineReader(io.RawIOBase):
+    """
+    Lectura del socket con los plazos de inactividad, cabeceras y lectura.
+
+    Atributos:
+        in_request: True desde que llega el primer byte de la petición actual
+    """
+
+    def __init__(self, sock):
+        """
+        Args:
+            sock (socket.socket): Conexión del cliente
+        """
+        self.sock = sock
+        self.in_request = False
+        self._timeout = None
+        self._deadline = None
+        self._header_timeout = None
+        self._read_timeout = None
+
+    def readable(self):
+        return True
+
+    def expect_request(self, idle_timeout, header_timeout, read_timeout):
+        """
+        Empieza la espera de una petición nueva. El plazo de cabeceras empieza
+        a contar cuando llega su primer byte.
+        """
+        self.in_request = False
+        self._timeout = idle_timeout
+        self._deadline = None
+        self._header_timeout = header_timeout
+        self._read_timeout = read_timeout
+
+    def expect_body(self):
+        """
+        Las cabeceras ya se han leído: el resto de lecturas (y las escrituras
+        de la respuesta) solo tienen el plazo de lectura.
+        """
+        self.in_request = True
+        self._deadline = None
+        self._timeout = self._read_timeout
+        self.sock.settimeout(self._timeout)
+
+    def readinto(self, buffer):
+        """
+        Lee del socket respetando el plazo vigente.
+
+        Raises:
+            TimeoutError: Si se agota el plazo
+        """
+        timeout = self._timeout
+        if self._deadline is not None:
+            remaining = self._deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError("plazo de lectura de las cabeceras agotado")
+            if timeout is None or remaining < timeout:
+                timeout = remaining
+        self.sock.settimeout(timeout)
+        received = self.sock.recv_into(buffer)
+        if received and not self.in_request:
+            self.in_request = True
+            self._timeout = self._read_timeout
+            if self._header_timeout is not None:
+                self._deadline = time.monotonic() + self._header_timeout
+        return received
+
+
+class HeaderBudget:
+    """
+    Envoltorio de rfile que limita los bytes leídos con readline(), como hace
+    http.client.parse_headers() con cada línea de cabecera.
+    """
+
+    def __init__(self, rfile, limit):
+        """
+        Args:
+            rfile: Fichero de lectura de la petición
+            limit (int): Bytes máximos de las cabeceras (incluida la línea vacía final)
+        """
+        self.rfile = rfile
+        self.limit = limit
+        self.remaining = limit
+
+    def readline(self, size=-1):
+        """
+        Lee una línea de cabecera.
+
+        Raises:
+            HeaderTooLarge: Si las cabeceras superan el límite
+        """
+        budget = self.remaining + 1
+        line = self.rfile.readline(budget if size < 0 else min(size, budget))
+        self.remaining -= len(line)
+        if self.remaining < 0:
+            raise HeaderTooLarge(self.limit)
+        return line
+
+    def __getattr__(self, name):
+        return getattr(self.rfile, name)
+
+
+class BodyReader:
+    """
+    Envoltorio de rfile que solo deja leer el cuerpo de la petición actual
+    (Content-Length bytes) y lleva la cuenta de lo que queda por leer, para
+    descartarlo después si el manejador no lo ha leído entero.
+    """
+
+    def __init__(self, rfile, length):
+        """
+        Args:
+            rfile: Fichero de lectura de la petición
+            length (int): Tamaño del cuerpo según Content-Length
+        """
+        self.rfile = rfile
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size is None or size < 0 or size > self.remaining:
+            size = self.remaining
+        if not size:
+            return b""
+        data = self.rfile.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def readline(self, size=-1):
+        limit = self.remaining if size is None or size < 0 else min(size, self.remaining)
+        if not limit:
+            return b""
+        line = self.rfile.readline(limit)
+        self.remaining -= len(line)
+        return line
+
+    def discard(self):
+        """
+        Lee y descarta lo que quede del cuerpo.
+
+        Returns:
+            bool: False si la conexión se cerró antes de recibirlo entero
+        """
+        while self.remaining:
+            if not self.read(65536):
+                return False
+        return True
+
+    def __getattr__(self, name):
+        return getattr(self.rfile, name)
@@ -0,0 +1,187 @@
+"""
+Métricas de los servidores en formato de texto de Prometheus.
+
+Metrics cuenta, para cada ruta registrada en el enrutador:
+
+- las peticiones por código de estado,
+- un histograma de latencias con cubetas fijas,
+- los bytes de cuerpo enviados,
+
+y además el número de conexiones abiertas en cada momento.
+
+Registrar una petición no crea objetos: todos los contadores viven en un único
+array de números preasignado, y la ruta y el código de estado se convierten en
+una posición del array (un diccionario de rutas construido al inicio y una
+resta). Las rutas se etiquetan con la ruta registrada ("/users/{user_id}"), no
+con la solicitada, así que el número de series está acotado; las peticiones
+que no coinciden con ninguna ruta se agrupan en route="other".
+
+El array está en memoria compartida (multiprocessing.RawArray) y se reserva
+antes de crear los procesos del modo pre-fork: cada trabajador escribe en su
+propia sección (según server.worker_index) y /metrics, lo atienda el
+trabajador que lo atienda, suma las de todos.
+"""
+
+import os
+import threading
+from bisect import bisect_left
+from multiprocessing.sharedctypes import RawArray
+
+# Límites superiores (en segundos) de las cubetas del histograma de latencias
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5, 5.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+OTHER_ROUTE = "other"
+
+# Códigos de estado posibles: de 100 a 599
+_FIRST_STATUS = 100
+_STATUSES = 500
+
+
+class Metrics:
+    """
+    Contadores de peticiones, latencias, bytes enviados y conexiones abiertas.
+
+    Atributos:
+        routes: Rutas con series propias (además de "other")
+        buckets: Límites superiores de las cubetas del histograma, en segundos
+        processes: Procesos que registran, cada uno en su propia sección
+    """
+
+    def __init__(self, routes, buckets=DEFAULT_BUCKETS, processes=1):
+        """
+        Args:
+            routes (list): Rutas registradas (normalmente Router.paths)
+            buckets (tuple): Límites superiores de las cubetas, en orden creciente
+            processes (int, opcional): Procesos trabajadores que registrarán
+                (en modo "prefork"; None equivale a uno por núcleo, como en
+                PreforkServer)
+        """
+        self.routes = list(routes) + [OTHER_ROUTE]
+        self.buckets = tuple(buckets)
+        self.processes = processes or os.cpu_count() or 1
+        self._route_index = {route: index for index, route in enumerate(self.routes)}
+        self._other = len(self.routes) - 1
+
+        # Disposición de cada ruta: contadores por estado, cubetas (con +Inf),
+        # suma de latencias y bytes enviados
+        self._buckets_offset = _STATUSES
+        self._sum_offset = self._buckets_offset + len(self.buckets) + 1
+        self._bytes_offset = self._sum_offset + 1
+        self._route_size = self._bytes_offset + 1
+        # Cada proceso: todas sus rutas y el número de conexiones abiertas
+        self._connections_offset = len(self.routes) * self._route_size
+        self._slot_size = self._connections_offset + 1
+        self._values = RawArray("d", self.processes * self._slot_size)
+        self._lock = threading.Lock()
+
+    def record(self, slot, route, status, size, duration):
+        """
+        Registra una petición atendida.
+
+        Args:
+            slot (int): Sección del proceso (server.worker_index, o 0)
+            route (str): Ruta registrada que atendió la petición, o None
+            status (int): Código de estado de la respuesta
+            size (int): Bytes de cuerpo enviados (None si no hubo cuerpo)
+            duration (float): Segundos empleados en atender la petición
+        """
+        base = ((slot % self.processes) * self._slot_size
+                + self._route_index.get(route, self._other) * self._route_size)
+        bucket = bisect_left(self.buckets, duration)
+        values = self._values
+        with self._lock:
+            values[base + status - _FIRST_STATUS] += 1
+            values[base + self._buckets_offset + bucket] += 1
+            values[base + self._sum_offset] += duration
+            if size:
+                values[base + self._bytes_offset] += size
+
+    def connection_opened(self, slot):
+        """
+        Anota una conexión nueva en la sección del proceso.
+        """
+        with self._lock:
+            self._values[(slot % self.processes) * self._slot_size
+                         + self._connections_offset] += 1
+
+    def connection_closed(self, slot):
+        """
+        Anota el cierre de una conexión en la sección del proceso.
+        """
+        with self._lock:
+            self._values[(slot % self.processes) * self._slot_size
+                         + self._connections_offset] -= 1
+
+    def totals(self):
+        """
+        Suma las secciones de todos los procesos.
+
+        Returns:
+            list: Valores agregados con la disposición de una sección
+        """
+        size = self._slot_size
+        totals = self._values[0:size]
+        for slot in range(1, self.processes):
+            totals = [a + b for a, b in zip(totals, self._values[slot * size:(slot + 1) * size])]
+        return totals
+
+    def render(self):
+        """
+        Genera la exposición en formato de texto de Prometheus.
+
+        Returns:
+            bytes: Texto listo para enviar con CONTENT_TYPE
+        """
+        totals = self.totals()
+        requests = ["# HELP http_requests_total Peticiones atendidas por ruta y código de estado.",
+                    "# TYPE http_requests_total counter"]
+        durations = ["# HELP http_request_duration_seconds Tiempo en atender cada petición.",
+                     "# TYPE http_request_duration_seconds histogram"]
+        sent = ["# HELP http_response_bytes_total Bytes de cuerpo enviados.",
+                "# TYPE http_response_bytes_total counter"]
+        bounds = [_format_value(bound) for bound in self.buckets] + ["+Inf"]
+
+        for index, route in enumerate(self.routes):
+            base = index * self._route_size
+            label = _escape(route)
+            for status in range(_STATUSES):
+                count = totals[base + status]
+                if count:
+                    requests.append(f'http_requests_total{{route="{label}",'
+                                    f'status="{status + _FIRST_STATUS}"}} {_format_value(count)}')
+            cumulative = 0.0
+            for bucket, bound in enumerate(bounds):
+                cumulative += totals[base + self._buckets_offset + bucket]
+                durations.append(f'http_request_duration_seconds_bucket{{route="{label}",'
+                                 f'le="{bound}"}} {_format_value(cumulative)}')
+            durations.append(f'http_request_duration_seconds_sum{{route="{label}"}} '
+                             f'{_format_value(totals[base + self._sum_offset])}')
+            durations.append(f'http_request_duration_seconds_count{{route="{label}"}} '
+                             f'{_format_value(cumulative)}')
+            sent.append(f'http_response_bytes_total{{route="{label}"}} '
+                        f'{_format_value(totals[base + self._bytes_offset])}')
+
+        connections = ["# HELP http_connections_in_flight Conexiones abiertas.",
+                       "# TYPE http_connections_in_flight gauge",
+                       "http_connections_in_flight "
+                       f"{_format_value(totals[self._connections_offset])}"]
+        return ("\n".join(requests + durations + sent + connections) + "\n").encode()
+
+
+def _format_value(value):
+    """
+    Formatea un número como Prometheus (los enteros, sin decimales).
+    """
+    if value == int(value):
+        return str(int(value))
+    return repr(value)
+
+
+def _escape(label):
+    """
+    Escapa el valor de una etiqueta.
+    """
+    return label.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
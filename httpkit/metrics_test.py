@@ -0,0 +1,87 @@
+"""
+Tests para httpkit/metrics.py
+Comprueban los contadores por ruta y estado, el histograma, la agregación de
+las secciones de varios procesos y el formato de texto de Prometheus.
+"""
+
+import os
+
+import pytest
+
+from httpkit.metrics import Metrics
+
+
+def samples(metrics):
+    """
+    Devuelve las muestras de la exposición como diccionario línea -> valor.
+    """
+    lines = metrics.render().decode().splitlines()
+    return dict(line.rsplit(" ", 1) for line in lines if not line.startswith("#"))
+
+
+def test_counts_by_route_and_status():
+    metrics = Metrics(["/ip", "/users/{user_id}"])
+    metrics.record(0, "/ip", 200, 20, 0.002)
+    metrics.record(0, "/ip", 200, 20, 0.002)
+    metrics.record(0, "/ip", 304, 0, 0.001)
+    metrics.record(0, "/users/{user_id}", 404, 50, 0.001)
+    metrics.record(0, None, 404, 60, 0.001)
+
+    values = samples(metrics)
+    assert values['http_requests_total{route="/ip",status="200"}'] == "2"
+    assert values['http_requests_total{route="/ip",status="304"}'] == "1"
+    assert values['http_requests_total{route="/users/{user_id}",status="404"}'] == "1"
+    assert values['http_requests_total{route="other",status="404"}'] == "1"
+    assert 'http_requests_total{route="/ip",status="404"}' not in values
+    assert values['http_response_bytes_total{route="/ip"}'] == "40"
+    assert values['http_response_bytes_total{route="other"}'] == "60"
+
+
+def test_histogram_is_cumulative():
+    metrics = Metrics(["/ip"], buckets=(0.01, 0.1))
+    for duration in (0.005, 0.01, 0.05, 3.0):
+        metrics.record(0, "/ip", 200, None, duration)
+
+    values = samples(metrics)
+    assert values['http_request_duration_seconds_bucket{route="/ip",le="0.01"}'] == "2"
+    assert values['http_request_duration_seconds_bucket{route="/ip",le="0.1"}'] == "3"
+    assert values['http_request_duration_seconds_bucket{route="/ip",le="+Inf"}'] == "4"
+    assert values['http_request_duration_seconds_count{route="/ip"}'] == "4"
+    assert float(values['http_request_duration_seconds_sum{route="/ip"}']) == pytest.approx(3.065)
+
+
+def test_connections_gauge():
+    metrics = Metrics(["/ip"])
+    metrics.connection_opened(0)
+    metrics.connection_opened(0)
+    metrics.connection_closed(0)
+    assert samples(metrics)["http_connections_in_flight"] == "1"
+
+
+def test_slots_are_aggregated():
+    """
+    Cada proceso escribe en su sección y la exposición suma todas.
+    """
+    metrics = Metrics(["/ip"], processes=3)
+    for slot in range(3):
+        metrics.record(slot, "/ip", 200, 10, 0.001)
+        metrics.connection_opened(slot)
+    values = samples(metrics)
+    assert values['http_requests_total{route="/ip",status="200"}'] == "3"
+    assert values['http_response_bytes_total{route="/ip"}'] == "30"
+    assert values["http_connections_in_flight"] == "3"
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="Requiere os.fork()")
+def test_shared_across_fork():
+    """
+    Lo que registra un proceso hijo es visible en el padre (memoria compartida).
+    """
+    metrics = Metrics(["/ip"], processes=2)
+    pid = os.fork()
+    if pid == 0:
+        metrics.record(1, "/ip", 200, 10, 0.001)
+        os._exit(0)
+    os.waitpid(pid, 0)
+    metrics.record(0, "/ip", 200, 10, 0.001)
+    assert samples(metrics)['http_requests_total{route="/ip",status="200"}'] == "2"
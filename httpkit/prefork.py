@@ -0,0 +1,301 @@
+"""
+Modo multiproceso (pre-fork) para los servidores de los ejercicios.
+
+Un proceso supervisor crea N procesos trabajadores con fork(). Cada trabajador
+ejecuta su propio servidor (con el motor elegido: "single", "threaded" o
+"asyncio") sobre el mismo puerto, de modo que el GIL deja de limitar el
+servidor a un único núcleo. El puerto se comparte de una de dos formas:
+
+- SO_REUSEPORT (si el sistema lo soporta): cada trabajador abre su propio
+  socket de escucha en el mismo puerto y el núcleo reparte las conexiones.
+- Socket heredado: el supervisor abre el socket de escucha antes del fork y
+  todos los trabajadores aceptan conexiones sobre él.
+
+El supervisor vuelve a lanzar los trabajadores que terminan inesperadamente y
+los detiene todos (SIGTERM y, pasado un plazo, SIGKILL) al llamar a shutdown().
+Con SIGTERM cada trabajador termina de responder las peticiones en curso antes
+de salir. Cada trabajador avisa al supervisor por una tubería cuando ya acepta
+conexiones; el evento ready se activa cuando lo han hecho todos.
+
+Un trabajador que muere por una excepción escribe la traza en stderr antes de
+salir. Si muere poco después de arrancar (antes de min_uptime segundos) se
+relanza tras una espera que se dobla con cada caída seguida, para no crear
+procesos sin parar; tras max_crashes caídas seguidas el supervisor se rinde:
+detiene el resto de trabajadores y serve_forever() lanza WorkerCrashLoop, de
+modo que el programa termina con un código de salida distinto de cero.
+"""
+
+import os
+import signal
+import socket
+import threading
+import time
+import traceback
+
+from httpkit.servers import build_server, stop_gracefully
+
+HAS_REUSEPORT = hasattr(socket, "SO_REUSEPORT")
+
+
+class WorkerCrashLoop(RuntimeError):
+    """
+    Un trabajador ha muerto nada más arrancar demasiadas veces seguidas.
+    """
+
+
+def _adopt_socket(server, sock):
+    """
+    Sustituye el socket (sin enlazar) de un servidor por el socket de escucha
+    compartido, actualizando los atributos que fija server_bind().
+    """
+    server.socket.close()
+    server.socket = sock
+    server.server_address = sock.getsockname()[:2]
+    host, server.server_port = server.server_address
+    server.server_name = socket.getfqdn(host)
+
+
+class PreforkServer:
+    """
+    Supervisor de procesos trabajadores con la misma interfaz que HTTPServer
+    (serve_forever, shutdown, server_close, server_address, server_port).
+
+    Atributos:
+        processes: Número de procesos trabajadores
+        reuse_port: True si cada trabajador abre su socket con SO_REUSEPORT
+        pids: Diccionario índice de trabajador -> pid del proceso vivo
+        restarts: Número de trabajadores relanzados tras morir
+        ready: Evento que se activa cuando todos los trabajadores aceptan conexiones
+        shutdown_timeout: Segundos de espera tras SIGTERM antes de enviar SIGKILL
+        min_uptime: Segundos que debe vivir un trabajador para no contar como caída
+        max_crashes: Caídas seguidas de un trabajador tras las que el supervisor se rinde
+        restart_backoff: Espera antes de relanzar tras la primera caída (se dobla en cada una)
+        max_restart_backoff: Espera máxima antes de relanzar un trabajador
+    """
+
+    shutdown_timeout = 5
+    min_uptime = 1.0
+    max_crashes = 5
+    restart_backoff = 0.1
+    max_restart_backoff = 5.0
+
+    def __init__(self, server_address, RequestHandlerClass, processes=None,
+                 worker_mode="threaded", workers=None, queue_size=None, reuse_port=None,
+                 extensions=None):
+        """
+        Reserva el puerto y prepara el supervisor (los procesos se crean en
+        serve_forever()).
+
+        Args:
+            server_address: Tupla (host, puerto) donde escuchar (puerto 0 = libre)
+            RequestHandlerClass: Clase manejadora de las peticiones
+            processes (int, opcional): Número de procesos (por defecto, uno por núcleo)
+            worker_mode (str): Motor que ejecuta cada trabajador ("single",
+                "threaded" o "asyncio")
+            workers (int, opcional): Hilos por proceso en modo "threaded"
+            queue_size (int, opcional): Cola por proceso en modo "threaded"
+            reuse_port (bool, opcional): Forzar o desactivar SO_REUSEPORT
+            extensions (dict, opcional): Atributos para el servidor de cada
+                trabajador (ver build_server)
+        """
+        self.RequestHandlerClass = RequestHandlerClass
+        self.processes = processes or os.cpu_count() or 1
+        self.worker_mode = worker_mode
+        self.worker_options = {"workers": workers, "queue_size": queue_size,
+                               **(extensions or {})}
+        self.reuse_port = HAS_REUSEPORT if reuse_port is None else reuse_port
+        if self.reuse_port and not HAS_REUSEPORT:
+            raise ValueError("SO_REUSEPORT no está disponible en este sistema")
+
+        if self.reuse_port:
+            # El socket del supervisor solo reserva el puerto: al no llamar a
+            # listen() el núcleo no le entrega conexiones
+            family = socket.AF_INET6 if ":" in server_address[0] else socket.AF_INET
+            self.socket = socket.socket(family, socket.SOCK_STREAM)
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+            self.socket.bind(server_address)
+        else:
+            self.socket = socket.create_server(server_address, backlog=1024)
+
+        self.server_address = self.socket.getsockname()[:2]
+        host, self.server_port = self.server_address
+        self.server_name = socket.getfqdn(host)
+        self.pids = {}
+        self.restarts = 0
+        # Por trabajador: instante de arranque, caídas seguidas y, si está
+        # esperando para relanzarse, instante en que se relanzará
+        self._started = {}
+        self._crashes = {}
+        self._pending = {}
+        self.ready = threading.Event()
+        self._ready_pipe = None
+        self._shutdown_request = threading.Event()
+        self._is_shut_down = threading.Event()
+        self._is_shut_down.set()
+
+    def serve_forever(self, poll_interval=0.1):
+        """
+        Lanza los trabajadores y los supervisa hasta que se llame a shutdown().
+
+        Raises:
+            WorkerCrashLoop: Si un trabajador muere nada más arrancar
+                max_crashes veces seguidas (el resto ya se han detenido)
+        """
+        self._is_shut_down.clear()
+        self.ready.clear()
+        read_end, self._ready_pipe = os.pipe()
+        watcher = threading.Thread(target=self._watch_ready, args=(read_end,),
+                                   name="prefork-ready", daemon=True)
+        watcher.start()
+        self._crashes = {}
+        self._pending = {}
+        try:
+            for index in range(self.processes):
+                self._spawn(index)
+            while not self._shutdown_request.is_set():
+                self._reap(respawn=True)
+                self._shutdown_request.wait(poll_interval)
+        finally:
+            self._stop_workers()
+            # Sin trabajadores vivos, cerrar el extremo de escritura termina el vigilante
+            os.close(self._ready_pipe)
+            self._ready_pipe = None
+            watcher.join()
+            self.ready.clear()
+            self._shutdown_request.clear()
+            self._is_shut_down.set()
+
+    def _watch_ready(self, read_end):
+        """
+        Cuenta los avisos de los trabajadores y activa ready cuando han llegado
+        tantos como procesos (los relanzados también avisan, sin efecto).
+        """
+        started = 0
+        with os.fdopen(read_end, "rb", buffering=0) as pipe:
+            while True:
+                data = pipe.read(64)
+                if not data:
+                    break
+                started += len(data)
+                if started >= self.processes:
+                    self.ready.set()
+
+    def shutdown(self):
+        """
+        Detiene a todos los trabajadores y espera a que serve_forever() termine.
+        """
+        self._shutdown_request.set()
+        self._is_shut_down.wait()
+
+    def server_close(self):
+        """
+        Cierra el socket del supervisor.
+        """
+        self.socket.close()
+
+    def _spawn(self, index):
+        """
+        Crea el proceso trabajador número index.
+        """
+        pid = os.fork()
+        if pid:
+            self.pids[index] = pid
+            self._started[index] = time.monotonic()
+            return
+        status = 1
+        try:
+            self._run_worker(index)
+            status = 0
+        except BaseException:
+            traceback.print_exc()
+        finally:
+            os._exit(status)
+
+    def _run_worker(self, index):
+        """
+        Cuerpo del proceso trabajador: sirve peticiones hasta recibir SIGTERM.
+        """
+        if self.reuse_port:
+            sock = socket.create_server(self.server_address, backlog=1024, reuse_port=True)
+            self.socket.close()
+        else:
+            sock = self.socket
+
+        server = build_server(self.server_address, self.RequestHandlerClass,
+                              mode=self.worker_mode, bind_and_activate=False,
+                              **self.worker_options)
+        _adopt_socket(server, sock)
+        server.worker_index = index
+        server.processes = self.processes
+
+        def stop(signum, frame):
+            # shutdown() espera a serve_forever(), que corre en este mismo hilo
+            threading.Thread(target=stop_gracefully, args=(server,), daemon=True).start()
+
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        # El socket ya escucha: las conexiones esperan en la cola de aceptación
+        os.write(self._ready_pipe, b".")
+        os.close(self._ready_pipe)
+        try:
+            server.serve_forever()
+        finally:
+            server.server_close()
+
+    def _reap(self, respawn):
+        """
+        Recoge los trabajadores terminados y, si se indica, programa su
+        relanzamiento (inmediato, o con espera si han muerto nada más arrancar)
+        y relanza los que ya han cumplido su espera.
+
+        Raises:
+            WorkerCrashLoop: Si un trabajador acumula max_crashes caídas seguidas
+        """
+        now = time.monotonic()
+        for index, pid in list(self.pids.items()):
+            try:
+                finished, _ = os.waitpid(pid, os.WNOHANG)
+            except ChildProcessError:
+                finished = pid
+            if not finished:
+                continue
+            del self.pids[index]
+            if not respawn:
+                continue
+            if now - self._started.get(index, now) >= self.min_uptime:
+                self._crashes[index] = 0
+                self._pending[index] = now
+                continue
+            crashes = self._crashes.get(index, 0) + 1
+            self._crashes[index] = crashes
+            if crashes >= self.max_crashes:
+                raise WorkerCrashLoop(
+                    f"El trabajador {index} ha muerto al arrancar {crashes} veces seguidas")
+            self._pending[index] = now + min(self.max_restart_backoff,
+                                             self.restart_backoff * 2 ** (crashes - 1))
+        for index, due in list(self._pending.items()):
+            if due <= now:
+                del self._pending[index]
+                self.restarts += 1
+                self._spawn(index)
+
+    def _stop_workers(self):
+        """
+        Envía SIGTERM a todos los trabajadores y SIGKILL a los que no terminen a tiempo.
+        """
+        for pid in self.pids.values():
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        deadline = time.monotonic() + self.shutdown_timeout
+        while self.pids and time.monotonic() < deadline:
+            self._reap(respawn=False)
+            time.sleep(0.01)
+        for pid in self.pids.values():
+            try:
+                os.kill(pid, signal.SIGKILL)
+                os.waitpid(pid, 0)
+            except (ProcessLookupError, ChildProcessError):
+                pass
+        self.pids = {}
@@ -0,0 +1,141 @@
+"""
+Tests para httpkit/prefork.py
+Comprueban que varios procesos atienden el mismo puerto, que el supervisor
+relanza los trabajadores muertos y que shutdown() los detiene todos.
+"""
+
+import os
+import signal
+import threading
+import time
+
+import pytest
+import requests
+
+from httpkit.handler import AppRequestHandler
+from httpkit.prefork import HAS_REUSEPORT, PreforkServer, WorkerCrashLoop
+from httpkit.servers import build_server
+
+
+class PidHandler(AppRequestHandler):
+    """
+    Manejador que devuelve el pid del proceso que atiende la petición.
+    """
+
+    def do_GET(self):
+        body = str(os.getpid()).encode()
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def wait_for(condition, timeout=5):
+    """
+    Espera activa hasta que condition() sea cierto o se agote el plazo.
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def fetch_pid(server):
+    """
+    Pide / al servidor y devuelve el pid que ha respondido (o None si falla).
+    """
+    try:
+        response = requests.get(f"http://127.0.0.1:{server.server_port}/", timeout=1)
+        return int(response.text)
+    except requests.RequestException:
+        return None
+
+
+@pytest.fixture(params=[True, False] if HAS_REUSEPORT else [False],
+                ids=lambda reuse: "reuseport" if reuse else "inherited")
+def server(request):
+    """
+    Supervisor con dos procesos, compartiendo el puerto con cada estrategia.
+    """
+    server = PreforkServer(("127.0.0.1", 0), PidHandler, processes=2,
+                           workers=2, reuse_port=request.param)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    assert wait_for(lambda: len(server.pids) == 2 and fetch_pid(server) is not None)
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join(1)
+
+
+def test_build_server_prefork():
+    """
+    El modo "prefork" crea un PreforkServer con el número de procesos pedido.
+    """
+    server = build_server(("127.0.0.1", 0), PidHandler, mode="prefork", processes=3)
+    try:
+        assert isinstance(server, PreforkServer)
+        assert server.processes == 3
+        assert server.server_port > 0
+    finally:
+        server.server_close()
+
+
+def test_requests_served_by_workers(server):
+    """
+    Las peticiones las atienden los procesos trabajadores, no el supervisor.
+    """
+    pids = {fetch_pid(server) for _ in range(20)}
+    assert os.getpid() not in pids
+    assert pids <= set(server.pids.values())
+
+
+def test_dead_worker_is_restarted(server):
+    """
+    Si un trabajador muere, el supervisor lanza otro en su lugar.
+    """
+    victim = server.pids[0]
+    os.kill(victim, signal.SIGKILL)
+    assert wait_for(lambda: server.pids.get(0) not in (None, victim))
+    assert server.restarts == 1
+    assert wait_for(lambda: fetch_pid(server) is not None)
+
+
+def test_shutdown_stops_all_workers(server):
+    """
+    shutdown() termina todos los procesos trabajadores.
+    """
+    pids = list(server.pids.values())
+    server.shutdown()
+    for pid in pids:
+        with pytest.raises(ProcessLookupError):
+            os.kill(pid, 0)
+
+
+def test_crash_loop_gives_up(capfd):
+    """
+    Si los trabajadores mueren nada más arrancar, el supervisor los relanza con
+    esperas crecientes y, tras max_crashes caídas seguidas, se rinde.
+    """
+    # Un motor que no existe hace fallar a cada trabajador al crear su servidor
+    server = PreforkServer(("127.0.0.1", 0), PidHandler, processes=2, worker_mode="nonexistent")
+    server.restart_backoff = 0.01
+    server.max_crashes = 3
+    try:
+        started = time.monotonic()
+        with pytest.raises(WorkerCrashLoop):
+            server.serve_forever(poll_interval=0.01)
+        # Esperas de 0.01 y 0.02 s antes de los dos relanzamientos
+        assert time.monotonic() - started >= 0.03
+        assert server.pids == {}
+        assert 2 <= server.restarts <= 4
+    finally:
+        server.server_close()
+    assert "ValueError" in capfd.readouterr().err, "La traza del trabajador debe llegar a stderr."
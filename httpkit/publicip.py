@@ -0,0 +1,59 @@
+"""
+IP pública del equipo: validación de las respuestas y caché en memoria.
+
+Los ejercicios ej1a1 y ej1a2 consultan la IP pública a servicios como
+api.ipify.org. La IP casi nunca cambia, así que public_ip_cache() la guarda
+en memoria y, cuando caduca, la sigue sirviendo mientras se refresca en
+segundo plano (ver httpkit.cache.StaleWhileRevalidateCache).
+
+La caché solo sustituye el valor guardado cuando la consulta devuelve algo
+distinto de None, de modo que las funciones de consulta deben devolver None
+(y no una cadena vacía o un texto cualquiera) si la respuesta no es una IP:
+parse_ip() hace esa comprobación.
+
+Uso:
+    ip_cache = public_ip_cache(lambda: get_user_ip())
+    ip = ip_cache.get()
+"""
+
+import ipaddress
+
+from httpkit.cache import StaleWhileRevalidateCache
+
+# Segundos durante los que la IP pública guardada se considera actual
+IP_CACHE_TTL = 300
+
+
+def parse_ip(value):
+    """
+    Valida y normaliza una dirección IP (v4 o v6) recibida de un servicio.
+
+    Args:
+        value (str): Texto de la respuesta (se ignoran los espacios)
+
+    Returns:
+        str: La dirección IP
+        None: Si el valor está vacío o no es una dirección IP
+    """
+    if not isinstance(value, str):
+        return None
+    try:
+        return str(ipaddress.ip_address(value.strip()))
+    except ValueError:
+        return None
+
+
+def public_ip_cache(fetch, ttl=IP_CACHE_TTL, **options):
+    """
+    Crea la caché en memoria de la IP pública.
+
+    Args:
+        fetch: Función sin argumentos que consulta la IP y devuelve None si falla
+        ttl (float): Segundos durante los que la IP guardada se considera actual
+        **options: Otras opciones de StaleWhileRevalidateCache (retry_interval, clock)
+
+    Returns:
+        StaleWhileRevalidateCache: La caché; get() devuelve la IP, o None si
+            nunca se ha podido obtener
+    """
+    return StaleWhileRevalidateCache(fetch, ttl=ttl, **options)
@@ -0,0 +1,43 @@
+"""
+Tests para httpkit/publicip.py
+Comprueban la validación de las IP recibidas y que la caché conserva la
+última IP válida cuando una consulta devuelve algo que no lo es.
+"""
+
+import time
+
+from httpkit.publicip import IP_CACHE_TTL, parse_ip, public_ip_cache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_parse_ip():
+    assert parse_ip(" 98.207.254.136\n") == "98.207.254.136"
+    assert parse_ip("2001:DB8::1") == "2001:db8::1"
+    assert parse_ip("") is None
+    assert parse_ip("<html>error</html>") is None
+    assert parse_ip(None) is None
+
+
+def test_cache_keeps_last_valid_ip():
+    """
+    Un refresco que no obtiene una IP válida no sustituye a la guardada.
+    """
+    answers = iter(["98.207.254.136", ""])
+    clock = FakeClock()
+    cache = public_ip_cache(lambda: parse_ip(next(answers)), clock=clock)
+    assert cache.get() == "98.207.254.136"
+    clock.now += IP_CACHE_TTL
+    # La IP caducada se sigue sirviendo mientras se refresca en segundo plano
+    assert cache.get() == "98.207.254.136"
+    deadline = time.monotonic() + 5
+    while cache.refreshes < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert cache.failures == 1
+    assert cache.get() == "98.207.254.136"
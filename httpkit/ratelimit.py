@@ -0,0 +1,146 @@
+"""
+Limitación de peticiones por cliente con cubetas de fichas (token bucket).
+
+Cada cliente tiene una cubeta con capacidad para burst fichas que se rellena a
+rate fichas por segundo; cada petición consume una ficha y, si no queda
+ninguna, se responde 429 con Retry-After. Es barato en el camino de cada
+petición: un hash de la clave, unas pocas posiciones de un array y unas
+operaciones aritméticas bajo un candado.
+
+La tabla de cubetas está en memoria compartida (multiprocessing.RawArray,
+igual que las métricas) y se reserva al crear el limitador, antes de crear
+los procesos del modo pre-fork. Así todos los trabajadores consumen de la
+misma cubeta y el límite es el configurado, atienda quien atienda cada
+conexión del cliente.
+
+La memoria está acotada: la tabla tiene max_entries posiciones y cada clave
+se guarda en una de las PROBE posiciones siguientes a su hash. Si todas están
+ocupadas por otros clientes se reutiliza la del que lleva más tiempo sin
+pedir nada entre ellas (un LRU aproximado, limitado a esas posiciones).
+Descartar una cubeta inactiva no cambia nada: pasado el tiempo de rellenado
+estaría llena, igual que una nueva.
+"""
+
+import hashlib
+import json
+import math
+import multiprocessing
+import time
+from multiprocessing.sharedctypes import RawArray, RawValue
+
+TOO_MANY_REQUESTS_BODY = json.dumps(
+    {"code": 429, "message": "Demasiadas peticiones"}
+).encode()
+
+# Posiciones de la tabla en las que puede guardarse cada clave
+PROBE = 8
+
+
+def _key_hash(key):
+    """
+    Hash de 64 bits (distinto de 0, que marca una posición libre) de una clave.
+    """
+    digest = hashlib.blake2b(key.encode("utf-8", "surrogateescape"), digest_size=8).digest()
+    return int.from_bytes(digest, "little", signed=True) or 1
+
+
+class TokenBucketLimiter:
+    """
+    Limitador por clave (normalmente la IP del cliente), seguro entre hilos y
+    entre los procesos creados después de él.
+
+    Atributos:
+        rate: Fichas que recupera cada cliente por segundo
+        burst: Capacidad de la cubeta (peticiones seguidas permitidas)
+        max_entries: Número máximo de clientes en la tabla
+        rejected: Peticiones rechazadas (por todos los procesos)
+    """
+
+    def __init__(self, rate, burst=None, max_entries=10000, clock=time.monotonic):
+        """
+        Args:
+            rate (float): Peticiones por segundo sostenidas por cliente
+            burst (float, opcional): Peticiones seguidas permitidas (por defecto rate)
+            max_entries (int): Número máximo de clientes en la tabla
+            clock: Función que devuelve el instante actual en segundos
+        """
+        if rate <= 0:
+            raise ValueError("rate debe ser mayor que 0")
+        self.rate = float(rate)
+        self.burst = float(burst if burst is not None else rate)
+        self.max_entries = max_entries
+        self.clock = clock
+        # Por cada posición: hash de la clave (0 si está libre), y fichas e
+        # instante de la última petición de su cubeta
+        self._keys = RawArray("q", max_entries)
+        self._tokens = RawArray("d", max_entries)
+        self._last = RawArray("d", max_entries)
+        self._rejected = RawValue("q", 0)
+        self._lock = multiprocessing.Lock()
+
+    @property
+    def rejected(self):
+        return self._rejected.value
+
+    def __len__(self):
+        with self._lock:
+            return sum(1 for key in self._keys if key)
+
+    def check(self, key, cost=1.0):
+        """
+        Consume fichas de la cubeta de key.
+
+        Args:
+            key (str): Cliente (por ejemplo, su IP)
+            cost (float): Fichas que consume la petición (como mucho burst)
+
+        Returns:
+            float: 0.0 si la petición se admite; si no, segundos que el
+                cliente debe esperar
+
+        Raises:
+            ValueError: Si cost supera burst (la petición nunca se admitiría)
+        """
+        if cost > self.burst:
+            raise ValueError(f"cost ({cost}) no puede superar burst ({self.burst})")
+        hashed = _key_hash(key)
+        now = self.clock()
+        with self._lock:
+            slot = self._slot(hashed)
+            if self._keys[slot] != hashed:
+                self._keys[slot] = hashed
+                tokens = self.burst
+            else:
+                tokens = min(self.burst,
+                             self._tokens[slot] + (now - self._last[slot]) * self.rate)
+            self._last[slot] = now
+            if tokens >= cost:
+                self._tokens[slot] = tokens - cost
+                return 0.0
+            self._tokens[slot] = tokens
+            self._rejected.value += 1
+        return (cost - tokens) / self.rate
+
+    def _slot(self, hashed):
+        """
+        Posición de la cubeta de hashed: la suya si ya está en la tabla, si no
+        la primera libre y, con todas ocupadas, la usada hace más tiempo.
+        """
+        size = self.max_entries
+        start = hashed % size
+        oldest = None
+        for offset in range(min(PROBE, size)):
+            slot = (start + offset) % size
+            current = self._keys[slot]
+            if current == hashed or current == 0:
+                return slot
+            if oldest is None or self._last[slot] < self._last[oldest]:
+                oldest = slot
+        return oldest
+
+    @staticmethod
+    def retry_after(wait):
+        """
+        Valor de la cabecera Retry-After (segundos enteros, al menos 1).
+        """
+        return str(max(1, math.ceil(wait)))
@@ -0,0 +1,124 @@
+"""
+Tests para httpkit/ratelimit.py
+Comprueban el rellenado de las cubetas, el tiempo de espera devuelto, el
+límite de la tabla y el uso desde varios hilos.
+"""
+
+import multiprocessing
+import threading
+
+import pytest
+
+from httpkit.ratelimit import TokenBucketLimiter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_burst_then_refill():
+    """
+    Se admiten burst peticiones seguidas y después una cada 1/rate segundos.
+    """
+    clock = FakeClock()
+    limiter = TokenBucketLimiter(rate=2, burst=3, clock=clock)
+    assert [limiter.check("a") for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert limiter.check("a") == pytest.approx(0.5)
+    clock.now += 0.5
+    assert limiter.check("a") == 0.0
+    assert limiter.check("a") > 0
+    assert limiter.rejected == 2
+
+
+def test_bucket_does_not_exceed_burst():
+    """
+    Un cliente inactivo mucho tiempo no acumula más de burst fichas.
+    """
+    clock = FakeClock()
+    limiter = TokenBucketLimiter(rate=1, burst=2, clock=clock)
+    limiter.check("a")
+    clock.now += 3600
+    assert [limiter.check("a") for _ in range(3)] == [0.0, 0.0, pytest.approx(1.0)]
+
+
+def test_clients_are_independent():
+    clock = FakeClock()
+    limiter = TokenBucketLimiter(rate=1, burst=1, clock=clock)
+    assert limiter.check("a") == 0.0
+    assert limiter.check("a") > 0
+    assert limiter.check("b") == 0.0
+
+
+def test_cost_over_burst_is_rejected():
+    """
+    Una petición que cuesta más que la cubeta entera nunca podría admitirse.
+    """
+    limiter = TokenBucketLimiter(rate=4, burst=2, clock=FakeClock())
+    assert limiter.check("a", cost=2) == 0.0
+    with pytest.raises(ValueError):
+        limiter.check("a", cost=8)
+
+
+def test_buckets_are_shared_between_processes():
+    """
+    Un proceso creado después del limitador consume de las mismas cubetas.
+    """
+    clock = FakeClock()
+    limiter = TokenBucketLimiter(rate=1, burst=3, clock=clock)
+    assert limiter.check("a") == 0.0
+    child = multiprocessing.get_context("fork").Process(
+        target=lambda: [limiter.check("a") for _ in range(3)])
+    child.start()
+    child.join()
+    assert child.exitcode == 0
+    assert limiter.check("a") > 0
+    assert limiter.rejected == 2
+
+
+def test_table_is_bounded_lru():
+    """
+    La tabla no supera max_entries y se descarta el cliente inactivo más antiguo.
+    """
+    clock = FakeClock()
+    limiter = TokenBucketLimiter(rate=1, burst=1, max_entries=2, clock=clock)
+    for key in ("a", "b", "a", "c"):
+        clock.now += 0.1
+        limiter.check(key)
+    assert len(limiter) == 2
+    # "a" sigue agotada; "b" se había descartado y vuelve con la cubeta llena
+    assert limiter.check("a") > 0
+    assert limiter.check("b") == 0.0
+
+
+def test_retry_after_header():
+    assert TokenBucketLimiter.retry_after(0.01) == "1"
+    assert TokenBucketLimiter.retry_after(2.2) == "3"
+
+
+def test_invalid_rate():
+    with pytest.raises(ValueError):
+        TokenBucketLimiter(rate=0)
+
+
+def test_thread_safety():
+    """
+    Desde varios hilos a la vez se admiten exactamente burst peticiones.
+    """
+    clock = FakeClock()
+    limiter = TokenBucketLimiter(rate=1, burst=500, clock=clock)
+    admitted = []
+
+    def worker():
+        admitted.append(sum(1 for _ in range(200) if limiter.check("a") == 0.0))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sum(admitted) == 500
+    assert limiter.rejected == 8 * 200 - 500
@@ -0,0 +1,367 @@
+"""
+Reintentos y cortacircuitos para las peticiones de los clientes de los ejercicios.
+
+Si un servicio externo empieza a fallar (o a ir muy lento), devolver None al
+primer error obliga a quien llama a repetir la petición por su cuenta, y
+reintentar sin control multiplica la carga justo cuando el servicio menos la
+soporta. ResilientClient envuelve la función que hace la petición y añade:
+
+- Reintentos con espera exponencial y jitter completo (espera aleatoria entre
+  0 y backoff * 2^n, con un máximo), para que los clientes no reintenten todos
+  a la vez. Se reintentan los errores de red y las respuestas 429/5xx
+  temporales (RETRY_STATUSES).
+- Respeto de la cabecera Retry-After (en segundos o como fecha HTTP): nunca se
+  reintenta antes de lo que pide el servidor, y si pide esperar más de
+  max_retry_after se devuelve la respuesta sin reintentar.
+- Un presupuesto de reintentos (RetryBudget) compartido por todas las
+  peticiones: los reintentos no pueden superar una fracción de las peticiones,
+  de modo que durante una caída del servicio la carga extra está acotada.
+- Un cortacircuitos por host (CircuitBreaker): tras failure_threshold
+  peticiones fallidas seguidas deja de llamar al host durante reset_timeout
+  segundos y falla al instante con CircuitOpenError; después deja pasar una
+  petición de prueba y, si va bien, vuelve a cerrarse.
+
+CircuitOpenError hereda de requests.RequestException, de modo que el código que
+ya captura los errores de requests trata igual un circuito abierto.
+
+Uso:
+    from httpkit.resilience import resilient_client
+
+    response = resilient_client.get("https://api.ipify.org")      # cliente compartido
+    response = resilient_client.get(url, send=requests.get)       # otra función
+"""
+
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+from requests.exceptions import RequestException
+
+from httpkit.client import shared_client
+
+# Respuestas que indican un problema temporal del servidor
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class CircuitOpenError(RequestException):
+    """
+    El cortacircuitos del host está abierto: la petición no se ha enviado.
+    """
+
+
+def retry_after_seconds(value, now=None):
+    """
+    Interpreta el valor de la cabecera Retry-After.
+
+    Args:
+        value (str): Segundos ("120") o fecha HTTP ("Wed, 21 Oct 2015 07:28:00 GMT")
+        now (datetime, opcional): Instante actual (por defecto, el del sistema)
+
+    Returns:
+        float: Segundos que hay que esperar (0 si la fecha ya ha pasado)
+        None: Si no hay valor o no es válido
+    """
+    if not isinstance(value, str):
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        return None
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+    now = now or datetime.now(timezone.utc)
+    return max(0.0, (date - now).total_seconds())
+
+
+class RetryBudget:
+    """
+    Presupuesto de reintentos: cada petición añade ratio fichas y cada
+    reintento gasta una. Se empieza (y como máximo se tienen) reserve fichas,
+    que cubren los reintentos de unas pocas peticiones tras un periodo sin
+    tráfico.
+    """
+
+    def __init__(self, ratio=0.2, reserve=10):
+        """
+        Args:
+            ratio (float): Reintentos permitidos por petición (0.2 = un 20 %)
+            reserve (int): Fichas iniciales y máximas
+        """
+        self.ratio = ratio
+        self.reserve = reserve
+        self._tokens = float(reserve)
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        """
+        Registra una petición nueva.
+        """
+        with self._lock:
+            self._tokens = min(self.reserve, self._tokens + self.ratio)
+
+    def withdraw(self):
+        """
+        Intenta gastar una ficha para un reintento.
+
+        Returns:
+            bool: True si el reintento está permitido
+        """
+        with self._lock:
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+
+class CircuitBreaker:
+    """
+    Cortacircuitos de un host.
+
+    Cerrado deja pasar todas las peticiones. Abierto (tras failure_threshold
+    fallos seguidos) no deja pasar ninguna hasta que pasan reset_timeout
+    segundos. Entonces pasa a medio abierto y deja pasar una sola petición de
+    prueba: si va bien se cierra y si falla vuelve a abrirse.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0, clock=time.monotonic):
+        """
+        Args:
+            failure_threshold (int): Fallos seguidos que abren el circuito
+            reset_timeout (float): Segundos que permanece abierto
+            clock: Función que devuelve el instante actual en segundos
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = self.CLOSED
+        self.failures = 0
+        self.trips = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """
+        Indica si se puede enviar una petición ahora.
+
+        Returns:
+            bool: False si el circuito está abierto (o ya hay una prueba en curso)
+        """
+        with self._lock:
+            if self.state == self.OPEN:
+                if self.clock() - self._opened_at < self.reset_timeout:
+                    return False
+                self.state = self.HALF_OPEN
+            if self.state == self.HALF_OPEN:
+                if self._probing:
+                    return False
+                self._probing = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._probing = False
+
+    def release(self):
+        """
+        Libera la petición de prueba sin contar ni éxito ni fallo (la petición
+        falló por un error del propio programa, no del host).
+        """
+        with self._lock:
+            self._probing = False
+
+    def record_failure(self):
+        """
+        Registra un fallo.
+
+        Returns:
+            bool: True si este fallo ha abierto el circuito
+        """
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.state == self.OPEN:
+                # Petición enviada antes de que se abriera el circuito
+                return False
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self._opened_at = self.clock()
+                self.trips += 1
+                return True
+            return False
+
+
+class ResilientClient:
+    """
+    Envía peticiones GET con reintentos, presupuesto de reintentos y un
+    cortacircuitos por host (ver el docstring del módulo).
+
+    Cada llamada a get() cuenta como un único éxito o fallo para el
+    cortacircuitos, una vez agotados sus reintentos. Solo son fallos los
+    errores de red (RequestException, OSError) y las respuestas de
+    retry_statuses; cualquier otra excepción es un error del programa, se
+    propaga sin reintentar y no cuenta para el cortacircuitos.
+    """
+
+    def __init__(self, attempts=3, backoff=0.1, max_backoff=2.0, max_retry_after=10.0,
+                 retry_statuses=RETRY_STATUSES, budget=None, failure_threshold=5,
+                 reset_timeout=30.0, clock=time.monotonic, sleep=time.sleep,
+                 jitter=random.random):
+        """
+        Args:
+            attempts (int): Intentos como máximo por petición (1 = sin reintentos)
+            backoff (float): Espera máxima antes del primer reintento; se dobla en cada uno
+            max_backoff (float): Tope de la espera exponencial
+            max_retry_after (float): Espera máxima que se acepta de Retry-After
+            retry_statuses (tuple): Códigos de estado que se reintentan
+            budget (RetryBudget, opcional): Presupuesto de reintentos
+            failure_threshold (int): Fallos seguidos que abren el circuito de un host
+            reset_timeout (float): Segundos que el circuito permanece abierto
+            clock, sleep: Reloj y función de espera (para los tests)
+            jitter: Función que devuelve un número aleatorio en [0, 1)
+        """
+        self.attempts = attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.max_retry_after = max_retry_after
+        self.retry_statuses = retry_statuses
+        self.budget = budget or RetryBudget()
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.sleep = sleep
+        self.jitter = jitter
+        self.counters = {"requests": 0, "retries": 0, "retries_denied": 0, "trips": 0,
+                         "rejected": 0}
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    def breaker(self, host):
+        """
+        Devuelve el cortacircuitos de un host (creándolo si hace falta).
+        """
+        with self._lock:
+            breaker = self._breakers.get(host)
+            if breaker is None:
+                breaker = CircuitBreaker(self.failure_threshold, self.reset_timeout, self.clock)
+                self._breakers[host] = breaker
+            return breaker
+
+    def get(self, url, send=None, **kwargs):
+        """
+        Realiza una petición GET con reintentos.
+
+        Args:
+            url (str): URL de la petición
+            send: Función que hace la petición, llamada como send(url, **kwargs)
+                (por defecto shared_client.get)
+            **kwargs: Argumentos para send
+
+        Returns:
+            requests.Response: La respuesta final (que puede ser un error 4xx/5xx)
+
+        Raises:
+            CircuitOpenError: Si el circuito del host está abierto
+            RequestException, OSError: El último error de red, si todos los
+                intentos fallan
+        """
+        send = send or shared_client.get
+        host = urlsplit(url).hostname
+        breaker = self.breaker(host)
+        if not breaker.allow():
+            self._count("rejected")
+            raise CircuitOpenError(f"Circuito abierto para {host}: no se envía la petición")
+        self._count("requests")
+        self.budget.deposit()
+
+        attempt = 0
+        while True:
+            attempt += 1
+            error = response = None
+            try:
+                response = send(url, **kwargs)
+            except (RequestException, OSError) as exc:
+                error = exc
+            except BaseException:
+                breaker.release()
+                raise
+
+            if error is None and response.status_code not in self.retry_statuses:
+                breaker.record_success()
+                return response
+
+            wait = self._retry_delay(attempt, response)
+            if attempt >= self.attempts or wait is None:
+                return self._give_up(breaker, error, response)
+            if not self.budget.withdraw():
+                self._count("retries_denied")
+                return self._give_up(breaker, error, response)
+
+            self._count("retries")
+            if response is not None:
+                response.close()
+            self.sleep(wait)
+
+    def reset(self):
+        """
+        Vuelve al estado inicial: sin cortacircuitos, con el presupuesto de
+        reintentos lleno y los contadores a cero.
+        """
+        with self._lock:
+            self._breakers.clear()
+            self.budget = RetryBudget(self.budget.ratio, self.budget.reserve)
+            self.counters = dict.fromkeys(self.counters, 0)
+
+    def stats(self):
+        """
+        Devuelve una copia de los contadores: requests, retries, retries_denied
+        (reintentos denegados por el presupuesto), trips (aperturas de circuito)
+        y rejected (peticiones no enviadas por tener el circuito abierto).
+        """
+        with self._lock:
+            return dict(self.counters)
+
+    def _retry_delay(self, attempt, response):
+        """
+        Segundos de espera antes del siguiente intento: espera exponencial con
+        jitter completo, o lo que pida Retry-After si es más. None si
+        Retry-After pide esperar más de max_retry_after.
+        """
+        delay = self.jitter() * min(self.max_backoff, self.backoff * 2 ** (attempt - 1))
+        headers = getattr(response, "headers", None) or {}
+        retry_after = retry_after_seconds(headers.get("Retry-After"))
+        if retry_after is not None:
+            if retry_after > self.max_retry_after:
+                return None
+            delay = max(delay, retry_after)
+        return delay
+
+    def _give_up(self, breaker, error, response):
+        self._record_failure(breaker)
+        if error is not None:
+            raise error
+        return response
+
+    def _record_failure(self, breaker):
+        if breaker.record_failure():
+            self._count("trips")
+
+    def _count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+
+# Cliente compartido por las funciones de los ejercicios
+resilient_client = ResilientClient()
@@ -0,0 +1,238 @@
+"""
+Tests para httpkit/resilience.py
+Comprueban los reintentos con espera exponencial y Retry-After, el
+presupuesto de reintentos y el cortacircuitos, con un reloj y una espera
+simulados y funciones de envío falsas.
+"""
+
+from datetime import datetime, timezone
+
+import pytest
+import requests
+
+from httpkit.resilience import (CircuitBreaker, CircuitOpenError, ResilientClient, RetryBudget,
+                                retry_after_seconds)
+
+URL = "https://api.example.com/data"
+
+
+class FakeResponse:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def scripted(*outcomes):
+    """
+    Función de envío que devuelve (o lanza) cada resultado por orden.
+    """
+    calls = []
+
+    def send(url, **kwargs):
+        calls.append((url, kwargs))
+        outcome = outcomes[len(calls) - 1]
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    send.calls = calls
+    return send
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def make_client(clock, **options):
+    options.setdefault("jitter", lambda: 1.0)
+    return ResilientClient(clock=clock, sleep=clock.sleep, **options)
+
+
+def test_retry_after_seconds():
+    now = datetime(2015, 10, 21, 7, 28, 0, tzinfo=timezone.utc)
+    assert retry_after_seconds("120") == 120
+    assert retry_after_seconds("Wed, 21 Oct 2015 07:28:30 GMT", now=now) == 30
+    assert retry_after_seconds("Wed, 21 Oct 2015 07:27:00 GMT", now=now) == 0
+    assert retry_after_seconds("pronto") is None
+    assert retry_after_seconds(None) is None
+
+
+def test_success_is_sent_once(clock):
+    client = make_client(clock)
+    send = scripted(FakeResponse(200))
+    assert client.get(URL, send=send, timeout=3).status_code == 200
+    assert send.calls == [(URL, {"timeout": 3})]
+    assert client.stats()["retries"] == 0
+
+
+def test_client_errors_are_not_retried(clock):
+    client = make_client(clock)
+    send = scripted(FakeResponse(404))
+    assert client.get(URL, send=send).status_code == 404
+    assert len(send.calls) == 1
+
+
+def test_retries_with_exponential_backoff(clock):
+    """
+    Errores de red y 503 se reintentan, esperando backoff, 2*backoff... (con
+    jitter=1 la espera es el máximo del intervalo).
+    """
+    client = make_client(clock, attempts=4, backoff=0.1)
+    first_503 = FakeResponse(503)
+    send = scripted(requests.ConnectionError("caído"), first_503, FakeResponse(502),
+                    FakeResponse(200))
+    assert client.get(URL, send=send).status_code == 200
+    assert clock.now == pytest.approx(0.1 + 0.2 + 0.4)
+    assert first_503.closed
+    assert client.stats()["retries"] == 3
+
+
+def test_backoff_is_jittered_and_capped(clock):
+    client = make_client(clock, attempts=3, backoff=1.0, max_backoff=1.5, jitter=lambda: 0.5)
+    send = scripted(FakeResponse(500), FakeResponse(500), FakeResponse(200))
+    client.get(URL, send=send)
+    assert clock.now == pytest.approx(0.5 * 1.0 + 0.5 * 1.5)
+
+
+def test_last_error_is_raised_when_attempts_run_out(clock):
+    client = make_client(clock, attempts=2)
+    send = scripted(requests.Timeout("lento"), requests.Timeout("lento"))
+    with pytest.raises(requests.Timeout):
+        client.get(URL, send=send)
+    assert len(send.calls) == 2
+
+
+def test_retry_after_is_respected(clock):
+    client = make_client(clock, backoff=0.1)
+    send = scripted(FakeResponse(429, {"Retry-After": "3"}), FakeResponse(200))
+    assert client.get(URL, send=send).status_code == 200
+    assert clock.now == pytest.approx(3)
+
+
+def test_long_retry_after_returns_the_response(clock):
+    client = make_client(clock, max_retry_after=10)
+    send = scripted(FakeResponse(503, {"Retry-After": "3600"}))
+    assert client.get(URL, send=send).status_code == 503
+    assert len(send.calls) == 1
+    assert clock.now == 0
+
+
+def test_retry_budget_limits_retries(clock):
+    """
+    Sin fichas en el presupuesto no se reintenta y se devuelve el último resultado.
+    """
+    client = make_client(clock, attempts=2, budget=RetryBudget(ratio=0.5, reserve=1),
+                         failure_threshold=100)
+    send = scripted(*[FakeResponse(503)] * 10)
+    client.get(URL, send=send)
+    assert len(send.calls) == 2  # 1 ficha inicial -> un reintento
+    client.get(URL, send=send)
+    assert len(send.calls) == 3  # 0.5 fichas: ningún reintento
+    client.get(URL, send=send)
+    assert len(send.calls) == 5  # 1 ficha de nuevo
+    assert client.stats()["retries_denied"] == 1
+
+
+def test_circuit_opens_and_fails_fast(clock):
+    client = make_client(clock, attempts=1, failure_threshold=2, reset_timeout=30)
+    send = scripted(requests.ConnectionError("caído"), FakeResponse(503))
+    with pytest.raises(requests.ConnectionError):
+        client.get(URL, send=send)
+    assert client.get(URL, send=send).status_code == 503
+
+    with pytest.raises(CircuitOpenError):
+        client.get(URL, send=send)
+    assert len(send.calls) == 2
+    # Otro host no se ve afectado
+    assert client.breaker("otro.example.com").allow()
+    assert client.stats()["trips"] == 1
+    assert client.stats()["rejected"] == 1
+
+
+def test_circuit_half_open_probe(clock):
+    client = make_client(clock, attempts=1, failure_threshold=1, reset_timeout=30)
+    send = scripted(FakeResponse(500), FakeResponse(500), FakeResponse(200), FakeResponse(200))
+    client.get(URL, send=send)
+    clock.now += 30
+    # La prueba falla: el circuito se vuelve a abrir
+    assert client.get(URL, send=send).status_code == 500
+    with pytest.raises(CircuitOpenError):
+        client.get(URL, send=send)
+    clock.now += 30
+    # La prueba va bien: el circuito se cierra
+    assert client.get(URL, send=send).status_code == 200
+    assert client.get(URL, send=send).status_code == 200
+    assert client.breaker("api.example.com").state == CircuitBreaker.CLOSED
+    assert client.stats()["trips"] == 2
+
+
+def test_half_open_allows_a_single_probe(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=5, clock=clock)
+    breaker.record_failure()
+    assert not breaker.allow()
+    clock.now = 5
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.allow() and breaker.allow()
+
+
+def test_unexpected_errors_are_not_retried(clock):
+    """
+    Un error del programa se propaga sin reintentar y no abre el circuito.
+    """
+    client = make_client(clock, failure_threshold=1)
+    send = scripted(ValueError("fallo del código"), FakeResponse(200))
+    with pytest.raises(ValueError):
+        client.get(URL, send=send)
+    assert len(send.calls) == 1
+    assert client.breaker("api.example.com").state == CircuitBreaker.CLOSED
+    assert client.get(URL, send=send).status_code == 200
+
+
+def test_unexpected_error_releases_the_probe(clock):
+    client = make_client(clock, attempts=1, failure_threshold=1, reset_timeout=30)
+    send = scripted(FakeResponse(500), TypeError("fallo del código"), FakeResponse(200))
+    client.get(URL, send=send)
+    clock.now += 30
+    with pytest.raises(TypeError):
+        client.get(URL, send=send)
+    # La prueba no llegó a completarse: se puede enviar otra
+    assert client.get(URL, send=send).status_code == 200
+
+
+def test_os_errors_are_network_errors(clock):
+    client = make_client(clock, attempts=2, failure_threshold=1)
+    send = scripted(OSError("conexión reiniciada"), OSError("conexión reiniciada"))
+    with pytest.raises(OSError):
+        client.get(URL, send=send)
+    assert len(send.calls) == 2
+    assert client.breaker("api.example.com").state == CircuitBreaker.OPEN
+
+
+def test_reset(clock):
+    client = make_client(clock, attempts=1, failure_threshold=1)
+    client.get(URL, send=scripted(FakeResponse(503)))
+    client.reset()
+    assert client.breaker("api.example.com").state == CircuitBreaker.CLOSED
+    assert client.stats() == dict.fromkeys(client.stats(), 0)
+
+
+def test_circuit_open_error_is_a_request_exception():
+    assert issubclass(CircuitOpenError, requests.RequestException)
@@ -0,0 +1,197 @@
+"""
+Enrutador por tabla para los manejadores HTTP.
+
+Sustituye las cadenas de if/else sobre self.path:
+
+- Las rutas exactas se resuelven con una búsqueda en diccionario (O(1)).
+- Las rutas con parámetros ("/users/{user_id}") se agrupan por número de
+  segmentos y se comparan segmento a segmento.
+- La cadena de consulta se separa y se analiza una sola vez por petición,
+  de modo que "/time?tz=utc" se resuelve igual que "/time".
+- Si no hay ruta se responde 404 en JSON, y si la ruta existe pero no admite
+  el método, 405 en JSON con la cabecera Allow. Los cuerpos de error salen de
+  plantillas precodificadas (httpkit.cache.JSONTemplate).
+"""
+
+from urllib.parse import parse_qs, urlsplit
+
+from httpkit.cache import JSONTemplate
+
+NOT_FOUND_TEMPLATE = JSONTemplate({"code": 404, "message": "Recurso {} no encontrado"})
+METHOD_NOT_ALLOWED_TEMPLATE = JSONTemplate(
+    {"code": 405, "message": "Método {} no permitido en {}"}
+)
+
+
+class RouteMatch:
+    """
+    Resultado de resolver una petición contra el enrutador.
+
+    Atributos:
+        path: Ruta solicitada sin la cadena de consulta
+        route: Ruta registrada que atiende la petición ("/users/{user_id}"),
+            o None si ninguna coincide
+        params: Diccionario con los parámetros de la ruta ({"user_id": "42"})
+        query: Diccionario nombre -> lista de valores de la cadena de consulta
+    """
+
+    __slots__ = ("path", "route", "params", "query")
+
+    def __init__(self, path, params, query, route=None):
+        self.path = path
+        self.route = route
+        self.params = params
+        self.query = query
+
+    def arg(self, name, default=None):
+        """
+        Devuelve el primer valor de un parámetro de la cadena de consulta.
+
+        Args:
+            name (str): Nombre del parámetro
+            default: Valor si el parámetro no aparece
+
+        Returns:
+            str: Primer valor del parámetro, o default
+        """
+        values = self.query.get(name)
+        return values[0] if values else default
+
+
+class Router:
+    """
+    Tabla de rutas: asocia (ruta, método) con la función que atiende la petición.
+
+    Las funciones reciben el manejador y un RouteMatch: func(handler, match).
+
+    Atributos:
+        paths: Rutas registradas, en orden de registro
+    """
+
+    def __init__(self):
+        self.paths = []
+        self._exact = {}
+        self._patterns = {}
+
+    def route(self, path, methods=("GET",)):
+        """
+        Decorador que registra una función para una ruta y unos métodos.
+
+        Args:
+            path (str): Ruta exacta ("/time") o con parámetros ("/users/{user_id}")
+            methods (tuple): Métodos HTTP admitidos
+
+        Returns:
+            function: El decorador, que devuelve la función sin modificar
+        """
+        def decorator(func):
+            if path not in self.paths:
+                self.paths.append(path)
+            segments = tuple(path.strip("/").split("/"))
+            if any(segment.startswith("{") for segment in segments):
+                pattern = tuple(
+                    segment[1:-1] if segment.startswith("{") else None for segment in segments
+                )
+                bucket = self._patterns.setdefault(len(segments), [])
+                for existing_segments, existing_pattern, table, existing_path in bucket:
+                    if existing_segments == segments:
+                        break
+                else:
+                    table = {}
+                    bucket.append((segments, pattern, table, path))
+            else:
+                table = self._exact.setdefault(path, {})
+            for method in methods:
+                table[method.upper()] = func
+            return func
+        return decorator
+
+    def get(self, path):
+        """
+        Atajo para registrar una ruta GET.
+        """
+        return self.route(path, ("GET",))
+
+    def resolve(self, method, raw_path):
+        """
+        Busca la función que atiende una petición.
+
+        Args:
+            method (str): Método HTTP de la petición
+            raw_path (str): Ruta tal y como llega en la línea de petición
+
+        Returns:
+            tuple: (función o None, RouteMatch, métodos admitidos en la ruta)
+        """
+        parts = urlsplit(raw_path)
+        path = parts.path
+        query = parse_qs(parts.query, keep_blank_values=True) if parts.query else {}
+
+        table = self._exact.get(path)
+        route = path
+        params = {}
+        if table is None:
+            segments = path.strip("/").split("/")
+            for literal, pattern, candidate, template in self._patterns.get(len(segments), ()):
+                params = self._match(literal, pattern, segments)
+                if params is not None:
+                    table = candidate
+                    route = template
+                    break
+            else:
+                params = {}
+                route = None
+
+        match = RouteMatch(path, params, query, route)
+        if table is None:
+            return None, match, ()
+        return table.get(method), match, tuple(table)
+
+    @staticmethod
+    def _match(literal, pattern, segments):
+        """
+        Compara los segmentos de una petición con los de una ruta con parámetros.
+
+        Returns:
+            dict: Parámetros capturados, o None si la ruta no coincide
+        """
+        params = {}
+        for expected, name, actual in zip(literal, pattern, segments):
+            if name is None:
+                if expected != actual:
+                    return None
+            elif actual:
+                params[name] = actual
+            else:
+                return None
+        return params
+
+    def dispatch(self, handler):
+        """
+        Atiende la petición del manejador: llama a la función de la ruta o
+        responde 404/405 en JSON.
+
+        Args:
+            handler: Manejador con command, path y send_body()
+        """
+        func, match, allowed = self.resolve(handler.command, handler.path)
+        handler.route_match = match
+        if func is not None:
+            func(handler, match)
+        elif allowed:
+            self.method_not_allowed(handler, allowed)
+        else:
+            self.not_found(handler)
+
+    def not_found(self, handler):
+        """
+        Responde 404 con un mensaje de error en JSON que incluye la ruta.
+        """
+        handler.send_body(404, NOT_FOUND_TEMPLATE.render(handler.path))
+
+    def method_not_allowed(self, handler, allowed):
+        """
+        Responde 405 en JSON indicando en Allow los métodos admitidos.
+        """
+        body = METHOD_NOT_ALLOWED_TEMPLATE.render(handler.command, handler.route_match.path)
+        handler.send_body(405, body, headers={"Allow": ", ".join(allowed)})
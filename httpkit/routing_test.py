@@ -0,0 +1,115 @@
+"""
+Tests para httpkit/routing.py
+Comprueban la resolución de rutas exactas y con parámetros, la cadena de
+consulta y las respuestas automáticas 404 y 405.
+"""
+
+import json
+
+from httpkit.routing import Router
+
+
+class FakeHandler:
+    """
+    Sustituto del manejador que guarda la respuesta enviada con send_json()
+    o send_body().
+    """
+
+    def __init__(self, command, path):
+        self.command = command
+        self.path = path
+        self.sent = None
+
+    def send_json(self, status, payload, headers=None):
+        self.sent = (status, payload, headers or {})
+
+    def send_body(self, status, body, content_type="application/json", headers=None):
+        self.send_json(status, json.loads(body), headers)
+
+
+def make_router():
+    router = Router()
+
+    @router.get("/time")
+    def time_route(handler, match):
+        handler.send_json(200, {"tz": match.arg("tz", "local")})
+
+    @router.route("/users/{user_id}", methods=("GET", "DELETE"))
+    def user_route(handler, match):
+        handler.send_json(200, {"user": match.params["user_id"], "method": handler.command})
+
+    @router.get("/users/me")
+    def me_route(handler, match):
+        handler.send_json(200, {"user": "me"})
+
+    return router
+
+
+def test_exact_route_with_query():
+    """
+    La cadena de consulta no impide encontrar la ruta y se analiza una vez.
+    """
+    router = make_router()
+    handler = FakeHandler("GET", "/time?tz=utc&tz=cet")
+    router.dispatch(handler)
+    assert handler.sent[:2] == (200, {"tz": "utc"})
+    assert handler.route_match.query == {"tz": ["utc", "cet"]}
+
+
+def test_path_parameters():
+    """
+    Las rutas con parámetros capturan el segmento correspondiente.
+    """
+    router = make_router()
+    handler = FakeHandler("DELETE", "/users/42")
+    router.dispatch(handler)
+    assert handler.sent[:2] == (200, {"user": "42", "method": "DELETE"})
+
+
+def test_exact_route_has_priority():
+    """
+    Una ruta exacta gana a una ruta con parámetros que también coincide.
+    """
+    router = make_router()
+    handler = FakeHandler("GET", "/users/me")
+    router.dispatch(handler)
+    assert handler.sent[1] == {"user": "me"}
+
+
+def test_not_found():
+    """
+    Sin ruta se responde 404 en JSON con la ruta solicitada en el mensaje.
+    """
+    router = make_router()
+    for path in ("/nope", "/users/1/extra", "/users/"):
+        handler = FakeHandler("GET", path)
+        router.dispatch(handler)
+        status, payload, _ = handler.sent
+        assert status == 404
+        assert payload["code"] == 404
+        assert path in payload["message"]
+
+
+def test_method_not_allowed():
+    """
+    Con la ruta definida pero sin el método se responde 405 con Allow.
+    """
+    router = make_router()
+    handler = FakeHandler("POST", "/users/7")
+    router.dispatch(handler)
+    status, payload, headers = handler.sent
+    assert status == 405
+    assert payload["code"] == 405
+    assert headers["Allow"] == "GET, DELETE"
+
+
+def test_route_template():
+    """
+    El RouteMatch indica la ruta registrada (no la solicitada), que sirve de
+    etiqueta acotada para las métricas.
+    """
+    router = make_router()
+    assert router.paths == ["/time", "/users/{user_id}", "/users/me"]
+    assert router.resolve("GET", "/users/42")[1].route == "/users/{user_id}"
+    assert router.resolve("GET", "/time?tz=utc")[1].route == "/time"
+    assert router.resolve("GET", "/missing")[1].route is None
@@ -0,0 +1,141 @@
+"""
+Arranque y parada controlados de los servidores de los ejercicios.
+
+ServerRunner ejecuta serve_forever() de cualquier motor (ver build_server) y
+avisa cuando el servidor ya acepta conexiones, en lugar de esperar un tiempo
+fijo y confiar en que haya arrancado. Junto con el puerto 0 (el sistema elige
+uno libre) permite arrancar servidores de prueba en milisegundos y ejecutar
+varios a la vez.
+
+- Los motores "single", "threaded" y "asyncio" escuchan desde que se crean: las
+  conexiones que lleguen antes de entrar en serve_forever() esperan en la cola
+  del sistema, de modo que el servidor se considera listo al arrancar.
+- El modo "prefork" expone su propio evento ready, que se activa cuando todos
+  los trabajadores han abierto o adoptado el socket de escucha.
+
+stop() detiene el servidor de forma ordenada (ver stop_gracefully): las
+peticiones en curso terminan de responderse antes de cerrar.
+"""
+
+import threading
+
+from httpkit.servers import stop_gracefully
+
+
+class ServerRunner:
+    """
+    Ejecuta un servidor y gestiona su arranque y su parada.
+
+    Atributos:
+        server: Servidor a ejecutar
+        ready: Evento que se activa cuando el servidor acepta conexiones
+    """
+
+    def __init__(self, server, on_ready=None):
+        """
+        Args:
+            server: Servidor creado con build_server() (o create_server() de un ejercicio)
+            on_ready (callable o threading.Event, opcional): Función que se llama
+                (desde otro hilo) con el propio ServerRunner cuando el servidor
+                acepta conexiones, o evento que se activa en ese momento
+        """
+        self.server = server
+        self.ready = threading.Event()
+        self._on_ready = on_ready
+        self._thread = None
+        self._running = threading.Event()
+        self._stopped = threading.Event()
+
+    @property
+    def address(self):
+        """
+        Tupla (host, puerto) donde escucha el servidor (el puerto real si se pidió el 0).
+        """
+        return self.server.server_address
+
+    @property
+    def url(self):
+        """
+        URL base del servidor, por ejemplo "http://127.0.0.1:54321".
+        """
+        host, port = self.server.server_address[:2]
+        if ":" in host:
+            host = f"[{host}]"
+        return f"http://{host}:{port}"
+
+    def run(self):
+        """
+        Ejecuta el servidor en el hilo actual hasta que se llame a stop() (o
+        se pulse Ctrl+C, que también detiene el servidor de forma ordenada).
+        """
+        if threading.current_thread() is not self._thread:
+            if self._running.is_set():
+                raise RuntimeError("El servidor ya está en marcha")
+            self._running.set()
+        threading.Thread(target=self._signal_ready, name="server-ready", daemon=True).start()
+        try:
+            self.server.serve_forever()
+        except KeyboardInterrupt:
+            # serve_forever() ya ha terminado: falta despedir las conexiones abiertas
+            stop_gracefully(self.server)
+            self.server.server_close()
+        finally:
+            self._stopped.set()
+
+    def start(self, timeout=10):
+        """
+        Ejecuta el servidor en un hilo en segundo plano y espera a que esté listo.
+
+        Args:
+            timeout (float): Segundos máximos de espera
+
+        Returns:
+            ServerRunner: El propio objeto, ya listo
+
+        Raises:
+            RuntimeError: Si el servidor ya se había arrancado
+            TimeoutError: Si el servidor no está listo en el plazo indicado
+        """
+        if self._running.is_set():
+            raise RuntimeError("El servidor ya está en marcha")
+        self._running.set()
+        self._thread = threading.Thread(target=self.run, name="server", daemon=True)
+        self._thread.start()
+        if not self.ready.wait(timeout):
+            self.stop()
+            raise TimeoutError(f"El servidor no estuvo listo en {timeout} s")
+        return self
+
+    def stop(self, timeout=10):
+        """
+        Detiene el servidor sin cortar las peticiones en curso y lo cierra.
+
+        Args:
+            timeout (float): Segundos máximos de espera al hilo del servidor
+        """
+        if self._running.is_set() and not self._stopped.is_set():
+            stop_gracefully(self.server)
+        self.server.server_close()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _signal_ready(self):
+        """
+        Espera a que el servidor acepte conexiones y avisa a quien lo espera.
+        """
+        accepting = getattr(self.server, "ready", None)
+        if accepting is not None:
+            while not accepting.wait(0.05):
+                if self._stopped.is_set():
+                    return
+        if isinstance(self._on_ready, threading.Event):
+            self._on_ready.set()
+        self.ready.set()
+        if callable(self._on_ready):
+            self._on_ready(self)
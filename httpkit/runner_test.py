@@ -0,0 +1,119 @@
+"""
+Tests para httpkit/runner.py
+Comprueban el aviso de arranque con puerto 0 y la parada ordenada: las
+peticiones en curso terminan y las conexiones inactivas no retrasan la parada.
+"""
+
+import http.client
+import threading
+import time
+
+import pytest
+
+from httpkit.handler import AppRequestHandler
+from httpkit.routing import Router
+from httpkit.runner import ServerRunner
+from httpkit.servers import build_server
+
+router = Router()
+
+
+class SlowHandler(AppRequestHandler):
+    """
+    Manejador con una ruta rápida (/ok) y otra lenta (/slow).
+    """
+
+    router = router
+
+    @router.get("/ok")
+    def handle_ok(self, match):
+        self.send_json(200, {"ok": True})
+
+    @router.get("/slow")
+    def handle_slow(self, match):
+        time.sleep(0.3)
+        self.send_json(200, {"slow": True})
+
+
+def make_server(mode):
+    return build_server(("127.0.0.1", 0), SlowHandler, mode=mode, workers=2, processes=2,
+                        access_log=False)
+
+
+@pytest.mark.parametrize("mode", ["single", "threaded", "asyncio", "prefork"])
+def test_ready_with_ephemeral_port(mode):
+    """
+    Con el puerto 0 el servidor informa del puerto real y acepta peticiones en
+    cuanto se activa ready, sin esperas fijas.
+    """
+    notified = threading.Event()
+    with ServerRunner(make_server(mode), on_ready=notified) as runner:
+        assert notified.is_set()
+        assert runner.address[1] != 0
+        conn = http.client.HTTPConnection("127.0.0.1", runner.address[1], timeout=2)
+        conn.request("GET", "/ok")
+        assert conn.getresponse().status == 200
+        conn.close()
+    assert runner.url == f"http://127.0.0.1:{runner.address[1]}"
+
+
+@pytest.mark.parametrize("mode", ["single", "threaded", "asyncio"])
+def test_stop_drains_in_flight_request(mode):
+    """
+    stop() espera a que termine la petición en curso, que anuncia el cierre de
+    la conexión.
+    """
+    runner = ServerRunner(make_server(mode)).start()
+    result = {}
+
+    def slow_request():
+        conn = http.client.HTTPConnection("127.0.0.1", runner.address[1], timeout=5)
+        conn.request("GET", "/slow")
+        response = conn.getresponse()
+        result["status"] = response.status
+        result["connection"] = response.getheader("Connection")
+        result["body"] = response.read()
+        conn.close()
+
+    client = threading.Thread(target=slow_request)
+    client.start()
+    time.sleep(0.1)
+    runner.stop()
+    client.join(5)
+
+    assert result["status"] == 200
+    assert result["body"] == b'{"slow": true}'
+    assert result["connection"] == "close"
+
+
+@pytest.mark.parametrize("mode", ["single", "threaded", "asyncio"])
+def test_idle_keep_alive_does_not_delay_stop(mode):
+    """
+    Una conexión persistente inactiva se cierra al detener el servidor en lugar
+    de esperar al tiempo máximo de inactividad del manejador.
+    """
+    runner = ServerRunner(make_server(mode)).start()
+    conn = http.client.HTTPConnection("127.0.0.1", runner.address[1], timeout=5)
+    conn.request("GET", "/ok")
+    conn.getresponse().read()
+
+    start = time.monotonic()
+    runner.stop()
+    assert time.monotonic() - start < SlowHandler.timeout / 2
+    conn.close()
+
+
+def test_run_in_foreground_with_callback():
+    """
+    run() bloquea el hilo actual; el callback recibe el ServerRunner y puede
+    detenerlo.
+    """
+    seen = []
+
+    def on_ready(runner):
+        seen.append(runner.address[1])
+        runner.stop()
+
+    runner = ServerRunner(make_server("threaded"), on_ready=on_ready)
+    runner.run()
+    assert seen == [runner.address[1]]
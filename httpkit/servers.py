@@ -0,0 +1,316 @@
+"""
+Motores de servidor HTTP basados en http.server.
+
+Por defecto http.server.HTTPServer atiende una única conexión cada vez, de modo
+que un cliente lento bloquea a todos los demás. Este módulo ofrece un servidor
+con un grupo acotado de hilos trabajadores y una cola de conexiones pendientes
+con límite, y una función build_server() que elige el motor según el modo.
+
+Ambos motores anotan sus conexiones abiertas y si están atendiendo una
+petición, de modo que stop_gracefully() puede parar el servidor sin cortar las
+peticiones en curso: solo se cierran las conexiones persistentes inactivas.
+"""
+
+import json
+import os
+import queue
+import socket
+import threading
+from http.server import HTTPServer
+
+# Respuesta mínima que se envía cuando la cola de conexiones está llena
+_OVERLOAD_BODY = json.dumps({"code": 503, "message": "Servidor sobrecargado"}).encode()
+OVERLOAD_RESPONSE = (
+    b"HTTP/1.1 503 Service Unavailable\r\n"
+    b"Content-Type: application/json\r\n"
+    b"Content-Length: " + str(len(_OVERLOAD_BODY)).encode() + b"\r\n"
+    b"Retry-After: 1\r\n"
+    b"Connection: close\r\n"
+    b"\r\n" + _OVERLOAD_BODY
+)
+
+
+def default_workers():
+    """
+    Número de hilos trabajadores por defecto (mismo criterio que ThreadPoolExecutor).
+
+    Returns:
+        int: Número de hilos
+    """
+    return min(32, (os.cpu_count() or 1) + 4)
+
+
+class ConnectionTrackingMixin:
+    """
+    Anota las conexiones abiertas de un servidor basado en socketserver.
+
+    Los manejadores marcan la conexión como ocupada mientras atienden una
+    petición (set_busy). Con draining=True el manejador anuncia el cierre de la
+    conexión en la siguiente respuesta.
+    """
+
+    draining = False
+    # Misma cola de aceptación que los motores asyncio y prefork (socketserver
+    # usa 5): ante una ráfaga de conexiones el núcleo descartaría los SYN y
+    # cada cliente esperaría un segundo a reintentar
+    request_queue_size = 1024
+
+    def _init_tracking(self):
+        self._active = {}
+        self._detached = set()
+        self._active_lock = threading.Lock()
+
+    def track_connection(self, request):
+        """
+        Anota una conexión recién aceptada (inactiva hasta que llegue una petición).
+        """
+        with self._active_lock:
+            self._active[request] = False
+
+    def untrack_connection(self, request):
+        """
+        Olvida una conexión ya cerrada.
+        """
+        with self._active_lock:
+            self._active.pop(request, None)
+
+    def set_busy(self, request, busy):
+        """
+        Marca una conexión como ocupada (atendiendo una petición) o inactiva.
+        Si el servidor se está deteniendo, la conexión que queda inactiva se
+        cierra en lectura en ese momento.
+        """
+        with self._active_lock:
+            if request not in self._active:
+                return
+            self._active[request] = busy
+        if self.draining and not busy:
+            try:
+                request.shutdown(socket.SHUT_RD)
+            except OSError:
+                pass
+
+    def detach_connection(self, request):
+        """
+        Anota que el manejador ha cedido la conexión a otro dueño (por ejemplo
+        un flujo de eventos) con un duplicado del socket: al terminar, el
+        servidor solo cierra su descriptor, sin cortar la conexión TCP.
+        """
+        with self._active_lock:
+            self._active.pop(request, None)
+            self._detached.add(request)
+
+    def shutdown_request(self, request):
+        with self._active_lock:
+            detached = request in self._detached
+            self._detached.discard(request)
+        if detached:
+            self.close_request(request)
+        else:
+            super().shutdown_request(request)
+
+    def close_idle_connections(self, include_busy=False):
+        """
+        Cierra en lectura las conexiones que esperan la siguiente petición, para
+        que su manejador termine en lugar de esperar hasta el tiempo máximo de
+        inactividad. Las conexiones ocupadas terminan de enviar su respuesta.
+
+        Args:
+            include_busy (bool): Cerrar en lectura también las ocupadas (la
+                respuesta en curso se envía igualmente)
+        """
+        with self._active_lock:
+            connections = [request for request, busy in self._active.items()
+                         if include_busy or not busy]
+        for request in connections:
+            try:
+                request.shutdown(socket.SHUT_RD)
+            except OSError:
+                pass
+
+
+class SingleHTTPServer(ConnectionTrackingMixin, HTTPServer):
+    """
+    HTTPServer que atiende una única conexión cada vez (el modo "single").
+    """
+
+    def __init__(self, server_address, RequestHandlerClass, bind_and_activate=True):
+        self._init_tracking()
+        super().__init__(server_address, RequestHandlerClass, bind_and_activate)
+
+    def process_request(self, request, client_address):
+        self.track_connection(request)
+        try:
+            super().process_request(request, client_address)
+        finally:
+            self.untrack_connection(request)
+
+
+class WorkerPoolHTTPServer(ConnectionTrackingMixin, HTTPServer):
+    """
+    Servidor HTTP que reparte las conexiones entre un grupo fijo de hilos.
+
+    Atributos:
+        workers: Número de hilos trabajadores
+        queue_size: Número máximo de conexiones aceptadas a la espera de un hilo
+        rejected: Número de conexiones rechazadas con 503 por tener la cola llena
+        reject_linger: Segundos que se espera a vaciar la petición de un cliente
+            rechazado antes de cerrar, para que reciba el 503 en lugar de un RST
+    """
+
+    reject_linger = 0.05
+
+    def __init__(self, server_address, RequestHandlerClass, workers=None,
+                 queue_size=None, bind_and_activate=True):
+        """
+        Inicializa el servidor y arranca los hilos trabajadores.
+
+        Args:
+            server_address: Tupla (host, puerto) donde escuchar
+            RequestHandlerClass: Clase manejadora de las peticiones
+            workers (int, opcional): Número de hilos (por defecto default_workers())
+            queue_size (int, opcional): Límite de la cola (por defecto 4 por hilo)
+            bind_and_activate (bool): Igual que en HTTPServer
+        """
+        self.workers = workers or default_workers()
+        self.queue_size = queue_size if queue_size is not None else self.workers * 4
+        self.rejected = 0
+        self._pending = queue.Queue(self.queue_size)
+        self._threads = []
+        self._init_tracking()
+        super().__init__(server_address, RequestHandlerClass, bind_and_activate)
+
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"http-worker-{index}")
+            thread.daemon = True
+            thread.start()
+            self._threads.append(thread)
+
+    def process_request(self, request, client_address):
+        """
+        Encola la conexión para que la atienda un hilo libre, o la rechaza
+        con un 503 si la cola ya está llena.
+        """
+        try:
+            self._pending.put_nowait((request, client_address))
+        except queue.Full:
+            self.reject_request(request, client_address)
+
+    def reject_request(self, request, client_address):
+        """
+        Responde 503 y cierra la conexión sin ocupar ningún hilo trabajador.
+        """
+        self.rejected += 1
+        try:
+            request.sendall(OVERLOAD_RESPONSE)
+            request.shutdown(socket.SHUT_WR)
+            # Cierre diferido: si se cierra con datos sin leer el núcleo envía
+            # un RST y el cliente puede perder el 503
+            request.settimeout(self.reject_linger)
+            while request.recv(65536):
+                pass
+        except OSError:
+            pass
+        self.close_request(request)
+
+    def _work(self):
+        """
+        Bucle de cada hilo trabajador: atiende conexiones hasta recibir None.
+        """
+        while True:
+            item = self._pending.get()
+            if item is None:
+                break
+            request, client_address = item
+            self.track_connection(request)
+            try:
+                self.finish_request(request, client_address)
+            except Exception:
+                self.handle_error(request, client_address)
+            finally:
+                self.untrack_connection(request)
+                self.shutdown_request(request)
+
+    def server_close(self):
+        """
+        Cierra el socket de escucha y detiene los hilos trabajadores una vez
+        atendidas las conexiones que ya estaban en cola.
+
+        Las conexiones activas se cierran en lectura: la petición en curso
+        termina de responderse, pero una conexión persistente inactiva deja
+        de esperar la siguiente petición.
+        """
+        super().server_close()
+        self.close_idle_connections(include_busy=True)
+        for _ in self._threads:
+            self._pending.put(None)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+
+MODES = ("single", "threaded", "asyncio", "prefork")
+
+
+def build_server(server_address, handler_class, mode="single", workers=None,
+                 queue_size=None, processes=None, bind_and_activate=True, **extensions):
+    """
+    Crea el servidor HTTP adecuado para el modo de concurrencia indicado.
+
+    Args:
+        server_address: Tupla (host, puerto) donde escuchar
+        handler_class: Clase manejadora de las peticiones
+        mode (str): "single" (una conexión cada vez), "threaded" (grupo de hilos),
+            "asyncio" (un único bucle de eventos) o "prefork" (varios procesos
+            con un grupo de hilos cada uno)
+        workers (int, opcional): Número de hilos por proceso en modo "threaded"/"prefork"
+        queue_size (int, opcional): Límite de la cola en modo "threaded"/"prefork"
+        processes (int, opcional): Número de procesos en modo "prefork"
+        bind_and_activate (bool): Si es False el servidor no abre el puerto
+        **extensions: Atributos que se añaden al servidor y que los manejadores
+            consultan en self.server (por ejemplo access_log)
+
+    Returns:
+        HTTPServer: El servidor ya enlazado al puerto
+
+    Raises:
+        ValueError: Si el modo no es uno de MODES
+    """
+    if mode == "single":
+        server = SingleHTTPServer(server_address, handler_class, bind_and_activate)
+    elif mode == "threaded":
+        server = WorkerPoolHTTPServer(server_address, handler_class, workers=workers,
+                                      queue_size=queue_size,
+                                      bind_and_activate=bind_and_activate)
+    # Importaciones diferidas: solo se cargan si se usa el motor correspondiente
+    elif mode == "asyncio":
+        from httpkit.aio import AsyncHTTPServer
+        server = AsyncHTTPServer(server_address, handler_class, bind_and_activate)
+    elif mode == "prefork":
+        from httpkit.prefork import PreforkServer
+        server = PreforkServer(server_address, handler_class, processes=processes,
+                               workers=workers, queue_size=queue_size,
+                               extensions=extensions)
+    else:
+        raise ValueError(
+            f"Modo de servidor desconocido: {mode!r} (opciones: {', '.join(MODES)})"
+        )
+    for name, value in extensions.items():
+        setattr(server, name, value)
+    return server
+
+
+def stop_gracefully(server):
+    """
+    Detiene serve_forever() sin cortar las peticiones en curso.
+
+    Las respuestas que se estén enviando anuncian "Connection: close", las
+    conexiones persistentes inactivas se cierran y, después, se detiene el
+    bucle de aceptación. Se debe llamar desde otro hilo, igual que shutdown();
+    server_close() sigue siendo responsabilidad de quien creó el servidor.
+    """
+    server.draining = True
+    close_idle = getattr(server, "close_idle_connections", None)
+    if close_idle is not None:
+        close_idle()
+    server.shutdown()
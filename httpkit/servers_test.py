@@ -0,0 +1,112 @@
+"""
+Tests para httpkit/servers.py
+Comprueban el modo con grupo de hilos y el rechazo cuando la cola está llena.
+"""
+
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+import requests
+
+from httpkit.servers import build_server, SingleHTTPServer, WorkerPoolHTTPServer
+
+
+class EchoHandler(BaseHTTPRequestHandler):
+    """
+    Manejador mínimo que responde siempre 200 con el cuerpo "ok".
+    """
+
+    def do_GET(self):
+        body = b"ok"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start(server):
+    """
+    Arranca el servidor en un hilo y devuelve la URL base.
+    """
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    return f"http://127.0.0.1:{server.server_port}", thread
+
+
+def stop(server, thread):
+    server.shutdown()
+    server.server_close()
+    thread.join(1)
+
+
+def test_single_mode_is_plain_http_server():
+    """
+    El modo por defecto mantiene el HTTPServer original (solo anota la conexión en curso).
+    """
+    server = build_server(("127.0.0.1", 0), EchoHandler)
+    try:
+        assert type(server) is SingleHTTPServer
+        assert isinstance(server, HTTPServer)
+    finally:
+        server.server_close()
+
+
+def test_unknown_mode():
+    """
+    Un modo desconocido debe producir un ValueError.
+    """
+    with pytest.raises(ValueError):
+        build_server(("127.0.0.1", 0), EchoHandler, mode="fork-bomb")
+
+
+def test_slow_client_does_not_block_others():
+    """
+    Un cliente que abre conexión y no envía nada no debe bloquear al resto.
+    """
+    server = build_server(("127.0.0.1", 0), EchoHandler, mode="threaded", workers=2)
+    base_url, thread = start(server)
+    slow = socket.create_connection(("127.0.0.1", server.server_port))
+    try:
+        response = requests.get(f"{base_url}/", timeout=2)
+        assert response.status_code == 200
+        assert response.text == "ok"
+    finally:
+        slow.close()
+        stop(server, thread)
+
+
+def test_full_queue_returns_503():
+    """
+    Cuando todos los hilos están ocupados y la cola está llena, se responde 503.
+    """
+    server = build_server(("127.0.0.1", 0), EchoHandler, mode="threaded",
+                          workers=1, queue_size=1)
+    assert isinstance(server, WorkerPoolHTTPServer)
+    base_url, thread = start(server)
+    address = ("127.0.0.1", server.server_port)
+    # Clientes que no envían nada: el primero ocupa el único hilo, el segundo
+    # el único hueco de la cola y el siguiente debe recibir el 503
+    clients = []
+    data = b""
+    try:
+        for _ in range(5):
+            sock = socket.create_connection(address, timeout=0.3)
+            clients.append(sock)
+            try:
+                data = sock.recv(1024)
+            except socket.timeout:
+                continue
+            break
+        assert data.startswith(b"HTTP/1.1 503"), "Con la cola llena se debe responder 503"
+        assert b"Retry-After: 1" in data
+        assert server.rejected == 1
+    finally:
+        for sock in clients:
+            sock.close()
+        stop(server, thread)
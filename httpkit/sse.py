@@ -0,0 +1,195 @@
+"""
+Difusión de eventos Server-Sent Events (SSE) a muchos suscriptores.
+
+En lugar de que cada cliente pida /time una vez por segundo (un ciclo completo
+de petición y respuesta por cliente), el cliente abre una única conexión y el
+servidor le va enviando un evento por segundo.
+
+EventBroadcaster usa un único hilo temporizador por proceso: en cada tick
+codifica el evento una sola vez y lo reparte a todos los suscriptores con
+escrituras no bloqueantes. Cada suscriptor tiene un buffer de salida acotado;
+si un cliente no lee lo bastante rápido y su buffer supera max_pending bytes,
+se le desconecta, de modo que un cliente lento nunca frena a los demás ni hace
+crecer la memoria sin límite.
+
+Los manejadores entregan la conexión al difusor con
+AppRequestHandler.send_event_stream(): el hilo (o la tarea) que atendía la
+petición queda libre y la conexión pasa a ser un simple socket en la lista de
+suscriptores.
+"""
+
+import os
+import socket
+import threading
+import time
+
+
+def format_event(data, event_id=None, event=None):
+    """
+    Codifica un evento SSE.
+
+    Args:
+        data (bytes): Contenido del evento (una sola línea, por ejemplo JSON)
+        event_id: Identificador del evento (campo id), opcional
+        event (str, opcional): Tipo de evento (campo event)
+
+    Returns:
+        bytes: Evento listo para enviar, terminado en línea vacía
+    """
+    parts = []
+    if event_id is not None:
+        parts.append(b"id: %s\n" % str(event_id).encode())
+    if event is not None:
+        parts.append(b"event: %s\n" % event.encode())
+    parts.append(b"data: " + data + b"\n\n")
+    return b"".join(parts)
+
+
+class EventBroadcaster:
+    """
+    Temporizador que publica un evento por intervalo a todos los suscriptores.
+
+    Atributos:
+        interval: Segundos entre eventos (los ticks se alinean con el reloj)
+        max_pending: Bytes pendientes máximos por suscriptor antes de desconectarlo
+        published: Eventos publicados
+        disconnected: Suscriptores desconectados por no leer a tiempo
+    """
+
+    def __init__(self, build_event, interval=1.0, max_pending=64 * 1024, clock=time.time):
+        """
+        Args:
+            build_event: Función build_event(now) que devuelve el evento ya
+                codificado (bytes, ver format_event) para el instante now
+            interval (float): Segundos entre eventos
+            max_pending (int): Bytes pendientes máximos por suscriptor
+            clock: Función que devuelve el instante actual
+        """
+        self.build_event = build_event
+        self.interval = interval
+        self.max_pending = max_pending
+        self.clock = clock
+        self.published = 0
+        self.disconnected = 0
+        self._subscribers = {}
+        self._lock = threading.Lock()
+        self._pid = None
+        self._thread = None
+        self._stop = threading.Event()
+
+    @property
+    def subscribers(self):
+        """
+        Número de suscriptores conectados.
+        """
+        return len(self._subscribers)
+
+    def subscribe(self, sock, initial=b""):
+        """
+        Añade un suscriptor. A partir de aquí el socket pertenece al difusor,
+        que lo cierra al desconectarlo.
+
+        Args:
+            sock (socket.socket): Conexión del cliente (ya enviadas las cabeceras)
+            initial (bytes): Datos a enviar de inmediato (por ejemplo, el evento
+                actual, para no esperar al siguiente tick)
+        """
+        if self._pid != os.getpid():
+            self._start()
+        sock.setblocking(False)
+        with self._lock:
+            self._subscribers[sock] = bytearray(initial)
+        if initial:
+            self._flush(sock)
+
+    def publish(self, payload):
+        """
+        Envía un evento ya codificado a todos los suscriptores.
+
+        Args:
+            payload (bytes): Evento codificado
+        """
+        self.published += 1
+        with self._lock:
+            for pending in self._subscribers.values():
+                pending += payload
+            subscribers = list(self._subscribers)
+        for sock in subscribers:
+            self._flush(sock)
+
+    def close(self):
+        """
+        Detiene el temporizador y desconecta a todos los suscriptores.
+        """
+        if self._thread is not None and self._pid == os.getpid():
+            self._stop.set()
+            self._thread.join()
+        self._thread = None
+        self._pid = None
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for sock in subscribers:
+            self._drop(sock)
+
+    def _start(self):
+        """
+        Crea el hilo temporizador del proceso actual (también en los
+        trabajadores del modo pre-fork).
+        """
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            # Tras un fork los sockets heredados pertenecen al proceso padre
+            self._subscribers = {}
+            self._stop = threading.Event()
+            self._thread = threading.Thread(target=self._run, name="sse-broadcaster",
+                                            daemon=True)
+            self._thread.start()
+            self._pid = os.getpid()
+
+    def _run(self):
+        """
+        Bucle del temporizador: espera al siguiente tick, construye el evento
+        una sola vez y lo publica.
+        """
+        while True:
+            now = self.clock()
+            if self._stop.wait(self.interval - now % self.interval):
+                return
+            if self._subscribers:
+                self.publish(self.build_event(self.clock()))
+
+    def _flush(self, sock):
+        """
+        Envía sin bloquear todo lo posible del buffer de un suscriptor y lo
+        desconecta si se ha cerrado o si acumula demasiados datos pendientes.
+        """
+        with self._lock:
+            pending = self._subscribers.get(sock)
+            if pending is None:
+                return
+            try:
+                sent = sock.send(pending)
+                del pending[:sent]
+            except (BlockingIOError, InterruptedError):
+                pass
+            except OSError:
+                pending = None
+            too_slow = pending is not None and len(pending) > self.max_pending
+        if pending is None:
+            self._drop(sock)
+        elif too_slow:
+            self.disconnected += 1
+            self._drop(sock)
+
+    def _drop(self, sock):
+        """
+        Quita un suscriptor y cierra su conexión.
+        """
+        with self._lock:
+            self._subscribers.pop(sock, None)
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        sock.close()
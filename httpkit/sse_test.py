@@ -0,0 +1,104 @@
+"""
+Tests para httpkit/sse.py
+Comprueban el formato de los eventos, el reparto a varios suscriptores con un
+solo temporizador y la desconexión de los clientes que no leen.
+"""
+
+import socket
+import time
+
+from httpkit.sse import EventBroadcaster, format_event
+
+
+def read_until(sock, marker, timeout=2):
+    """
+    Lee del socket hasta recibir marker (o agotar el tiempo).
+    """
+    sock.settimeout(timeout)
+    data = b""
+    while marker not in data:
+        chunk = sock.recv(65536)
+        if not chunk:
+            break
+        data += chunk
+    return data
+
+
+def test_format_event():
+    assert format_event(b'{"a": 1}') == b'data: {"a": 1}\n\n'
+    assert format_event(b"x", event_id=7, event="tick") == b"id: 7\nevent: tick\ndata: x\n\n"
+
+
+def test_publish_fans_out_once():
+    """
+    Un evento se construye una vez y llega a todos los suscriptores.
+    """
+    builds = []
+
+    def build(now):
+        builds.append(now)
+        return format_event(b"%d" % len(builds))
+
+    broadcaster = EventBroadcaster(build, interval=0.05)
+    pairs = [socket.socketpair() for _ in range(3)]
+    try:
+        for server_side, _ in pairs:
+            broadcaster.subscribe(server_side, initial=b": hola\n\n")
+        assert broadcaster.subscribers == 3
+        for _, client in pairs:
+            assert read_until(client, b"data: 1\n\n").startswith(b": hola\n\n")
+        assert len(builds) >= 1
+        assert broadcaster.published == len(builds)
+    finally:
+        broadcaster.close()
+        for _, client in pairs:
+            client.close()
+    assert broadcaster.subscribers == 0
+
+
+def test_slow_consumer_is_disconnected():
+    """
+    Un cliente que no lee acumula datos pendientes hasta max_pending y se le
+    desconecta sin afectar a los demás.
+    """
+    broadcaster = EventBroadcaster(lambda now: b"", interval=3600, max_pending=4096)
+    slow_server, slow_client = socket.socketpair()
+    fast_server, fast_client = socket.socketpair()
+    try:
+        broadcaster.subscribe(slow_server)
+        broadcaster.subscribe(fast_server)
+        payload = format_event(b"x" * 1000)
+        for _ in range(2000):
+            broadcaster.publish(payload)
+            fast_client.setblocking(False)
+            try:
+                while fast_client.recv(65536):
+                    pass
+            except BlockingIOError:
+                pass
+            if broadcaster.disconnected:
+                break
+        assert broadcaster.disconnected == 1
+        assert broadcaster.subscribers == 1
+    finally:
+        broadcaster.close()
+        slow_client.close()
+        fast_client.close()
+
+
+def test_closed_client_is_removed():
+    """
+    Los clientes que cierran la conexión desaparecen de la lista al publicar.
+    """
+    broadcaster = EventBroadcaster(lambda now: b"", interval=3600)
+    server_side, client = socket.socketpair()
+    broadcaster.subscribe(server_side)
+    client.close()
+    try:
+        deadline = time.monotonic() + 2
+        while broadcaster.subscribers and time.monotonic() < deadline:
+            broadcaster.publish(b"data: x\n\n")
+        assert broadcaster.subscribers == 0
+        assert broadcaster.disconnected == 0
+    finally:
+        broadcaster.close()
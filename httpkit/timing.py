@@ -0,0 +1,149 @@
+"""
+Petición GET con el tiempo de cada fase medido por separado.
+
+response.elapsed de requests termina al recibir las cabeceras y mezcla en un
+solo número la resolución DNS, la conexión TCP, el saludo TLS y el tiempo del
+servidor; y len(response.content) obliga a descargar el cuerpo entero en
+memoria. timed_get() recorre las fases una a una con time.perf_counter() (reloj
+monótono de alta resolución):
+
+- dns: resolución del nombre (getaddrinfo),
+- connect: conexión TCP,
+- tls: saludo TLS (0 en http://),
+- ttfb: desde que se envía la petición hasta recibir la línea de estado y las
+  cabeceras (tiempo del servidor más un viaje de ida y vuelta),
+- transfer: descarga del cuerpo, que se lee por bloques contando los bytes.
+"""
+
+import http.client
+import socket
+import ssl
+import time
+from urllib.parse import urlsplit
+
+PHASES = ("dns", "connect", "tls", "ttfb", "transfer")
+
+
+class TimedResponse:
+    """
+    Resultado de timed_get().
+
+    Atributos:
+        status: Código de estado HTTP
+        headers: Cabeceras de la respuesta (http.client.HTTPMessage)
+        body: Cuerpo (None si no se pidió guardarlo)
+        body_size: Bytes de cuerpo recibidos
+        timings: Segundos de cada fase (claves de PHASES) y "total"
+    """
+
+    __slots__ = ("status", "headers", "body", "body_size", "timings")
+
+    def __init__(self, status, headers, body, body_size, timings):
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.body_size = body_size
+        self.timings = timings
+
+    def phases_ms(self):
+        """
+        Devuelve la duración de cada fase (y el total) en milisegundos.
+
+        Returns:
+            dict: {"dns_ms": ..., "connect_ms": ..., ..., "total_ms": ...}
+        """
+        return {f"{name}_ms": seconds * 1000 for name, seconds in self.timings.items()}
+
+
+def timed_get(url, timeout=10.0, headers=None, keep_body=True, chunk_size=16384,
+              ssl_context=None):
+    """
+    Realiza una petición GET midiendo cada fase por separado.
+
+    Args:
+        url (str): URL http:// o https://
+        timeout (float): Segundos máximos de cada operación de red
+        headers (dict, opcional): Cabeceras adicionales
+        keep_body (bool): Guardar el cuerpo (con False solo se cuentan sus bytes)
+        chunk_size (int): Tamaño de los bloques en que se lee el cuerpo
+        ssl_context (ssl.SSLContext, opcional): Contexto TLS (por defecto el del sistema)
+
+    Returns:
+        TimedResponse: Respuesta con los tiempos de cada fase
+
+    Raises:
+        OSError: Si falla la resolución, la conexión o el saludo TLS
+        http.client.HTTPException: Si la respuesta no es HTTP válido
+    """
+    parts = urlsplit(url)
+    secure = parts.scheme == "https"
+    host = parts.hostname
+    port = parts.port or (443 if secure else 80)
+    path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+    clock = time.perf_counter
+
+    started = clock()
+    addresses = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    resolved = clock()
+
+    sock = _connect(addresses, timeout)
+    connected = clock()
+    if secure:
+        context = ssl_context or ssl.create_default_context()
+        try:
+            sock = context.wrap_socket(sock, server_hostname=host)
+        except BaseException:
+            sock.close()
+            raise
+    handshaken = clock()
+
+    # La conexión ya está abierta: http.client la usa tal cual (HTTPSConnection
+    # solo para que la cabecera Host lleve el puerto por defecto correcto)
+    connection_class = http.client.HTTPSConnection if secure else http.client.HTTPConnection
+    conn = connection_class(host, port, timeout=timeout)
+    conn.sock = sock
+    try:
+        conn.request("GET", path, headers=headers or {})
+        response = conn.getresponse()
+        first_byte = clock()
+
+        chunks = [] if keep_body else None
+        body_size = 0
+        while True:
+            chunk = response.read(chunk_size)
+            if not chunk:
+                break
+            body_size += len(chunk)
+            if chunks is not None:
+                chunks.append(chunk)
+        finished = clock()
+    finally:
+        conn.close()
+
+    timings = {
+        "dns": resolved - started,
+        "connect": connected - resolved,
+        "tls": handshaken - connected,
+        "ttfb": first_byte - handshaken,
+        "transfer": finished - first_byte,
+        "total": finished - started,
+    }
+    body = b"".join(chunks) if chunks is not None else None
+    return TimedResponse(response.status, response.headers, body, body_size, timings)
+
+
+def _connect(addresses, timeout):
+    """
+    Abre la conexión TCP con la primera dirección que responda.
+    """
+    error = OSError("getaddrinfo no devolvió ninguna dirección")
+    for family, kind, proto, _, address in addresses:
+        sock = socket.socket(family, kind, proto)
+        sock.settimeout(timeout)
+        try:
+            sock.connect(address)
+            return sock
+        except OSError as exc:
+            error = exc
+            sock.close()
+    raise error
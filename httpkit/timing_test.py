@@ -0,0 +1,90 @@
+"""
+Tests para httpkit/timing.py
+Comprueban, contra un servidor local, que cada fase se mide por separado y que
+el tamaño del cuerpo se cuenta mientras se descarga.
+"""
+
+import time
+
+import pytest
+
+from httpkit.handler import AppRequestHandler
+from httpkit.runner import ServerRunner
+from httpkit.servers import build_server
+from httpkit.timing import PHASES, timed_get
+
+
+class TimingHandler(AppRequestHandler):
+    """
+    /slow tarda 0.2 s en responder; /big devuelve 1 MiB; /chunked envía el
+    cuerpo por bloques (Transfer-Encoding: chunked).
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        if self.path == "/slow":
+            time.sleep(0.2)
+            self.send_body(200, b"ok", content_type="text/plain")
+        elif self.path == "/big":
+            self.send_body(200, b"x" * (1024 * 1024), content_type="application/octet-stream")
+        elif self.path == "/chunked":
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            for part in (b"hola ", b"mundo"):
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(part), part))
+            self.wfile.write(b"0\r\n\r\n")
+            self.close_connection = True
+        else:
+            self.send_body(404, b"no", content_type="text/plain")
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def base_url():
+    server = build_server(("127.0.0.1", 0), TimingHandler, mode="threaded")
+    with ServerRunner(server) as runner:
+        yield runner.url
+
+
+def test_phases_are_reported(base_url):
+    response = timed_get(f"{base_url}/big")
+    assert response.status == 200
+    assert set(response.timings) == set(PHASES) | {"total"}
+    assert all(value >= 0 for value in response.timings.values())
+    assert response.timings["tls"] == pytest.approx(0, abs=0.01)
+    assert response.timings["total"] == pytest.approx(
+        sum(response.timings[phase] for phase in PHASES))
+    assert set(response.phases_ms()) == {f"{name}_ms" for name in response.timings}
+
+
+def test_server_time_is_counted_in_ttfb(base_url):
+    response = timed_get(f"{base_url}/slow")
+    assert response.timings["ttfb"] >= 0.2
+    assert response.timings["transfer"] < 0.2
+
+
+def test_body_size_is_counted_while_streaming(base_url):
+    response = timed_get(f"{base_url}/big", keep_body=False, chunk_size=4096)
+    assert response.body is None
+    assert response.body_size == 1024 * 1024
+
+    response = timed_get(f"{base_url}/chunked")
+    assert response.body == b"hola mundo"
+    assert response.body_size == len(b"hola mundo")
+
+
+def test_error_status_is_returned(base_url):
+    response = timed_get(f"{base_url}/missing")
+    assert response.status == 404
+    assert response.body == b"no"
+
+
+def test_connection_refused():
+    with pytest.raises(OSError):
+        timed_get("http://127.0.0.1:9/")